@@ -144,6 +144,82 @@ OCR_UPLOAD_PATH = 'uploads/'
 OCR_TEMPLATES_PATH = 'templates/'
 OCR_DOCUMENTS_PATH = 'documents/'
 
+# OCR engine pool: warm engines shared per worker process
+OCR_DEFAULT_ENGINE = 'tesseract'
+OCR_ENGINE_POOL_SIZE = 2
+OCR_WARM_ENGINES_ON_STARTUP = False
+# 'pytesseract' (subprocess per call) or 'tesserocr' (in-process, requires tesserocr)
+OCR_TESSERACT_BACKEND = 'pytesseract'
+# OpenMP threads per Tesseract call. Cells and pages already run on their own
+# workers, so Tesseract's internal threads would only oversubscribe the cores.
+# Exported as OMP_THREAD_LIMIT here, before anything can start Tesseract, so it
+# holds for every Tesseract call in the process (subprocesses and tesserocr).
+# An OMP_THREAD_LIMIT already in the environment wins; None keeps Tesseract's default.
+OCR_TESSERACT_THREAD_LIMIT = 1
+if OCR_TESSERACT_THREAD_LIMIT:
+    os.environ.setdefault('OMP_THREAD_LIMIT', str(OCR_TESSERACT_THREAD_LIMIT))
+# Per-cell OCR concurrency per worker process; 'thread', 'process' or 'serial'
+OCR_CELL_OCR_WORKERS = 4
+OCR_CELL_OCR_EXECUTOR = 'thread'
+# PDF rasterization resolution and number of processes pages are spread across
+# (spawned on first use and kept for the life of the worker process)
+OCR_PDF_DPI = 200
+OCR_PDF_PAGE_WORKERS = 4
+# Read embedded text from born-digital PDF pages instead of rasterizing and OCR-ing them
+OCR_PDF_USE_TEXT_LAYER = True
+# Per-page time budget for denoising; noisier tiers are skipped when a page cannot afford them.
+# 3000 admits downscaled NL-means up to ~11.5MP (A4 at 300 DPI is 8.7MP)
+OCR_DENOISE_BUDGET_MS = 3000
+# 'downsampled' estimates the shadow background at 1/4 scale; 'full' at full resolution
+OCR_SHADOW_REMOVAL_MODE = 'downsampled'
+# Pages above this many pixels are preprocessed and line-detected in overlapping tiles
+# (0 disables tiling). The overlap applies to preprocessing, whose filters reach 24px;
+# line detection only binarizes its tiles and overlaps them by half the threshold block
+OCR_TILED_MIN_PIXELS = 12_000_000
+OCR_TILE_SIZE = 1024
+OCR_TILE_OVERLAP = 96
+OCR_TILE_WORKERS = 4
+# EnhancedTableDetector runs its strategies on this many threads and stops waiting for
+# the rest once one reaches this confidence (None always runs all of them)
+OCR_TABLE_STRATEGY_WORKERS = 3
+OCR_TABLE_EARLY_EXIT_CONFIDENCE = 85.0
+# Record strategy runtime/confidence/wins per image-quality bucket and order strategies by
+# win rate; strategies that ran this many times in a bucket without winning are skipped,
+# except on every Nth detection, which runs all of them (0 disables pruning/exploration)
+OCR_STRATEGY_TELEMETRY = True
+OCR_STRATEGY_PRUNE_MIN_RUNS = 20
+OCR_STRATEGY_EXPLORE_EVERY = 25
+# Documents processed with a template are registered against the template image and its
+# stored cells warped onto them; table detection only runs when the alignment residual
+# (document pixels) exceeds the limit. Registration runs on thumbnails of this size
+OCR_TEMPLATE_ALIGNMENT = True
+OCR_TEMPLATE_ALIGN_MAX_RESIDUAL = 4.0
+OCR_TEMPLATE_ALIGN_THUMBNAIL = 1000
+# Templates keep the detection settings that won on their image (strategy, kernel, binarization,
+# denoise tier, engine); documents that cannot be aligned run only that strategy, and fall back to
+# the full search below this confidence. After N full searches among the last WINDOW documents
+# the profile switches to the strategy that won most of them
+OCR_TEMPLATE_PROFILE = True
+OCR_TEMPLATE_PROFILE_MIN_CONFIDENCE = 60.0
+OCR_TEMPLATE_PROFILE_WINDOW = 10
+OCR_TEMPLATE_PROFILE_REFRESH_AFTER = 3
+
+# Ruled tables are localized on a thumbnail with this long side and detected inside their own
+# crops, several tables of a page on this many threads (pages without one are processed whole)
+OCR_TABLE_LOCALIZATION = True
+OCR_TABLE_LOCALIZATION_SIZE = 1000
+OCR_TABLE_REGION_WORKERS = 2
+# Ruling detection sizes scale with the page; rulings are detected on the binary page reduced
+# by the largest whole factor (up to the max) that keeps its long side at least this size
+OCR_LINE_DETECTION_SIZE = 800
+OCR_LINE_DETECTION_MAX_FACTOR = 4
+
+# Content-addressed OCR result cache: in-memory LRU tier plus a disk tier shared by workers
+OCR_RESULT_CACHE_ENABLED = True
+OCR_RESULT_CACHE_DIR = BASE_DIR / 'ocr_cache'
+OCR_RESULT_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+OCR_RESULT_CACHE_DISK_BYTES = 512 * 1024 * 1024
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -233,12 +233,12 @@ class DocumentViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            from ocr_processing.ocr_core import OCREngine
+            from ocr_processing.engine_pool import get_ocr_engine
             from django.conf import settings
             import os
             
             file_path = os.path.join(settings.MEDIA_ROOT, document.file.name)
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             ocr_result = ocr_engine.extract_text(file_path)
             
             document.text_version = ocr_result.get('text', '')  # Fixed: text_version not text_content
@@ -270,7 +270,7 @@ class OCRViewSet(viewsets.ViewSet):
         serializer.is_valid(raise_exception=True)
         
         try:
-            from ocr_processing.ocr_core import OCREngine
+            from ocr_processing.engine_pool import get_ocr_engine
             from django.core.files.storage import default_storage
             from django.conf import settings
             import os
@@ -287,7 +287,7 @@ class OCRViewSet(viewsets.ViewSet):
             full_path = os.path.join(settings.MEDIA_ROOT, file_path)
             
             # Process with OCR
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             ocr_result = ocr_engine.extract_text(full_path)
             
             result = {
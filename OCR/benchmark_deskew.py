@@ -0,0 +1,106 @@
+"""
+Benchmark script for skew estimation
+Compares speed and angle error of the legacy deskew methods and the shared estimator
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OCR.settings')
+django.setup()
+
+from ocr_processing.deskew import estimate_skew_angle
+import cv2
+import numpy as np
+
+
+SKEW_ANGLES = [-10.0, -5.0, -2.5, -1.0, 0.0, 0.7, 1.5, 3.0, 6.0, 12.0]
+
+
+def create_page(width: int = 2480, height: int = 3508):
+    """Create an A4-at-300-DPI grayscale page with lines of text"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    words = ["Invoice", "Total", "Quantity", "Description", "Amount", "Customer", "2024"]
+    y = 200
+    line = 0
+    while y < height - 200:
+        x = 150
+        i = line
+        while x < width - 400:
+            word = words[i % len(words)]
+            cv2.putText(page, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 0, 3)
+            x += 60 + 38 * len(word)
+            i += 1
+        y += 90
+        line += 1
+    return page
+
+
+def skew_page(page: np.ndarray, angle: float) -> np.ndarray:
+    """Rotate a page by angle degrees; the true correction is -angle"""
+    height, width = page.shape
+    matrix = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
+    return cv2.warpAffine(page, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+
+def legacy_min_area_rect(gray: np.ndarray) -> float:
+    """Former ImagePreprocessor.deskew_image angle estimate"""
+    coords = np.column_stack(np.where(gray > 0))
+    if len(coords) == 0:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    return -(90 + angle) if angle < -45 else -angle
+
+
+def legacy_hough(gray: np.ndarray) -> float:
+    """Former SmartImagePreprocessor._detect_skew_angle estimate"""
+    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    lines = cv2.HoughLines(edges, 1, np.pi / 180, 200)
+    if lines is None:
+        return 0.0
+    angles = [np.degrees(theta) - 90 for _, theta in lines[:, 0]]
+    angles = [a for a in angles if -45 < a < 45]
+    return float(np.median(angles)) if angles else 0.0
+
+
+def benchmark(method, pages):
+    """Return (mean ms per page, mean abs error, max abs error) for one method"""
+    errors = []
+    start = time.perf_counter()
+    for angle, page in pages:
+        estimate = method(page)
+        errors.append(abs(estimate - (-angle)))
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(pages), float(np.mean(errors)), float(np.max(errors))
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 2480
+    height = int(width * 1.414)
+    base = create_page(width, height)
+    pages = [(angle, skew_page(base, angle)) for angle in SKEW_ANGLES]
+
+    print("\n" + "=" * 70)
+    print(f"DESKEW BENCHMARK ({width}x{height}, {len(pages)} skew angles)")
+    print("=" * 70 + "\n")
+
+    methods = [
+        ("minAreaRect", legacy_min_area_rect),
+        ("Hough", legacy_hough),
+        ("shared", estimate_skew_angle),
+    ]
+    for name, method in methods:
+        per_page_ms, mean_error, max_error = benchmark(method, pages)
+        print(f"{name:12s}: {per_page_ms:8.1f} ms/page  "
+              f"mean error {mean_error:6.2f}°  max error {max_error:6.2f}°")
+
+    print("\nPer-angle estimates (shared estimator):")
+    for angle, page in pages:
+        print(f"  skew {angle:+6.2f}° -> correction {estimate_skew_angle(page):+6.2f}°")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark script for shadow removal
+Compares full-resolution and downsampled background estimation for speed and output difference
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OCR.settings')
+django.setup()
+
+from ocr_processing.smart_preprocessor import SmartImagePreprocessor
+import cv2
+import numpy as np
+
+
+def create_phone_photo(width: int, height: int):
+    """Create a grayscale text page with an uneven shadow across it"""
+    yy, xx = np.mgrid[0:height, 0:width]
+    page = np.full((height, width), 215, dtype=np.float32)
+    page -= 100 * np.exp(-((xx - width * 0.25) ** 2 + (yy - height * 0.75) ** 2) / (2 * (width * 0.45) ** 2))
+    page -= 30 * xx / width  # Light falling off towards one edge
+    page = page.astype(np.uint8)
+    words = ["Invoice", "Total", "Quantity", "Description", "Amount", "Customer", "2024"]
+    for row, y in enumerate(range(200, height - 150, 90)):
+        x = 150
+        i = row
+        while x < width - 400:
+            word = words[i % len(words)]
+            cv2.putText(page, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 25, 3)
+            x += 60 + 38 * len(word)
+            i += 1
+    return page
+
+
+def time_mode(preprocessor, page, mode, repeats):
+    """Return (mean ms per call, output) for one mode"""
+    output = preprocessor.remove_shadows(page, mode=mode)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        output = preprocessor.remove_shadows(page, mode=mode)
+    return (time.perf_counter() - start) * 1000 / repeats, output
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    preprocessor = SmartImagePreprocessor()
+
+    print("\n" + "=" * 70)
+    print("SHADOW REMOVAL BENCHMARK")
+    print("=" * 70 + "\n")
+
+    for width, height in [(1240, 1754), (2480, 3508), (3000, 4000)]:
+        page = create_phone_photo(width, height)
+        full_ms, full = time_mode(preprocessor, page, "full", repeats)
+        fast_ms, fast = time_mode(preprocessor, page, "downsampled", repeats)
+
+        difference = np.abs(full.astype(np.int16) - fast.astype(np.int16))
+        _, full_binary = cv2.threshold(full, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, fast_binary = cv2.threshold(fast, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        agreement = (full_binary == fast_binary).mean() * 100
+
+        print(f"{width}x{height}: full {full_ms:7.1f} ms, downsampled {fast_ms:6.1f} ms "
+              f"({full_ms / fast_ms:4.1f}x)  mean diff {difference.mean():.2f}, "
+              f"max diff {difference.max()}, binarized agreement {agreement:.3f}%")
+
+
+if __name__ == "__main__":
+    main()
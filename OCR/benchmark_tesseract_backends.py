@@ -0,0 +1,80 @@
+"""
+Benchmark script for Tesseract backends
+Compares per-cell OCR latency of pytesseract (subprocess) and tesserocr (in-process)
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OCR.settings')
+django.setup()
+
+from ocr_processing.tesseract_backend import PytesseractBackend, TesserocrBackend, TESSEROCR_AVAILABLE
+import cv2
+import numpy as np
+
+
+SAMPLE_WORDS = ["Name", "Age", "Department", "Salary", "John Doe", "30", "IT", "$5000"]
+
+
+def create_cell_images(count: int):
+    """Create small grayscale images that look like table cells"""
+    cells = []
+    for i in range(count):
+        img = np.full((60, 220), 255, dtype=np.uint8)
+        cv2.putText(img, SAMPLE_WORDS[i % len(SAMPLE_WORDS)], (10, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, 0, 2)
+        cells.append(img)
+    return cells
+
+
+def benchmark_backend(backend, cells):
+    """Run OCR on every cell and return (per-cell latency in ms, texts)"""
+    # Warm-up call so one-time initialization is not counted
+    backend.image_to_data(cells[0])
+
+    texts = []
+    start = time.perf_counter()
+    for cell in cells:
+        data = backend.image_to_data(cell)
+        texts.append(" ".join(t for t in data['text'] if str(t).strip()))
+    elapsed = time.perf_counter() - start
+
+    return elapsed * 1000 / len(cells), texts
+
+
+def main():
+    cell_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    cells = create_cell_images(cell_count)
+
+    print("\n" + "=" * 70)
+    print(f"TESSERACT BACKEND BENCHMARK ({cell_count} cells)")
+    print("=" * 70 + "\n")
+
+    backends = [PytesseractBackend()]
+    if TESSEROCR_AVAILABLE:
+        backends.append(TesserocrBackend())
+    else:
+        print("tesserocr is not installed - only pytesseract will be measured")
+
+    results = {}
+    for backend in backends:
+        if not backend.is_available():
+            print(f"{backend.name:12s}: not available, skipped")
+            continue
+        per_cell_ms, texts = benchmark_backend(backend, cells)
+        results[backend.name] = (per_cell_ms, texts)
+        print(f"{backend.name:12s}: {per_cell_ms:8.2f} ms/cell  "
+              f"({per_cell_ms * 200 / 1000:.2f}s for a 20x10 grid)")
+
+    if len(results) == 2:
+        base = results['pytesseract'][0]
+        fast = results['tesserocr'][0]
+        matches = sum(a == b for a, b in zip(results['pytesseract'][1], results['tesserocr'][1]))
+        print(f"\nSpeed-up: {base / fast:.1f}x, identical text on {matches}/{cell_count} cells")
+
+
+if __name__ == "__main__":
+    main()
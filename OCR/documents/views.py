@@ -23,7 +23,7 @@ def document_upload(request):
                 return redirect('documents:document_upload')
             
             # Process with OCR
-            from ocr_processing.ocr_core import OCREngine
+            from ocr_processing.engine_pool import get_ocr_engine
             from basemode.file_storage import save_file_to_db, get_temp_file_path, cleanup_temp_file
             import os
             
@@ -34,7 +34,7 @@ def document_upload(request):
             full_path = get_temp_file_path(file_info['file_data'], file_info['file_name'])
             
             # Initialize OCR and extract text
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             ocr_result = ocr_engine.extract_text(full_path)
             
             # Get current user or create default user
@@ -62,7 +62,12 @@ def document_upload(request):
                 extracted_data={
                     'text': ocr_result.text,
                     'confidence': ocr_result.confidence,
-                    'engine': ocr_result.engine
+                    'engine': ocr_result.engine,
+                    # Which path each PDF page took: embedded text layer or OCR
+                    'page_sources': [page.source for page in ocr_result.pages or []],
+                    # Denoise tier and time spent, per page for PDFs
+                    'preprocessing': ([page.preprocessing for page in ocr_result.pages]
+                                      if ocr_result.pages else ocr_result.preprocessing)
                 },
                 processing_status='completed'
             )
@@ -97,8 +102,9 @@ def document_upload_with_template(request, template_id):
                 return redirect('documents:document_upload_with_template', template_id=template_id)
             
             # Process with template
-            from ocr_processing.ocr_core import OCREngine
+            from ocr_processing.engine_pool import get_ocr_engine
             from ocr_processing.table_detector import TableDetector
+            from ocr_processing.template_alignment import detect_with_template
             from ocr_processing.excel_manager import ExcelTemplateManager
             from basemode.file_storage import save_file_to_db, get_temp_file_path, cleanup_temp_file, read_file_from_path
             import os
@@ -124,7 +130,7 @@ def document_upload_with_template(request, template_id):
                 )
             
             # Initialize OCR
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             
             # Check if template has table structure (new detection method)
             has_table_structure = (
@@ -136,12 +142,14 @@ def document_upload_with_template(request, template_id):
             excel_file_path = None
             
             if has_table_structure:
-                # Use table detection for processing
+                # Warp the template's tables onto the document; detect them only if alignment fails
                 table_detector = TableDetector(ocr_engine)
-                table_structure = table_detector.detect_table_structure(full_path, method="morphology")
+                tables = detect_with_template(full_path, template, ocr_engine)
+                if tables is None:
+                    tables = table_detector.detect_tables(full_path, method="morphology")
                 
-                if table_structure:
-                    extracted_data = table_detector.structure_to_dict(table_structure)
+                if tables:
+                    extracted_data = table_detector.tables_to_dict(tables)
                     
                     # Try to fill Excel template if it exists
                     excel_manager = ExcelTemplateManager()
@@ -344,8 +352,10 @@ def document_reprocess(request, document_id):
     document = get_object_or_404(Document, id=document_id)
     if request.method == 'POST':
         try:
-            from ocr_processing.ocr_core import OCREngine, TemplateProcessor
+            from ocr_processing.ocr_core import TemplateProcessor
+            from ocr_processing.engine_pool import get_ocr_engine
             from ocr_processing.table_detector import TableDetector
+            from ocr_processing.template_alignment import detect_with_template
             from django.conf import settings
             import os
             
@@ -353,7 +363,7 @@ def document_reprocess(request, document_id):
             full_path = os.path.join(settings.MEDIA_ROOT, document.file.name)
             
             # Initialize OCR engine
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             
             if document.template:
                 # Check if template has table structure (new detection method)
@@ -363,14 +373,17 @@ def document_reprocess(request, document_id):
                 )
                 
                 if has_table_structure:
-                    # Use table detection for processing
+                    # Warp the template's tables onto the document; detect them only if alignment fails
                     table_detector = TableDetector(ocr_engine)
-                    table_structure = table_detector.detect_table_structure(full_path, method="morphology")
+                    tables = detect_with_template(full_path, document.template, ocr_engine)
+                    if tables is None:
+                        tables = table_detector.detect_tables(full_path, method="morphology")
                     
-                    if table_structure:
-                        document.extracted_data = table_detector.structure_to_dict(table_structure)
-                        cell_count = len(document.extracted_data.get('cells', []))
-                        messages.success(request, f'Document reprocessed with table detection. Extracted {cell_count} cells.')
+                    if tables:
+                        document.extracted_data = table_detector.tables_to_dict(tables)
+                        cell_count = sum(len(table['cells']) for table in document.extracted_data['tables'])
+                        messages.success(request, f'Document reprocessed with table detection. '
+                                                  f'Extracted {cell_count} cells from {len(tables)} table(s).')
                     else:
                         # No table detected - use fallback
                         messages.warning(request, 'No table structure detected. Using fallback extraction.')
@@ -410,7 +423,11 @@ def document_reprocess(request, document_id):
                 document.extracted_data = {
                     'text': ocr_result.text,
                     'confidence': ocr_result.confidence,
-                    'engine': ocr_result.engine
+                    'engine': ocr_result.engine,
+                    'page_sources': [page.source for page in ocr_result.pages or []],
+                    # Denoise tier and time spent, per page for PDFs
+                    'preprocessing': ([page.preprocessing for page in ocr_result.pages]
+                                      if ocr_result.pages else ocr_result.preprocessing)
                 }
                 messages.success(request, f'Document reprocessed. Confidence: {ocr_result.confidence:.1f}%')
             
@@ -471,7 +488,8 @@ def document_reextract_field(request, document_id):
     
     if request.method == 'POST':
         try:
-            from ocr_processing.ocr_core import OCREngine, TemplateProcessor
+            from ocr_processing.ocr_core import TemplateProcessor
+            from ocr_processing.engine_pool import get_ocr_engine
             from django.conf import settings
             import os
             
@@ -504,7 +522,7 @@ def document_reextract_field(request, document_id):
                 }, status=404)
             
             # Re-extract the field
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             template_processor = TemplateProcessor(ocr_engine)
             
             # Extract all fields again using the template
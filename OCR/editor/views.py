@@ -8,7 +8,7 @@ from django.conf import settings
 import json
 import os
 from .models import TextDocument
-from ocr_processing.ocr_core import OCREngine
+from ocr_processing.engine_pool import get_ocr_engine
 
 
 def editor_home(request):
@@ -38,7 +38,7 @@ def upload_text_document(request):
             full_path = os.path.join(settings.MEDIA_ROOT, file_path)
             
             # Process with OCR
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             ocr_result = ocr_engine.extract_text(full_path)
             
             # Create TextDocument
@@ -294,7 +294,7 @@ def reprocess_text_document(request, document_id):
             document.processing_status = 'processing'
             document.save()
             
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             ocr_result = ocr_engine.extract_text(full_path)
             
             # Update document
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class OcrProcessingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ocr_processing'
+
+    def ready(self):
+        # Pay OCR engine start-up cost once per worker instead of on first request
+        if getattr(settings, 'OCR_WARM_ENGINES_ON_STARTUP', False):
+            from ocr_processing.engine_pool import warm_up_engines
+            warm_up_engines()
@@ -0,0 +1,100 @@
+"""
+Connected-Component Cell Extraction
+Finds table cells, merged cells included, as the connected regions enclosed
+by the rulings of a page, and assigns grid positions from their boxes
+"""
+import cv2
+import numpy as np
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Regions smaller than this (in pixels) on either side are ruling gaps or noise, not cells
+MIN_CELL_SIDE = 8
+
+# A cell region must fill at least this share of its bounding box (cells are rectangles)
+MIN_FILL_RATIO = 0.7
+
+# Pages with a longer side than this are labelled on a 2x max-pooled ruling mask
+DOWNSCALE_ABOVE = 2000
+
+
+def _cluster_edges(edges: np.ndarray, max_gap: int) -> np.ndarray:
+    """Sorted boundary positions, one per cluster of near-equal cell edges"""
+    from ocr_processing.table_detector import merge_close_lines
+    return np.asarray(merge_close_lines(edges, max_gap), dtype=np.int64)
+
+
+def _grid_positions(starts: np.ndarray, ends: np.ndarray, max_gap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grid index and span of every cell along one axis
+
+    The clustered start edges of all cells are the grid boundaries. A cell
+    sits at the boundary nearest its start and spans every boundary that
+    begins before its end.
+    """
+    boundaries = _cluster_edges(starts, max_gap)
+    index = np.abs(starts[:, None] - boundaries[None, :]).argmin(axis=1)
+    last = np.searchsorted(boundaries, ends - max_gap, side='left')
+    span = np.maximum(last - index, 1)
+    return index, span
+
+
+def find_cell_components(h_mask: np.ndarray, v_mask: np.ndarray,
+                         min_fill: float = MIN_FILL_RATIO, scale: int = 1) -> np.ndarray:
+    """
+    Find cells as the connected regions between rulings
+
+    The ruling masks are combined and inverted, so every area enclosed by
+    rulings becomes one connected component; a merged cell is simply a
+    larger component. Components touching the page border (the area around
+    the table), tiny ones and non-rectangular ones are dropped. Large pages
+    are labelled at half resolution, pooling so rulings never break up.
+
+    Args:
+        h_mask: Horizontal ruling mask (non-zero on rulings)
+        v_mask: Vertical ruling mask
+        min_fill: Smallest component area as a share of its bounding box
+        scale: Page pixels per mask pixel, for masks detected at reduced scale
+
+    Returns:
+        N x 8 int array of (x, y, width, height, row, col, row_span, col_span)
+        per cell in page pixels, sorted by row then column
+    """
+    from ocr_processing.table_detector import line_merge_gap
+
+    height, width = h_mask.shape[:2]
+    rulings = cv2.bitwise_or(h_mask, v_mask)
+    factor = 2 if max(height, width) > DOWNSCALE_ABOVE else 1
+    page_factor = factor * scale
+    if factor > 1:
+        # Area averaging is non-zero wherever a block holds any ruling pixel
+        rulings = cv2.resize(rulings, (width // factor, height // factor), interpolation=cv2.INTER_AREA)
+    # Close pinholes where a ruling barely touches its neighbour
+    rulings = cv2.dilate(rulings, np.ones((3, 3), np.uint8))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(
+        np.where(rulings > 0, 0, 255).astype(np.uint8), connectivity=4
+    )
+
+    # Label 0 is the rulings themselves
+    x, y, w, h, area = (stats[1:, i].astype(np.int64) for i in range(5))
+    keep = (
+        (x > 0) & (y > 0) & (x + w < rulings.shape[1]) & (y + h < rulings.shape[0])
+        & (w * page_factor >= MIN_CELL_SIDE) & (h * page_factor >= MIN_CELL_SIDE)
+        & (area >= min_fill * w * h)
+    )
+    # Undo the 1px dilation so boxes reach the ruling edges, back at page scale
+    x, y = (x[keep] - 1) * page_factor, (y[keep] - 1) * page_factor
+    w, h = (w[keep] + 2) * page_factor, (h[keep] + 2) * page_factor
+    if len(x) == 0:
+        return np.zeros((0, 8), dtype=np.int64)
+
+    row, row_span = _grid_positions(y, y + h, line_merge_gap(height * scale))
+    col, col_span = _grid_positions(x, x + w, line_merge_gap(width * scale))
+
+    cells = np.stack([x, y, w, h, row, col, row_span, col_span], axis=1)
+    cells = cells[np.lexsort((col, row))]
+    logger.info(f"Connected components found {len(cells)} cells "
+                f"({int(np.count_nonzero((row_span > 1) | (col_span > 1)))} merged)")
+    return cells
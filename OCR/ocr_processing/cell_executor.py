@@ -0,0 +1,110 @@
+"""
+Cell OCR Executor
+Bounded thread/process pool for running per-cell OCR in parallel
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Iterable, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cells are only worth fanning out when there are at least this many
+MIN_PARALLEL_ITEMS = 4
+
+_worker_state = threading.local()
+
+
+def _mark_worker_thread():
+    """Thread pool initializer: flag threads that belong to the executor"""
+    _worker_state.in_executor = True
+
+
+class CellOCRExecutor:
+    """
+    Runs a function over table cells with bounded concurrency, keeping cell order
+
+    One executor is shared per worker process, so concurrent requests share the
+    same cap instead of each spawning their own pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, mode: str = "thread"):
+        """
+        Args:
+            max_workers: Maximum concurrent OCR calls (defaults to CPU count)
+            mode: "thread" (default), "process", or "serial"
+        """
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.mode = mode if mode in ("thread", "process", "serial") else "thread"
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """Create the underlying pool on first use"""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.mode == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="cell-ocr",
+                            initializer=_mark_worker_thread
+                        )
+                    logger.info(f"Started {self.mode} cell OCR executor with {self.max_workers} worker(s)")
+        return self._pool
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Apply fn to every item, in parallel when worthwhile
+
+        Args:
+            fn: Function to apply (must be picklable in process mode)
+            items: Items to process
+
+        Returns:
+            Results in the same order as items
+        """
+        items = list(items)
+        # Run inline for tiny batches, serial mode, or when called from one of
+        # our own worker threads (waiting on the pool from inside it can deadlock)
+        if (self.mode == "serial" or self.max_workers == 1 or len(items) < MIN_PARALLEL_ITEMS
+                or getattr(_worker_state, 'in_executor', False)):
+            return [fn(item) for item in items]
+
+        chunksize = max(1, len(items) // (self.max_workers * 4)) if self.mode == "process" else 1
+        return list(self._get_pool().map(fn, items, chunksize=chunksize))
+
+    def shutdown(self) -> None:
+        """Stop the underlying pool"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_executor: Optional[CellOCRExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_cell_executor() -> CellOCRExecutor:
+    """
+    Get the process-wide cell OCR executor configured from settings
+
+    Returns:
+        Shared CellOCRExecutor
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                try:
+                    from django.conf import settings
+                    max_workers = getattr(settings, 'OCR_CELL_OCR_WORKERS', None)
+                    mode = getattr(settings, 'OCR_CELL_OCR_EXECUTOR', 'thread')
+                except Exception:
+                    max_workers, mode = None, 'thread'
+                _executor = CellOCRExecutor(max_workers=max_workers, mode=mode)
+    return _executor
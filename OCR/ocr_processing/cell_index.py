@@ -0,0 +1,177 @@
+"""
+Cell Spatial Index
+Uniform-grid bucket index over axis-aligned table cells, used to map word
+and text-block boxes to the cell that contains them
+"""
+import numpy as np
+import logging
+from typing import Any, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Below this many query points a plain Python lookup beats building the
+# vectorized candidate arrays
+VECTORIZE_MIN_POINTS = 64
+
+# Upper bound on buckets per cell, so a few tiny cells cannot blow up the grid
+MAX_BUCKETS_PER_CELL = 4
+
+
+class CellIndex:
+    """
+    Maps points to the cells containing them without testing every cell
+
+    The page is cut into uniform buckets about the size of a typical cell and
+    every cell is registered in the buckets it overlaps, so a lookup only
+    tests the handful of cells sharing the point's bucket. When several cells
+    contain a point the one listed first wins, as with a linear scan.
+    """
+
+    def __init__(self, cells: Sequence[Any]):
+        """
+        Args:
+            cells: CellInfo-like objects (x, y, width, height) or an
+                N x 4 array of (x1, y1, x2, y2) boxes
+        """
+        if isinstance(cells, np.ndarray):
+            boxes = cells.astype(np.int64).reshape(-1, 4)
+        else:
+            boxes = np.array(
+                [(c.x, c.y, c.x + c.width, c.y + c.height) for c in cells], dtype=np.int64
+            ).reshape(-1, 4)
+        self.boxes = boxes
+
+        if len(boxes) == 0:
+            self._origin = np.zeros(2)
+            self._bucket = np.ones(2)
+            self._shape = (0, 0)
+            self._starts = np.zeros(1, dtype=np.int64)
+            self._members = np.zeros(0, dtype=np.int64)
+            return
+
+        # Buckets sized like a typical cell, grown if that would make too many
+        origin = boxes[:, :2].min(axis=0).astype(np.float64)
+        extent = np.maximum(boxes[:, 2:].max(axis=0) - origin, 1)
+        bucket = np.maximum(np.median(boxes[:, 2:] - boxes[:, :2], axis=0), 1).astype(np.float64)
+        max_buckets = MAX_BUCKETS_PER_CELL * len(boxes)
+        while np.prod(np.ceil(extent / bucket)) > max_buckets:
+            bucket *= 2
+        cols, rows = (int(n) for n in np.ceil(extent / bucket))
+
+        # Register every cell in each bucket its box overlaps (CSR layout,
+        # members of a bucket in cell order)
+        first = np.floor((boxes[:, :2] - origin) / bucket).astype(np.int64)
+        last = np.floor((boxes[:, 2:] - origin) / bucket).astype(np.int64)
+        first = np.clip(first, 0, [cols - 1, rows - 1])
+        last = np.clip(last, first, [cols - 1, rows - 1])
+        spans = last - first + 1
+        counts = spans[:, 0] * spans[:, 1]
+        cell_ids = np.repeat(np.arange(len(boxes)), counts)
+        offsets = np.arange(len(cell_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+        bx = first[cell_ids, 0] + offsets % spans[cell_ids, 0]
+        by = first[cell_ids, 1] + offsets // spans[cell_ids, 0]
+        bucket_ids = by * cols + bx
+        order = np.lexsort((cell_ids, bucket_ids))
+
+        self._origin = origin
+        self._bucket = bucket
+        self._shape = (cols, rows)
+        self._members = cell_ids[order]
+        self._starts = np.searchsorted(bucket_ids[order], np.arange(cols * rows + 1))
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _bucket_of(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket id per point and whether the point falls inside the bucket grid"""
+        cols, rows = self._shape
+        bx = np.floor((xs - self._origin[0]) / self._bucket[0]).astype(np.int64)
+        by = np.floor((ys - self._origin[1]) / self._bucket[1]).astype(np.int64)
+        # Points on the far edge of the last bucket still belong to it
+        bx = np.where(bx == cols, cols - 1, bx)
+        by = np.where(by == rows, rows - 1, by)
+        valid = (bx >= 0) & (bx < cols) & (by >= 0) & (by < rows)
+        return np.where(valid, by * cols + bx, 0), valid
+
+    def locate(self, xs: Any, ys: Any, inclusive: bool = False) -> np.ndarray:
+        """
+        Find the cell containing each point
+
+        Args:
+            xs: Point x coordinates
+            ys: Point y coordinates
+            inclusive: Treat the right/bottom cell edges as inside (closed
+                boxes); by default boxes are half-open
+
+        Returns:
+            Cell index per point, -1 where no cell contains it
+        """
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        result = np.full(len(xs), -1, dtype=np.int64)
+        if len(self.boxes) == 0 or len(xs) == 0:
+            return result
+
+        buckets, valid = self._bucket_of(xs, ys)
+        if len(xs) < VECTORIZE_MIN_POINTS:
+            return self._locate_loop(xs, ys, buckets, valid, inclusive, result)
+        return self._locate_vectorized(xs, ys, buckets, valid, inclusive, result)
+
+    def _locate_loop(self, xs, ys, buckets, valid, inclusive, result) -> np.ndarray:
+        """Per-point lookup for small queries"""
+        boxes = self.boxes.tolist()
+        starts = self._starts.tolist()
+        members = self._members.tolist()
+        for i, (x, y, bucket, ok) in enumerate(zip(xs.tolist(), ys.tolist(), buckets.tolist(), valid.tolist())):
+            if not ok:
+                continue
+            for cell in members[starts[bucket]:starts[bucket + 1]]:
+                x1, y1, x2, y2 = boxes[cell]
+                if inclusive:
+                    inside = x1 <= x <= x2 and y1 <= y <= y2
+                else:
+                    inside = x1 <= x < x2 and y1 <= y < y2
+                if inside:
+                    result[i] = cell
+                    break
+        return result
+
+    def _locate_vectorized(self, xs, ys, buckets, valid, inclusive, result) -> np.ndarray:
+        """Lookup for large queries: expand every point into its bucket's candidates at once"""
+        counts = np.where(valid, self._starts[buckets + 1] - self._starts[buckets], 0)
+        total = int(counts.sum())
+        if total == 0:
+            return result
+
+        point = np.repeat(np.arange(len(xs)), counts)
+        # Position of each candidate within its bucket's member list
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell = self._members[self._starts[buckets[point]] + offsets]
+
+        box = self.boxes[cell]
+        px, py = xs[point], ys[point]
+        if inclusive:
+            inside = (px >= box[:, 0]) & (px <= box[:, 2]) & (py >= box[:, 1]) & (py <= box[:, 3])
+        else:
+            inside = (px >= box[:, 0]) & (px < box[:, 2]) & (py >= box[:, 1]) & (py < box[:, 3])
+
+        # Candidates are grouped by point and in cell order within a point,
+        # so each point's first hit is the lowest containing cell index
+        hit_point, hit_cell = point[inside], cell[inside]
+        points, first_hit = np.unique(hit_point, return_index=True)
+        result[points] = hit_cell[first_hit]
+        return result
+
+    def assign_boxes(self, boxes: np.ndarray, inclusive: bool = False) -> np.ndarray:
+        """
+        Assign boxes to the cell containing their center
+
+        Args:
+            boxes: N x 4 array of (x1, y1, x2, y2)
+            inclusive: See locate
+
+        Returns:
+            Cell index per box, -1 where no cell contains its center
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        return self.locate((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2, inclusive)
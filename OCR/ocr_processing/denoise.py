@@ -0,0 +1,184 @@
+"""
+Tiered Denoising
+Chooses the cheapest denoiser that suits a page's noise level and fits its time budget
+"""
+import cv2
+import numpy as np
+import logging
+import time
+from typing import Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Tiers from cheapest to most expensive
+TIER_SKIP = "skip"
+TIER_MEDIAN = "median"
+TIER_BILATERAL = "bilateral"
+TIER_NLM_DOWNSCALED = "nlm_downscaled"
+TIER_NLM_FULL = "nlm_full"
+TIERS = [TIER_SKIP, TIER_MEDIAN, TIER_BILATERAL, TIER_NLM_DOWNSCALED, TIER_NLM_FULL]
+
+# Upper noise level (see estimate_noise) each tier is chosen for
+NOISE_THRESHOLDS = [
+    (5.0, TIER_SKIP),
+    (8.0, TIER_MEDIAN),
+    (11.0, TIER_BILATERAL),
+    (15.0, TIER_NLM_DOWNSCALED),
+]
+
+# Approximate single-core cost in milliseconds per megapixel of the page,
+# used to predict whether a tier fits the remaining budget (measured on
+# 1-9MP pages; the downscaled NL-means tier filters a quarter of the pixels)
+TIER_COST_MS_PER_MP = {
+    TIER_SKIP: 0.0,
+    TIER_MEDIAN: 0.3,
+    TIER_BILATERAL: 3.5,
+    TIER_NLM_DOWNSCALED: 260.0,
+    TIER_NLM_FULL: 1000.0,
+}
+
+# Lets the downscaled NL-means tier run on pages up to about 11.5MP, so an A4
+# page at 300 DPI (8.7MP) can still get it; full NL-means stays limited to ~3MP
+DEFAULT_BUDGET_MS = 3000.0
+
+
+@dataclass
+class DenoiseResult:
+    """Denoised image plus the tier used and what it cost"""
+    image: np.ndarray
+    tier: str
+    elapsed_ms: float
+    noise_level: float
+    requested_tier: str  # Tier the noise level called for, before the budget was applied
+
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """Estimate noise level using median absolute deviation"""
+    H, W = gray.shape
+    M = [[1, -2, 1],
+         [-2, 4, -2],
+         [1, -2, 1]]
+    sigma = np.sum(np.sum(np.absolute(cv2.filter2D(gray, -1, np.array(M)))))
+    sigma = sigma * np.sqrt(0.5 * np.pi) / (6 * (W-2) * (H-2))
+    return sigma
+
+
+def tier_for_noise(noise_level: float) -> str:
+    """Map a noise estimate to the tier it calls for"""
+    for threshold, tier in NOISE_THRESHOLDS:
+        if noise_level < threshold:
+            return tier
+    return TIER_NLM_FULL
+
+
+def get_denoise_budget_ms() -> float:
+    """Per-page denoising time budget from settings"""
+    from ocr_processing.ocr_core import get_ocr_setting
+    return float(get_ocr_setting('OCR_DENOISE_BUDGET_MS', DEFAULT_BUDGET_MS))
+
+
+def choose_tier(noise_level: float, megapixels: float, budget_ms: float) -> str:
+    """
+    Pick the tier for a page, stepping down until its predicted cost fits the budget
+
+    Args:
+        noise_level: Estimate from estimate_noise
+        megapixels: Page size in megapixels
+        budget_ms: Time allowed for denoising this page
+
+    Returns:
+        Tier name
+    """
+    tier = tier_for_noise(noise_level)
+    index = TIERS.index(tier)
+    while index > 0 and TIER_COST_MS_PER_MP[TIERS[index]] * megapixels > budget_ms:
+        index -= 1
+    return TIERS[index]
+
+
+def strength_for_noise(noise_level: float) -> float:
+    """NL-means filter strength for a noise estimate"""
+    return 15 if noise_level >= 15 else 10
+
+
+def apply_tier(gray: np.ndarray, tier: str, strength: float = 10,
+               dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Run one denoising tier
+
+    Args:
+        gray: Grayscale image
+        tier: Tier name
+        strength: NL-means filter strength (h)
+        dst: Optional preallocated output (must not be gray)
+
+    Returns:
+        Denoised image (the input itself for TIER_SKIP, dst when given)
+    """
+    if tier == TIER_SKIP:
+        return gray
+    if tier == TIER_MEDIAN:
+        return cv2.medianBlur(gray, 3, dst=dst)
+    if tier == TIER_BILATERAL:
+        return cv2.bilateralFilter(gray, 5, 50, 50, dst=dst)
+    if tier == TIER_NLM_DOWNSCALED:
+        height, width = gray.shape[:2]
+        small = cv2.resize(gray, (max(1, width // 2), max(1, height // 2)), interpolation=cv2.INTER_AREA)
+        small = cv2.fastNlMeansDenoising(small, None, h=strength, templateWindowSize=7, searchWindowSize=21)
+        return cv2.resize(small, (width, height), dst=dst, interpolation=cv2.INTER_CUBIC)
+    if tier == TIER_NLM_FULL:
+        return cv2.fastNlMeansDenoising(gray, dst, h=strength, templateWindowSize=7, searchWindowSize=21)
+    raise ValueError(f"Unknown denoise tier: {tier}")
+
+
+def denoise_tiered(gray: np.ndarray, noise_level: Optional[float] = None,
+                   budget_ms: Optional[float] = None,
+                   dst: Optional[np.ndarray] = None,
+                   tier: Optional[str] = None) -> DenoiseResult:
+    """
+    Denoise a page with the tier its noise level calls for, within a time budget
+
+    Clean scans are returned untouched; NL-means only runs on pages noisy
+    enough to need it and small enough to afford it.
+
+    Args:
+        gray: Grayscale image
+        noise_level: Precomputed estimate_noise value (computed if None)
+        budget_ms: Time budget in milliseconds (OCR_DENOISE_BUDGET_MS if None)
+        dst: Optional preallocated output (must not be gray)
+        tier: Use this tier instead of choosing one (e.g. from a template's
+            processing profile); the budget is not applied
+
+    Returns:
+        DenoiseResult with the image, tier and elapsed time
+    """
+    start = time.perf_counter()
+    if noise_level is None:
+        noise_level = estimate_noise(gray)
+    if budget_ms is None:
+        budget_ms = get_denoise_budget_ms()
+
+    if tier is not None:
+        requested = tier
+    else:
+        requested = tier_for_noise(noise_level)
+        remaining = budget_ms - (time.perf_counter() - start) * 1000
+        tier = choose_tier(noise_level, gray.size / 1e6, remaining)
+    strength = strength_for_noise(noise_level)
+
+    image = apply_tier(gray, tier, strength, dst)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if tier != requested:
+        logger.info(f"Denoising: noise {noise_level:.2f} calls for {requested}, "
+                    f"using {tier} to stay within {budget_ms:.0f}ms")
+    logger.info(f"Denoising applied ({tier}, noise level: {noise_level:.2f}, {elapsed_ms:.1f}ms)")
+
+    return DenoiseResult(
+        image=image,
+        tier=tier,
+        elapsed_ms=elapsed_ms,
+        noise_level=float(noise_level),
+        requested_tier=requested
+    )
@@ -0,0 +1,128 @@
+"""
+Skew Estimation
+Fast document skew estimator shared by the basic and smart preprocessors
+"""
+import cv2
+import numpy as np
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Long side of the thumbnail the angle is measured on
+THUMBNAIL_SIZE = 800
+
+# Upper bound on foreground pixels used for the projection profiles
+MAX_SAMPLE_POINTS = 20000
+
+# Thumbnail binarization neighbourhood and offset
+ADAPTIVE_BLOCK_SIZE = 31
+ADAPTIVE_OFFSET = 15
+
+# Search range and steps in degrees
+DEFAULT_MAX_ANGLE = 45.0
+COARSE_STEP = 0.5
+FINE_STEP = 0.05
+
+# The best angle must beat the average profile score by this factor,
+# otherwise the page has no dominant text direction (photo, blank page)
+MIN_SCORE_RATIO = 1.5
+
+
+def _binarized_thumbnail(gray: np.ndarray, size: int) -> np.ndarray:
+    """Downsample and binarize so that text pixels are 255"""
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape[:2]
+    scale = size / max(height, width)
+    if scale < 1.0:
+        gray = cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))),
+                          interpolation=cv2.INTER_AREA)
+    # Local threshold so shadows and uneven lighting do not turn into foreground
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                 ADAPTIVE_BLOCK_SIZE, ADAPTIVE_OFFSET)
+
+
+def _profile_scores(xs: np.ndarray, ys: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """
+    Score how sharply rows of text line up for each candidate angle
+
+    Points are projected onto the axis perpendicular to the candidate text
+    direction; the sum of squared differences between neighbouring histogram
+    bins peaks when text lines fall into as few rows as possible.
+    """
+    radians = np.radians(angles)
+    scores = np.empty(len(angles))
+    for i, theta in enumerate(radians):
+        projected = ys * np.cos(theta) - xs * np.sin(theta)
+        bins = (projected - projected.min()).astype(np.int32)
+        hist = np.bincount(bins).astype(np.float64)
+        scores[i] = np.sum(np.diff(hist) ** 2)
+    return scores
+
+
+def estimate_skew_angle(gray: np.ndarray, max_angle: float = DEFAULT_MAX_ANGLE,
+                        thumbnail_size: int = THUMBNAIL_SIZE) -> float:
+    """
+    Estimate document skew with a projection profile on a binarized thumbnail
+
+    Only a downsampled copy is thresholded and only a bounded sample of its
+    foreground pixels is projected, so cost is independent of page resolution.
+
+    Args:
+        gray: Grayscale (or BGR) page image, dark text on light background
+        max_angle: Largest skew in degrees to search for
+        thumbnail_size: Long side of the working thumbnail
+
+    Returns:
+        Correction angle in degrees, in cv2.getRotationMatrix2D convention
+        (rotating the page by this angle straightens it); 0.0 if undetermined
+    """
+    binary = _binarized_thumbnail(gray, thumbnail_size)
+    ys, xs = np.nonzero(binary)
+    if len(xs) < 100:
+        return 0.0
+
+    # Mostly-dark thumbnails are photos or inverted pages, not text
+    if len(xs) > binary.size * 0.5:
+        return 0.0
+
+    rng = np.random.default_rng(0)
+    if len(xs) > MAX_SAMPLE_POINTS:
+        keep = rng.choice(len(xs), MAX_SAMPLE_POINTS, replace=False)
+        xs, ys = xs[keep], ys[keep]
+    # Jitter within each pixel so the integer grid does not alias into the
+    # histogram at angles like 45 degrees
+    xs = xs + rng.uniform(-0.5, 0.5, len(xs))
+    ys = ys + rng.uniform(-0.5, 0.5, len(ys))
+
+    coarse = np.arange(-max_angle, max_angle + COARSE_STEP / 2, COARSE_STEP)
+    coarse_scores = _profile_scores(xs, ys, coarse)
+    best = int(np.argmax(coarse_scores))
+    if coarse_scores[best] < coarse_scores.mean() * MIN_SCORE_RATIO:
+        return 0.0
+
+    fine = np.arange(coarse[best] - COARSE_STEP, coarse[best] + COARSE_STEP + FINE_STEP / 2, FINE_STEP)
+    fine_scores = _profile_scores(xs, ys, fine)
+    return round(float(fine[int(np.argmax(fine_scores))]), 2)
+
+
+def rotate_image(image: np.ndarray, angle: float, border_value: Optional[int] = None) -> np.ndarray:
+    """
+    Rotate an image about its center, keeping its size
+
+    Args:
+        image: Input image
+        angle: Angle in degrees (cv2.getRotationMatrix2D convention)
+        border_value: Constant fill for uncovered corners; replicates edges when None
+
+    Returns:
+        Rotated image
+    """
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
+    if border_value is None:
+        return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_CUBIC,
+                              borderMode=cv2.BORDER_REPLICATE)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_CUBIC,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=border_value)
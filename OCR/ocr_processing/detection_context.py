@@ -0,0 +1,258 @@
+"""
+Detection Context
+Per-page memo of intermediate results (binarized images, line masks, contours,
+OCR word boxes) shared by the table detection strategies
+"""
+import cv2
+import threading
+import numpy as np
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from ocr_processing.line_params import LineParams, line_params, reduce_binary
+from ocr_processing.tesseract_backend import get_tesseract_backend
+
+logger = logging.getLogger(__name__)
+
+# Binarizations binary() can hand to the line-based strategies
+BINARIZATION_ADAPTIVE = "adaptive"
+BINARIZATION_OTSU = "otsu"
+
+
+# Settings the intermediates requested on each thread were built with, see track_settings()
+_settings = threading.local()
+
+
+@contextmanager
+def track_settings() -> Iterator[Dict[str, Any]]:
+    """
+    Record the detection settings used by the calling thread's requests
+
+    Every intermediate a DetectionContext hands out while the block runs
+    adds the settings it was built with to the yielded dictionary:
+    'binarization' (the thresholding mode of the binary image it derives
+    from) and 'line_kernel' (the ruling kernel length in working pixels).
+    Strategies run on one thread each, so this tells which settings a
+    strategy's result actually depends on.
+    """
+    previous = getattr(_settings, 'used', None)
+    _settings.used = used = {}
+    try:
+        yield used
+    finally:
+        _settings.used = previous
+
+
+def _note_settings(**settings: Any) -> None:
+    """Add settings to the dictionary of the enclosing track_settings(), if any"""
+    used = getattr(_settings, 'used', None)
+    if used is not None:
+        used.update(settings)
+
+
+class DetectionCancelled(Exception):
+    """Raised to a strategy that asks for an intermediate after its context was cancelled"""
+
+
+class _Failure:
+    """Marks an intermediate whose computation raised, so it is not retried"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class DetectionContext:
+    """
+    Lazily computed intermediates for one preprocessed page
+
+    Every value is computed at most once, on first request, and then handed
+    to every strategy that asks for it. Strategies run on several threads, so
+    a value requested while another thread is still computing it waits for
+    that computation instead of repeating it. Failures are cached as well
+    and re-raised to later callers. Cached values are shared: callers must
+    not modify them in place.
+
+    Once cancelled (e.g. because another strategy was confident enough),
+    every further request raises DetectionCancelled, so strategies still
+    running stop at their next stage instead of finishing unwanted work.
+    """
+
+    def __init__(self, image: np.ndarray, binarization: str = BINARIZATION_ADAPTIVE,
+                 params: Optional[LineParams] = None, tesseract_backend=None,
+                 cancelled: Optional[threading.Event] = None):
+        """
+        Args:
+            image: Preprocessed grayscale page the strategies work on
+            binarization: What binary() returns, BINARIZATION_ADAPTIVE or BINARIZATION_OTSU
+            params: Line parameters of the whole page when image is a crop of it
+                (from the image size if None)
+            tesseract_backend: Backend word_data() runs Tesseract with
+                (the process-wide OCR_TESSERACT_BACKEND if None)
+            cancelled: Event that cancels the context when set (a new one if None)
+        """
+        self.image = image
+        self.binarization = binarization
+        self.params = params or line_params(image.shape)
+        self.tesseract_backend = tesseract_backend
+        self.cancelled = cancelled or threading.Event()
+        self._values: Dict[Hashable, Any] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """Stop strategies using this context at their next stage"""
+        self.cancelled.set()
+
+    def check_cancelled(self) -> None:
+        """Raise DetectionCancelled if the context was cancelled"""
+        if self.cancelled.is_set():
+            raise DetectionCancelled()
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing it if this is the first request
+
+        Args:
+            key: Cache key (unique per kind of intermediate and its parameters)
+            compute: Builds the value
+
+        Returns:
+            The cached value
+
+        Raises:
+            DetectionCancelled: The context was cancelled
+        """
+        self.check_cancelled()
+        with self._lock:
+            if key not in self._values:
+                key_lock = self._locks.setdefault(key, threading.Lock())
+            else:
+                key_lock = None
+
+        if key_lock is not None:
+            with key_lock:
+                with self._lock:
+                    computed = key in self._values
+                if not computed:
+                    try:
+                        value = compute()
+                    except Exception as e:
+                        value = _Failure(e)
+                    with self._lock:
+                        self._values[key] = value
+
+        value = self._values[key]
+        if isinstance(value, _Failure):
+            raise value.error
+        return value
+
+    def binary(self) -> np.ndarray:
+        """
+        Inverted binarization the line-based strategies work on
+
+        Adaptive (Gaussian), as TableDetector.preprocess_image, unless the
+        context was created for Otsu binarization.
+        """
+        _note_settings(binarization=self.binarization)
+        if self.binarization == BINARIZATION_OTSU:
+            return self.otsu_binary()
+
+        def compute():
+            from ocr_processing.table_detector import TableDetector
+            return TableDetector().preprocess_image(self.image, self.params)
+        return self.memo('binary', compute)
+
+    def reduced_binary(self) -> np.ndarray:
+        """binary() reduced by params.factor, the scale rulings are detected at"""
+        _note_settings(binarization=self.binarization)
+        return self.memo('reduced_binary', lambda: reduce_binary(self.binary(), self.params.factor))
+
+    def otsu_binary(self) -> np.ndarray:
+        """Global Otsu inverted binarization"""
+        _note_settings(binarization=BINARIZATION_OTSU)
+
+        def compute():
+            _, binary = cv2.threshold(self.image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+            return binary
+        return self.memo('otsu_binary', compute)
+
+    def line_masks(self, kernel_length: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Horizontal and vertical ruling masks from morphological opening of reduced_binary()
+
+        Args:
+            kernel_length: Length of the line-shaped structuring elements in
+                working pixels (params.kernel_length if None)
+
+        Returns:
+            Tuple of (horizontal_mask, vertical_mask), at detection scale
+            (1 / params.factor of the image)
+        """
+        _note_settings(binarization=self.binarization, line_kernel=kernel_length or self.params.kernel_length)
+        kernel_length = self.params.reduced(kernel_length or self.params.kernel_length)
+
+        def compute():
+            binary = self.reduced_binary()
+            h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_length, 1))
+            v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, kernel_length))
+            return (
+                cv2.morphologyEx(binary, cv2.MORPH_OPEN, h_kernel, iterations=2),
+                cv2.morphologyEx(binary, cv2.MORPH_OPEN, v_kernel, iterations=2),
+            )
+        return self.memo(('line_masks', kernel_length), compute)
+
+    def line_boxes(self, kernel_length: Optional[int] = None) -> Tuple[List[Tuple[int, int, int, int]],
+                                                                   List[Tuple[int, int, int, int]]]:
+        """
+        Bounding boxes (x, y, w, h) of the external contours of line_masks()
+
+        Returns:
+            Tuple of (horizontal_boxes, vertical_boxes) in image pixels
+        """
+        kernel_length = kernel_length or self.params.kernel_length
+        _note_settings(binarization=self.binarization, line_kernel=kernel_length)
+        factor = self.params.factor
+
+        def compute():
+            boxes = []
+            for mask in self.line_masks(kernel_length):
+                contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                boxes.append([(x * factor + factor // 2, y * factor + factor // 2, w * factor, h * factor)
+                              for x, y, w, h in map(cv2.boundingRect, contours)])
+            return tuple(boxes)
+        return self.memo(('line_boxes', kernel_length), compute)
+
+    def projection_lines(self) -> Tuple[List[int], List[int]]:
+        """Ruling positions from the ink projections of binary()"""
+        _note_settings(binarization=self.binarization)
+
+        def compute():
+            from ocr_processing.projection import find_rulings
+            return find_rulings(self.binary())
+        return self.memo('projection_lines', compute)
+
+    def region_contours(self) -> Tuple[np.ndarray, ...]:
+        """Full contour hierarchy (RETR_TREE) of otsu_binary()"""
+        _note_settings(binarization=BINARIZATION_OTSU)
+
+        def compute():
+            contours, _ = cv2.findContours(self.otsu_binary(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+            return contours
+        return self.memo('region_contours', compute)
+
+    def hough_lines(self) -> Tuple[List[int], List[int]]:
+        """Line positions from TableDetector.detect_grid_with_hough on reduced_binary()"""
+        _note_settings(binarization=self.binarization)
+
+        def compute():
+            from ocr_processing.table_detector import TableDetector
+            return TableDetector().detect_grid_with_hough(self.reduced_binary(), self.params, reduced=True)
+        return self.memo('hough_lines', compute)
+
+    def word_data(self) -> Dict[str, List]:
+        """Tesseract word boxes (image_to_data dictionary) for the whole page"""
+        def compute():
+            backend = self.tesseract_backend or get_tesseract_backend()
+            return backend.image_to_data(self.image)
+        return self.memo('word_data', compute)
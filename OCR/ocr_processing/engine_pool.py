@@ -0,0 +1,169 @@
+"""
+OCR Engine Pool
+Process-wide registry of warm OCREngine instances shared across requests
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from ocr_processing.ocr_core import OCREngine, get_ocr_setting
+
+logger = logging.getLogger(__name__)
+
+# Default number of engines kept warm per backend in each worker process
+DEFAULT_POOL_SIZE = 2
+
+
+class OCREnginePool:
+    """
+    Fixed-size pool of initialized OCREngine instances for one backend
+
+    Engines are created once, on first use (or on explicit warm-up), and then
+    handed out round-robin. OCREngine serializes access to the EasyOCR model
+    internally, so the pool size bounds how many EasyOCR inferences can run at
+    once; Tesseract calls are independent and can share any engine.
+    """
+
+    def __init__(self, preferred_engine: str = "tesseract", size: int = DEFAULT_POOL_SIZE):
+        self.preferred_engine = preferred_engine
+        self.size = max(1, int(size))
+        self._engines: List[OCREngine] = []
+        self._lock = threading.Lock()
+        self._cycle = None
+        self._init_seconds = 0.0
+        self._checkouts = 0
+        self._error: Optional[str] = None
+
+    @property
+    def is_warm(self) -> bool:
+        """True once every engine in the pool has been initialized"""
+        return len(self._engines) == self.size
+
+    def warm_up(self) -> None:
+        """Initialize all engines in the pool (no-op if already warm)"""
+        if self.is_warm:
+            return
+
+        with self._lock:
+            if self.is_warm:
+                return
+
+            start = time.perf_counter()
+            try:
+                while len(self._engines) < self.size:
+                    self._engines.append(OCREngine(
+                        self.preferred_engine,
+                        tesseract_backend=get_ocr_setting('OCR_TESSERACT_BACKEND', 'pytesseract')
+                    ))
+                self._error = None
+            except Exception as e:
+                self._error = str(e)
+                logger.error(f"Failed to initialize {self.preferred_engine} engine pool: {e}")
+                raise
+            finally:
+                self._init_seconds += time.perf_counter() - start
+
+            self._cycle = itertools.cycle(self._engines)
+            logger.info(
+                f"Warmed {self.preferred_engine} engine pool: "
+                f"{self.size} engine(s) in {self._init_seconds:.2f}s"
+            )
+
+    def get_engine(self) -> OCREngine:
+        """
+        Get a warm engine from the pool
+
+        Returns:
+            Initialized OCREngine instance
+        """
+        self.warm_up()
+        with self._lock:
+            self._checkouts += 1
+            return next(self._cycle)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Report health and warm status of the pool
+
+        Returns:
+            Dictionary with pool size, warm state and backend availability
+        """
+        engine = self._engines[0] if self._engines else None
+        return {
+            'engine': self.preferred_engine,
+            'size': self.size,
+            'initialized': len(self._engines),
+            'warm': self.is_warm,
+            'init_seconds': round(self._init_seconds, 3),
+            'checkouts': self._checkouts,
+            'tesseract_available': engine.tesseract_available if engine else None,
+            'tesseract_backend': engine.tesseract_backend.name if engine else None,
+            'easyocr_loaded': (engine.easyocr_reader is not None) if engine else None,
+            'healthy': self._error is None and (
+                engine is None or engine.tesseract_available or engine.easyocr_reader is not None
+            ),
+            'error': self._error,
+        }
+
+
+_pools: Dict[str, OCREnginePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_engine_pool(preferred_engine: Optional[str] = None) -> OCREnginePool:
+    """
+    Get the process-wide pool for an OCR backend, creating it if needed
+
+    Args:
+        preferred_engine: "tesseract" or "easyocr" (defaults to OCR_DEFAULT_ENGINE)
+
+    Returns:
+        OCREnginePool shared by all threads in this worker
+    """
+    preferred_engine = preferred_engine or get_ocr_setting('OCR_DEFAULT_ENGINE', 'tesseract')
+
+    pool = _pools.get(preferred_engine)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(preferred_engine)
+            if pool is None:
+                pool = OCREnginePool(
+                    preferred_engine,
+                    size=get_ocr_setting('OCR_ENGINE_POOL_SIZE', DEFAULT_POOL_SIZE)
+                )
+                _pools[preferred_engine] = pool
+    return pool
+
+
+def get_ocr_engine(preferred_engine: Optional[str] = None) -> OCREngine:
+    """
+    Get a warm, shared OCREngine instead of constructing one per request
+
+    Args:
+        preferred_engine: "tesseract" or "easyocr" (defaults to OCR_DEFAULT_ENGINE)
+
+    Returns:
+        Initialized OCREngine instance
+    """
+    return get_engine_pool(preferred_engine).get_engine()
+
+
+def warm_up_engines(engines: Optional[List[str]] = None) -> None:
+    """
+    Initialize engine pools ahead of the first request
+
+    Args:
+        engines: Backends to warm (defaults to OCR_DEFAULT_ENGINE)
+    """
+    for name in engines or [get_ocr_setting('OCR_DEFAULT_ENGINE', 'tesseract')]:
+        try:
+            get_engine_pool(name).warm_up()
+        except Exception as e:
+            logger.warning(f"Could not warm up {name} engine pool: {e}")
+
+
+def engine_pool_status() -> Dict[str, Any]:
+    """Get status of every engine pool created in this worker"""
+    return {name: pool.status() for name, pool in list(_pools.items())}
@@ -3,15 +3,57 @@ Enhanced Table Detector with Multiple Strategies
 Handles complex real-world documents including handwritten tables
 """
 import cv2
+import time
+import threading
 import numpy as np
-import pytesseract
-from typing import List, Dict, Tuple, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 import logging
 from ocr_processing.smart_preprocessor import SmartImagePreprocessor, ImageQualityMetrics
+from ocr_processing.detection_context import DetectionContext, DetectionCancelled, BINARIZATION_ADAPTIVE, track_settings
+from ocr_processing.cell_index import CellIndex
+from ocr_processing.result_cache import cached_call
+from ocr_processing.tesseract_backend import tesseract_cache_config
+from ocr_processing.resolution import load_normalized, cells_to_original, ResolutionInfo
+from ocr_processing.table_regions import TableRegion, localize_tables, map_regions, get_localization_settings
+from ocr_processing.line_params import LineParams, line_params, get_line_detection_settings
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STRATEGY_WORKERS = 3
+
+# Strategies cheap enough to run before the others are started; they build
+# grids without text, which _detect_in_regions reads when one of them wins
+FIRST_PASS_METHODS = ("projection",)
+DEFAULT_EARLY_EXIT_CONFIDENCE = 85.0
+
+_strategy_pool: Optional[ThreadPoolExecutor] = None
+_strategy_pool_lock = threading.Lock()
+
+
+def get_strategy_settings() -> Tuple[int, Optional[float]]:
+    """
+    Read strategy concurrency settings
+    
+    Returns:
+        Tuple of (workers, early-exit confidence or None when early exit is disabled)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    workers = int(get_ocr_setting('OCR_TABLE_STRATEGY_WORKERS', DEFAULT_STRATEGY_WORKERS))
+    threshold = get_ocr_setting('OCR_TABLE_EARLY_EXIT_CONFIDENCE', DEFAULT_EARLY_EXIT_CONFIDENCE)
+    return max(1, workers), (float(threshold) if threshold is not None else None)
+
+
+def _get_strategy_pool(workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool the detection strategies run on"""
+    global _strategy_pool
+    if _strategy_pool is None:
+        with _strategy_pool_lock:
+            if _strategy_pool is None:
+                _strategy_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table-strategy")
+    return _strategy_pool
+
 
 @dataclass
 class DetectionStrategy:
@@ -20,6 +62,10 @@ class DetectionStrategy:
     confidence: float
     cells_found: int
     method: str
+    elapsed_ms: float = 0.0  # Time the strategy took
+    denoise_tier: Optional[str] = None  # Denoise tier the page was preprocessed with
+    line_kernel: Optional[int] = None  # Ruling kernel length (working pixels) the result was built with
+    binarization: Optional[str] = None  # Thresholding mode the result was built from
 
 
 class EnhancedTableDetector:
@@ -28,172 +74,444 @@ class EnhancedTableDetector:
     Tries multiple approaches and selects the best result
     """
     
-    def __init__(self, ocr_engine=None):
+    def __init__(self, ocr_engine=None, line_kernel: Optional[int] = None,
+                 binarization: str = BINARIZATION_ADAPTIVE):
+        """
+        Args:
+            ocr_engine: Optional OCR engine instance
+            line_kernel: Ruling kernel length in working pixels (relative to
+                the page size if None, see LineParams.kernel_length)
+            binarization: Binarization the line-based strategies use
+        """
         self.ocr_engine = ocr_engine
+        self.line_kernel = line_kernel
+        self.binarization = binarization
+        # Line parameters of the page being detected, shared by its table crops
+        self.line_params: Optional[LineParams] = None
         self.preprocessor = SmartImagePreprocessor()
         self.strategies = []
+        self.tables = []
+    
+    def _new_context(self, image: np.ndarray, cancelled: Optional[threading.Event] = None) -> DetectionContext:
+        """Detection context for a preprocessed page (or table crop) with this detector's settings"""
+        backend = self.ocr_engine.tesseract_backend if self.ocr_engine else None
+        return DetectionContext(image, self.binarization, self.line_params, backend, cancelled)
+    
+    def _cache_config(self, **extra: Any) -> Dict[str, Any]:
+        """Result-cache configuration of this detector's settings"""
+        config = self.ocr_engine.cache_config() if self.ocr_engine else tesseract_cache_config()
+        enabled, size, _ = get_localization_settings()
+        return dict(config, line_kernel=self.line_kernel, binarization=self.binarization,
+                    localization=size if enabled else None,
+                    line_detection=list(get_line_detection_settings()), **extra)
         
     def detect_with_multiple_strategies(self, image_path: str) -> Tuple[Optional[Any], DetectionStrategy]:
         """
         Try multiple detection strategies and return the best result
         
+        Tables are localized on a thumbnail first and the strategies run
+        inside each table's crop. With several tables on the page the one
+        with the most cells is returned; all of them are kept in self.tables.
+        
         Args:
             image_path: Path to image file
             
         Returns:
             Tuple of (best_table_structure, strategy_info)
         """
+        # Early exit can change which strategy wins
+        config = self._cache_config(early_exit_confidence=get_strategy_settings()[1])
+        best_result, best_strategy, self.strategies, self.tables = cached_call(
+            image_path, "enhanced_table_structure", config,
+            lambda: self._detect_uncached(image_path),
+            # Only cache successful detections
+            is_cacheable=lambda result: result[0] is not None
+        )
+        return best_result, best_strategy
+    
+    def _detect_uncached(self, image_path: str) -> Tuple[Optional[Any], DetectionStrategy, List[DetectionStrategy],
+                                                         List[Tuple[Any, DetectionStrategy]]]:
+        """Run every strategy without consulting the result cache"""
         logger.info("=== Starting multi-strategy table detection ===")
         
-        # Load image
-        image = cv2.imread(image_path)
+        # Load image at working resolution
+        image, resolution = load_normalized(image_path)
         if image is None:
             raise ValueError(f"Could not load image: {image_path}")
         
         # Preprocess image
         preprocessed, metrics = self.preprocessor.preprocess_for_table_detection(image)
+        self.line_params = line_params(image.shape)
         
-        results = []
+        tables = self._detect_in_regions(
+            preprocessed, image, resolution,
+            lambda region_preprocessed, region_original: self._run_strategies(
+                region_preprocessed, region_original, metrics)
+        )
         
-        # Strategy 1: Morphology-based detection (good for clear borders)
-        logger.info("\n--- Strategy 1: Morphology-based detection ---")
-        try:
-            result1 = self._detect_morphology(preprocessed)
-            if result1:
-                confidence1 = self._calculate_confidence(result1, metrics)
-                results.append((result1, DetectionStrategy(
-                    name="Morphology",
-                    confidence=confidence1,
-                    cells_found=len(result1.cells) if hasattr(result1, 'cells') else 0,
-                    method="morphology"
-                )))
-                logger.info(f"[OK] Morphology: {len(result1.cells)} cells, confidence: {confidence1:.1f}%")
-        except Exception as e:
-            logger.warning(f"[FAILED] Morphology failed: {e}")
+        # Select best result
+        if not tables:
+            logger.error("[ERROR] All detection strategies failed")
+            return None, DetectionStrategy("None", 0, 0, "none"), [], []
         
-        # Strategy 2: Contour-based detection (good for varying borders)
-        logger.info("\n--- Strategy 2: Contour-based detection ---")
-        try:
-            result2 = self._detect_contours(preprocessed)
-            if result2:
-                confidence2 = self._calculate_confidence(result2, metrics)
-                results.append((result2, DetectionStrategy(
-                    name="Contours",
-                    confidence=confidence2,
-                    cells_found=len(result2.cells) if hasattr(result2, 'cells') else 0,
-                    method="contours"
-                )))
-                logger.info(f"[OK] Contours: {len(result2.cells)} cells, confidence: {confidence2:.1f}%")
-        except Exception as e:
-            logger.warning(f"[FAILED] Contours failed: {e}")
+        best_result, best_strategy, strategies = max(tables, key=lambda table: len(table[0].cells))
         
-        # Strategy 3: Hough Lines (good for clean straight lines)
-        logger.info("\n--- Strategy 3: Hough Lines detection ---")
-        try:
-            result3 = self._detect_hough_lines(preprocessed)
-            if result3:
-                confidence3 = self._calculate_confidence(result3, metrics)
-                results.append((result3, DetectionStrategy(
-                    name="Hough Lines",
-                    confidence=confidence3,
-                    cells_found=len(result3.cells) if hasattr(result3, 'cells') else 0,
-                    method="hough"
-                )))
-                logger.info(f"[OK] Hough: {len(result3.cells)} cells, confidence: {confidence3:.1f}%")
-        except Exception as e:
-            logger.warning(f"[FAILED] Hough failed: {e}")
+        logger.info(f"\n[WINNER] Best strategy: {best_strategy.name} "
+                   f"(confidence: {best_strategy.confidence:.1f}%, "
+                   f"cells: {best_strategy.cells_found})")
         
-        # Strategy 4: Text-block clustering (good for borderless tables)
-        logger.info("\n--- Strategy 4: Text-block clustering ---")
-        try:
-            result4 = self._detect_text_blocks(preprocessed)
-            if result4:
-                confidence4 = self._calculate_confidence(result4, metrics)
-                results.append((result4, DetectionStrategy(
-                    name="Text Blocks",
-                    confidence=confidence4,
-                    cells_found=len(result4.cells) if hasattr(result4, 'cells') else 0,
-                    method="textblocks"
-                )))
-                logger.info(f"[OK] Text blocks: {len(result4.cells)} cells, confidence: {confidence4:.1f}%")
-        except Exception as e:
-            logger.warning(f"[FAILED] Text blocks failed: {e}")
+        # Return all strategies for analysis
+        return best_result, best_strategy, strategies, [(result, strategy) for result, strategy, _ in tables]
+    
+    def _detect_in_regions(
+        self,
+        preprocessed: np.ndarray,
+        original: np.ndarray,
+        resolution: Optional[ResolutionInfo],
+        detect: Callable[[np.ndarray, np.ndarray], List[Tuple[Any, DetectionStrategy]]]
+    ) -> List[Tuple[Any, DetectionStrategy, List[DetectionStrategy]]]:
+        """
+        Localize the tables of a page and run detect on each table's crop, in parallel
+        
+        Args:
+            preprocessed: Preprocessed page at working resolution
+            original: Page at working resolution
+            resolution: ResolutionInfo of the page, if it was resampled
+            detect: Runs strategies on (preprocessed crop, original crop) and
+                returns (result, strategy_info) for those that found a table
+        
+        Returns:
+            (best result, its strategy_info, every successful strategy_info)
+            per table, top to bottom, in original page coordinates; a best
+            result without any cell text has its cells read first
+        """
+        from ocr_processing.table_detector import TableDetector
+        
+        def run(region: TableRegion) -> Optional[Tuple[Any, DetectionStrategy, List[DetectionStrategy]]]:
+            results = detect(region.crop(preprocessed), region.crop(original))
+            if not results:
+                return None
+            # Highest confidence, earliest in plan order on ties
+            results.sort(key=lambda x: x[1].confidence, reverse=True)
+            best_result, best_strategy = results[0]
+            region.to_page(best_result.cells)
+            if any(cell.text for cell in best_result.cells):
+                # Store coordinates in original pixel space
+                cells_to_original(best_result.cells, resolution)
+            else:
+                # Grid-only strategies (projection, morphology, ...) leave the cells empty;
+                # read them once, for the winner only (maps them to original space too)
+                read = TableDetector(self.ocr_engine).read_structure(
+                    original, best_result.cells, best_result.rows, best_result.cols, resolution
+                )
+                best_result.headers = read.headers
+            bbox = [TableRegion(*region.box)]
+            cells_to_original(bbox, resolution)
+            best_result.bbox = bbox[0].box
+            return best_result, best_strategy, [strategy for _, strategy in results]
+        
+        return [table for table in map_regions(run, localize_tables(preprocessed)) if table is not None]
+    
+    def detect_single_strategy(self, image_path: str, method: str,
+                               denoise_tier: Optional[str] = None) -> Tuple[Optional[Any], DetectionStrategy]:
+        """
+        Run one strategy only, e.g. the one a template's processing profile names
+        
+        Args:
+            image_path: Path to image file
+            method: Strategy method ("morphology", "components", ...)
+            denoise_tier: Force this denoise tier instead of choosing by noise level
+            
+        Returns:
+            Tuple of (table_structure or None, strategy_info); the largest
+            table when the page has several, all of them are kept in self.tables
+        """
+        config = self._cache_config(method=method, denoise_tier=denoise_tier)
+        result, strategy, self.tables = cached_call(
+            image_path, "single_strategy_tables", config,
+            lambda: self._detect_single_uncached(image_path, method, denoise_tier),
+            is_cacheable=lambda result: result[0] is not None
+        )
+        return result, strategy
+    
+    def _detect_single_uncached(self, image_path: str, method: str, denoise_tier: Optional[str]
+                                ) -> Tuple[Optional[Any], DetectionStrategy, List[Tuple[Any, DetectionStrategy]]]:
+        """Run one strategy without consulting the result cache"""
+        image, resolution = load_normalized(image_path)
+        if image is None:
+            raise ValueError(f"Could not load image: {image_path}")
+        
+        preprocessed, metrics = self.preprocessor.preprocess_for_table_detection(image, denoise_tier=denoise_tier)
+        self.line_params = line_params(image.shape)
+        
+        def detect(region_preprocessed: np.ndarray, region_original: np.ndarray) -> List[Tuple[Any, DetectionStrategy]]:
+            plan = [entry for entry in self._strategy_plan(region_preprocessed, region_original)
+                    if entry[1] == method]
+            if not plan:
+                raise ValueError(f"Unknown detection strategy: {method}")
+            outcome = self._run_strategy(*plan[0], metrics)
+            return [outcome] if outcome else []
+        
+        tables = self._detect_in_regions(preprocessed, image, resolution, detect)
+        if not tables:
+            return None, DetectionStrategy("None", 0, 0, "none", denoise_tier=metrics.denoise_tier), []
+        
+        result, strategy, _ = max(tables, key=lambda table: len(table[0].cells))
+        return result, strategy, [(result, strategy) for result, strategy, _ in tables]
+    
+    def _strategy_plan(self, preprocessed: np.ndarray, original: np.ndarray,
+                       cancelled: Optional[threading.Event] = None
+                       ) -> List[Tuple[str, str, Callable[[], Optional[Any]]]]:
+        """
+        Strategies in priority order as (name, method, run), sharing one detection context
+        
+        Setting cancelled stops the strategies at their next stage (see DetectionContext).
+        """
+        context = self._new_context(preprocessed, cancelled)
+        return [
+            # Cheap first pass for clean, axis-aligned rulings
+            ("Projection Profile", "projection", lambda: self._detect_projection(preprocessed, context)),
+            # Good for clear borders
+            ("Morphology", "morphology", lambda: self._detect_morphology(preprocessed, context)),
+            # Good for merged cells (row/column spans)
+            ("Connected Components", "components", lambda: self._detect_components(preprocessed, context)),
+            # Good for varying borders
+            ("Contours", "contours", lambda: self._detect_contours(preprocessed, context)),
+            # Good for clean straight lines
+            ("Hough Lines", "hough", lambda: self._detect_hough_lines(preprocessed, context)),
+            # Good for borderless tables
+            ("Text Blocks", "textblocks", lambda: self._detect_text_blocks(preprocessed, context)),
+            # Combination of methods
+            ("Hybrid", "hybrid", lambda: self._detect_hybrid(preprocessed, original, context)),
+        ]
+    
+    def _run_strategy(self, name: str, method: str, run: Callable[[], Optional[Any]],
+                      metrics: ImageQualityMetrics,
+                      finished: Optional[Dict[str, Tuple[float, Optional[float]]]] = None
+                      ) -> Optional[Tuple[Any, DetectionStrategy]]:
+        """
+        Run one strategy and score it
+        
+        Args:
+            finished: Optional telemetry dict; receives method -> (elapsed_ms,
+                confidence or None) once the strategy finishes
         
-        # Strategy 5: Hybrid approach (combination of methods)
-        logger.info("\n--- Strategy 5: Hybrid detection ---")
+        Returns:
+            Tuple of (result, strategy_info), or None if the strategy found no table
+        """
+        logger.info(f"--- Strategy: {name} ---")
+        start = time.perf_counter()
         try:
-            result5 = self._detect_hybrid(preprocessed, image)
-            if result5:
-                confidence5 = self._calculate_confidence(result5, metrics)
-                results.append((result5, DetectionStrategy(
-                    name="Hybrid",
-                    confidence=confidence5,
-                    cells_found=len(result5.cells) if hasattr(result5, 'cells') else 0,
-                    method="hybrid"
-                )))
-                logger.info(f"[OK] Hybrid: {len(result5.cells)} cells, confidence: {confidence5:.1f}%")
+            with track_settings() as used:
+                result = run()
+        except DetectionCancelled:
+            # Another strategy won; a cancelled run says nothing about this one
+            logger.info(f"[CANCELLED] {name} stopped after {(time.perf_counter() - start) * 1000:.0f}ms")
+            return None
         except Exception as e:
-            logger.warning(f"[FAILED] Hybrid failed: {e}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.warning(f"[FAILED] {name} failed after {elapsed_ms:.0f}ms: {e}")
+            if finished is not None:
+                finished[method] = (elapsed_ms, None)
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000
         
-        # Select best result
-        if not results:
-            logger.error("[ERROR] All detection strategies failed")
-            return None, DetectionStrategy("None", 0, 0, "none")
+        if not result:
+            logger.info(f"[NONE] {name}: no table found ({elapsed_ms:.0f}ms)")
+            if finished is not None:
+                finished[method] = (elapsed_ms, None)
+            return None
         
-        # Sort by confidence
-        results.sort(key=lambda x: x[1].confidence, reverse=True)
-        best_result, best_strategy = results[0]
+        confidence = self._calculate_confidence(result, metrics)
+        strategy = DetectionStrategy(
+            name=name,
+            confidence=confidence,
+            cells_found=len(result.cells) if hasattr(result, 'cells') else 0,
+            method=method,
+            elapsed_ms=elapsed_ms,
+            denoise_tier=metrics.denoise_tier,
+            line_kernel=used.get('line_kernel'),
+            binarization=used.get('binarization')
+        )
+        logger.info(f"[OK] {name}: {strategy.cells_found} cells, confidence: {confidence:.1f}%, "
+                    f"{elapsed_ms:.0f}ms")
+        if finished is not None:
+            finished[method] = (elapsed_ms, confidence)
+        return result, strategy
+    
+    def _run_strategies(self, preprocessed: np.ndarray, original: np.ndarray,
+                        metrics: ImageQualityMetrics) -> List[Tuple[Any, DetectionStrategy]]:
+        """
+        Run the detection strategies, stopping early once one is confident enough
         
-        logger.info(f"\n[WINNER] Best strategy: {best_strategy.name} "
-                   f"(confidence: {best_strategy.confidence:.1f}%, "
-                   f"cells: {best_strategy.cells_found})")
+        With telemetry enabled the plan is first reordered and pruned from
+        the recorded outcomes on pages of the same quality bucket, and this
+        run's outcomes are recorded afterwards.
         
-        # Store all strategies for analysis
-        self.strategies = [strategy for _, strategy in results]
+        Returns:
+            List of (result, strategy_info) for strategies that found a table
+        """
+        from ocr_processing.strategy_stats import (
+            get_telemetry_settings, quality_bucket, load_stats, load_detections, order_plan,
+            is_exploration_run, record_outcomes
+        )
         
-        return best_result, best_strategy
+        cancelled = threading.Event()
+        plan = self._strategy_plan(preprocessed, original, cancelled)
+        enabled, prune_min_runs, explore_every = get_telemetry_settings()
+        if not enabled:
+            return self._execute_plan(plan, metrics, cancelled=cancelled)
+        
+        bucket = quality_bucket(metrics)
+        stats = load_stats(bucket)
+        plan = order_plan(plan, stats, FIRST_PASS_METHODS, prune_min_runs,
+                          explore=is_exploration_run(load_detections(bucket), explore_every))
+        
+        finished = {}
+        results = self._execute_plan(plan, metrics, finished, cancelled)
+        # Same choice as _detect_uncached: highest confidence, earliest on ties
+        winner = max(results, key=lambda item: item[1].confidence)[1].method if results else None
+        record_outcomes(bucket, dict(finished), winner)
+        return results
     
-    def _detect_morphology(self, image: np.ndarray) -> Optional[Any]:
-        """Detect table using morphological operations"""
-        from ocr_processing.table_detector import TableDetector
+    def _execute_plan(self, plan: List[Tuple[str, str, Callable[[], Optional[Any]]]],
+                      metrics: ImageQualityMetrics,
+                      finished: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+                      cancelled: Optional[threading.Event] = None
+                      ) -> List[Tuple[Any, DetectionStrategy]]:
+        """
+        Run a strategy plan with early exit
         
-        # Create temporary instance
-        detector = TableDetector(self.ocr_engine)
+        First-pass strategies (cheap ones such as the projection profile) run
+        on their own first. The others are then submitted in plan order to a
+        shared thread pool. As soon as one clears the early-exit confidence,
+        strategies that have not started yet are cancelled and cancelled is
+        set, so the ones still running stop at their next stage and free
+        their pool thread; they are not waited for. A grid-only strategy can
+        exit early because the winner's cells are read afterwards (see
+        _detect_in_regions).
+        
+        Args:
+            plan: (name, method, run) entries in priority order
+            metrics: Quality metrics used for scoring
+            finished: Optional telemetry dict, see _run_strategy
+            cancelled: Event the plan's strategies were created with (see _strategy_plan)
+        
+        Returns:
+            List of (result, strategy_info) in plan order
+        """
+        workers, threshold = get_strategy_settings()
+        results = []
+        
+        def confident(outcome: Optional[Tuple[Any, DetectionStrategy]]) -> bool:
+            return threshold is not None and outcome is not None and outcome[1].confidence >= threshold
+        
+        # Cheap strategies run alone first; the rest only if none of them is confident
+        if workers <= 1:
+            first_pass, concurrent = plan, []
+        else:
+            first_pass = [entry for entry in plan if entry[1] in FIRST_PASS_METHODS]
+            concurrent = [entry for entry in plan if entry[1] not in FIRST_PASS_METHODS]
+        
+        for index, (name, method, run) in enumerate(first_pass):
+            outcome = self._run_strategy(name, method, run, metrics, finished)
+            if outcome:
+                results.append(outcome)
+            if confident(outcome):
+                if cancelled is not None:
+                    cancelled.set()
+                skipped = [entry[0] for entry in first_pass[index + 1:] + concurrent]
+                if skipped:
+                    logger.info(f"[EARLY EXIT] {name} reached {outcome[1].confidence:.1f}%, "
+                                f"skipping {', '.join(skipped)}")
+                return results
+        if not concurrent:
+            return results
+        
+        pool = _get_strategy_pool(workers)
+        futures = {
+            pool.submit(self._run_strategy, name, method, run, metrics, finished): name
+            for name, method, run in concurrent
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = None
+            for future in done:
+                outcome = future.result()
+                if outcome:
+                    results.append(outcome)
+                if confident(outcome):
+                    winner = outcome[1]
+            if winner is not None and pending:
+                skipped = [futures[future] for future in pending if future.cancel()]
+                stopping = [futures[future] for future in pending if not future.cancelled()]
+                if cancelled is not None:
+                    cancelled.set()
+                logger.info(
+                    f"[EARLY EXIT] {winner.name} reached {winner.confidence:.1f}%"
+                    + (f", skipped {', '.join(skipped)}" if skipped else "")
+                    + (f", stopping {', '.join(stopping)}" if stopping else "")
+                )
+                break
+        
+        # Keep priority order among equal confidences, as in a sequential run
+        order = {name: index for index, (name, _, _) in enumerate(plan)}
+        results.sort(key=lambda item: order[item[1].name])
+        return results
+    
+    def _detect_projection(self, image: np.ndarray,
+                           context: Optional[DetectionContext] = None) -> Optional[Any]:
+        """Detect table from ink projections and run lengths of the binarized page"""
+        from ocr_processing.table_detector import TableDetector, TableStructure
         
-        # Apply morphology-based detection
-        binary = detector.preprocess_image(image)
+        if context is None:
+            context = self._new_context(image)
         
-        # Detect horizontal and vertical lines
-        h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (50, 1))
-        v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 50))
+        h_lines, v_lines = context.projection_lines()
+        if len(h_lines) < 2 or len(v_lines) < 2:
+            return None
         
-        h_lines_img = cv2.morphologyEx(binary, cv2.MORPH_OPEN, h_kernel, iterations=2)
-        v_lines_img = cv2.morphologyEx(binary, cv2.MORPH_OPEN, v_kernel, iterations=2)
+        cells = TableDetector(self.ocr_engine).build_grid(h_lines, v_lines)
+        return TableStructure(
+            rows=len(h_lines) - 1,
+            cols=len(v_lines) - 1,
+            cells=cells,
+            headers={},
+            grid_confidence=0.8
+        )
+    
+    def _detect_morphology(self, image: np.ndarray,
+                           context: Optional[DetectionContext] = None) -> Optional[Any]:
+        """Detect table using morphological operations"""
+        from ocr_processing.table_detector import TableDetector, merge_close_lines
         
-        # Find contours of lines
-        h_contours, _ = cv2.findContours(h_lines_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        v_contours, _ = cv2.findContours(v_lines_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if context is None:
+            context = self._new_context(image)
+        detector = TableDetector(self.ocr_engine)
+        
+        # Horizontal and vertical lines of the binarized page
+        h_boxes, v_boxes = context.line_boxes(self.line_kernel)
         
         # Extract line positions
         h_lines = []
-        for contour in h_contours:
-            x, y, w, h = cv2.boundingRect(contour)
+        for x, y, w, h in h_boxes:
             if w > image.shape[1] * 0.3:  # At least 30% of image width
                 h_lines.append(y + h//2)
         
         v_lines = []
-        for contour in v_contours:
-            x, y, w, h = cv2.boundingRect(contour)
+        for x, y, w, h in v_boxes:
             if h > image.shape[0] * 0.3:  # At least 30% of image height
                 v_lines.append(x + w//2)
         
+        # Merge positions of the same ruling
+        h_lines = merge_close_lines(h_lines, context.params.merge_gap(0))
+        v_lines = merge_close_lines(v_lines, context.params.merge_gap(1))
+        
         if len(h_lines) < 2 or len(v_lines) < 2:
             return None
         
         # Build grid and create table structure
-        h_lines = sorted(set(h_lines))
-        v_lines = sorted(set(v_lines))
-        
         cells = detector.build_grid(h_lines, v_lines)
         
         from ocr_processing.table_detector import TableStructure
@@ -205,16 +523,48 @@ class EnhancedTableDetector:
             grid_confidence=0.8
         )
     
-    def _detect_contours(self, image: np.ndarray) -> Optional[Any]:
+    def _detect_components(self, image: np.ndarray,
+                           context: Optional[DetectionContext] = None) -> Optional[Any]:
+        """Detect table cells, merged ones included, as connected regions between rulings"""
+        from ocr_processing.table_detector import CellInfo, TableStructure
+        from ocr_processing.cell_components import find_cell_components
+
+        if context is None:
+            context = self._new_context(image)
+
+        found = find_cell_components(*context.line_masks(self.line_kernel), scale=context.params.factor)
+        if len(found) < 4:
+            return None
+
+        cells = [
+            CellInfo(row=row, col=col, x=x, y=y, width=w, height=h,
+                     is_header=(row == 0), row_span=row_span, col_span=col_span)
+            for x, y, w, h, row, col, row_span, col_span in found.tolist()
+        ]
+        rows = int((found[:, 4] + found[:, 6]).max())
+        cols = int((found[:, 5] + found[:, 7]).max())
+        if rows < 2 or cols < 2:
+            return None
+
+        return TableStructure(
+            rows=rows,
+            cols=cols,
+            cells=cells,
+            headers={},
+            grid_confidence=0.8
+        )
+
+    def _detect_contours(self, image: np.ndarray,
+                         context: Optional[DetectionContext] = None) -> Optional[Any]:
         """Detect table using contour detection"""
-        # Apply Otsu's thresholding
-        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        if context is None:
+            context = self._new_context(image)
         
-        # Find all contours
-        contours, _ = cv2.findContours(binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        # All contours of the Otsu-thresholded page
+        contours = context.region_contours()
         
         # Filter contours by size (potential cells)
-        min_area = 500  # Minimum cell area
+        min_area = max(50, 500 * context.params.unit ** 2)  # Minimum cell area
         cell_contours = []
         
         for contour in contours:
@@ -239,7 +589,7 @@ class EnhancedTableDetector:
         rows = []
         current_row = []
         current_y = sorted_cells[0][1]
-        y_threshold = 20  # Pixels tolerance for same row
+        y_threshold = context.params.scaled(20, 5)  # Pixels tolerance for same row
         
         for x, y, w, h in sorted_cells:
             if abs(y - current_y) < y_threshold:
@@ -277,15 +627,18 @@ class EnhancedTableDetector:
             grid_confidence=0.75
         )
     
-    def _detect_hough_lines(self, image: np.ndarray) -> Optional[Any]:
+    def _detect_hough_lines(self, image: np.ndarray,
+                            context: Optional[DetectionContext] = None) -> Optional[Any]:
         """Detect table using Hough Line Transform"""
         from ocr_processing.table_detector import TableDetector, TableStructure
         
+        if context is None:
+            context = self._new_context(image)
         detector = TableDetector(self.ocr_engine)
         
         # Use the detector's built-in Hough method
         try:
-            h_lines, v_lines = detector.detect_grid_with_hough(image)
+            h_lines, v_lines = context.hough_lines()
             
             if len(h_lines) < 2 or len(v_lines) < 2:
                 return None
@@ -299,15 +652,20 @@ class EnhancedTableDetector:
                 headers={},
                 grid_confidence=0.7
             )
+        except DetectionCancelled:
+            raise
         except Exception as e:
             logger.warning(f"Hough line detection failed: {e}")
             return None
     
-    def _detect_text_blocks(self, image: np.ndarray) -> Optional[Any]:
+    def _detect_text_blocks(self, image: np.ndarray,
+                            context: Optional[DetectionContext] = None) -> Optional[Any]:
         """Detect table by clustering text blocks (for borderless tables)"""
+        if context is None:
+            context = self._new_context(image)
         try:
-            # Use pytesseract to get text blocks
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            # Use Tesseract to get text blocks (one page OCR shared by all strategies)
+            data = context.word_data()
             
             # Extract blocks with confidence > 50
             blocks = []
@@ -335,7 +693,7 @@ class EnhancedTableDetector:
             rows = []
             current_row = []
             current_y = blocks[0][1]
-            y_threshold = 30
+            y_threshold = context.params.scaled(30, 8)
             
             for x, y, w, h, text in blocks:
                 if abs(y - current_y) < y_threshold:
@@ -374,46 +732,51 @@ class EnhancedTableDetector:
                 grid_confidence=0.65
             )
             
+        except DetectionCancelled:
+            raise
         except Exception as e:
             logger.warning(f"Text block detection failed: {e}")
             return None
     
-    def _detect_hybrid(self, preprocessed: np.ndarray, original: np.ndarray) -> Optional[Any]:
+    def _detect_hybrid(self, preprocessed: np.ndarray, original: np.ndarray,
+                       context: Optional[DetectionContext] = None) -> Optional[Any]:
         """
         Hybrid approach: Combine multiple methods
         Use line detection for structure, contours for refinement, and text blocks for content
+        
+        Intermediates come from the shared context, so only the cheap grid
+        building and merging is repeated here.
         """
+        if context is None:
+            context = self._new_context(preprocessed)
+        
         # Step 1: Get grid structure from lines
-        structure_result = self._detect_morphology(preprocessed)
+        structure_result = self._detect_morphology(preprocessed, context)
         if not structure_result:
-            structure_result = self._detect_hough_lines(preprocessed)
+            structure_result = self._detect_hough_lines(preprocessed, context)
         
         if not structure_result:
             # Fall back to contours only
-            return self._detect_contours(preprocessed)
+            return self._detect_contours(preprocessed, context)
         
         # Step 2: Get text content from text blocks
-        text_result = self._detect_text_blocks(preprocessed)
+        text_result = self._detect_text_blocks(preprocessed, context)
         
         if not text_result:
             return structure_result
+        context.check_cancelled()
         
         # Step 3: Merge results - use structure from lines, content from text blocks
-        # Match text blocks to grid cells
-        for cell in structure_result.cells:
-            # Find text blocks that overlap with this cell
-            cell_center_x = cell.x + cell.width // 2
-            cell_center_y = cell.y + cell.height // 2
-            
-            for text_cell in text_result.cells:
-                text_x = text_cell.x + text_cell.width // 2
-                text_y = text_cell.y + text_cell.height // 2
-                
-                # Check if text block is inside grid cell
-                if (cell.x <= text_x <= cell.x + cell.width and
-                    cell.y <= text_y <= cell.y + cell.height):
-                    cell.text = text_cell.text
-                    break
+        # Each grid cell takes the first text block whose center lies inside it
+        centers_x = [block.x + block.width // 2 for block in text_result.cells]
+        centers_y = [block.y + block.height // 2 for block in text_result.cells]
+        block_cells = CellIndex(structure_result.cells).locate(centers_x, centers_y, inclusive=True)
+        
+        filled = set()
+        for block, cell_idx in zip(text_result.cells, block_cells.tolist()):
+            if cell_idx >= 0 and cell_idx not in filled:
+                structure_result.cells[cell_idx].text = block.text
+                filled.add(cell_idx)
         
         structure_result.grid_confidence = 0.85  # Hybrid has higher confidence
         return structure_result
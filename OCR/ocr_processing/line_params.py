@@ -0,0 +1,150 @@
+"""
+Line Detection Parameters
+Page-relative sizes for ruling-line detection and the reduced binary image the
+grid is detected on
+"""
+import cv2
+import numpy as np
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pixel constants below were tuned on pages with this long side
+REFERENCE_LONG_SIDE = 2000
+
+DEFAULT_DETECTION_SIZE = 800
+DEFAULT_MAX_FACTOR = 4
+
+
+def get_line_detection_settings() -> Tuple[int, int]:
+    """
+    Reduced-scale line detection settings
+
+    Returns:
+        Tuple of (detection_size, max_factor): the page is reduced by the
+        largest whole factor, up to max_factor, that keeps its long side at
+        least detection_size (max_factor 1 disables the reduction)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    size = int(get_ocr_setting('OCR_LINE_DETECTION_SIZE', DEFAULT_DETECTION_SIZE))
+    max_factor = int(get_ocr_setting('OCR_LINE_DETECTION_MAX_FACTOR', DEFAULT_MAX_FACTOR))
+    return max(1, size), max(1, max_factor)
+
+
+@dataclass(frozen=True)
+class LineParams:
+    """Detection sizes for one page, in working-resolution pixels unless noted"""
+    page_shape: Tuple[int, int]  # (height, width) of the whole page
+    factor: int  # Working pixels per detection pixel
+
+    @property
+    def unit(self) -> float:
+        """Page size relative to the reference page"""
+        return max(self.page_shape) / REFERENCE_LONG_SIDE
+
+    def scaled(self, reference: float, minimum: int = 1) -> int:
+        """A length tuned on the reference page, at this page's size"""
+        return max(minimum, int(round(reference * self.unit)))
+
+    @property
+    def block_size(self) -> int:
+        """Adaptive threshold neighbourhood (odd)"""
+        return self.scaled(11, 7) | 1
+
+    @property
+    def threshold_reach(self) -> int:
+        """How far binarization looks around each pixel, the tile overlap it needs"""
+        return self.block_size // 2
+
+    @property
+    def kernel_length(self) -> int:
+        """Length of the structuring elements that keep ruling lines"""
+        return self.scaled(40, 10)
+
+    @property
+    def min_line_length(self) -> int:
+        """Shortest ruling kept; shorter mask fragments are noise"""
+        return self.scaled(50, 15)
+
+    @property
+    def hough_min_length(self) -> int:
+        """Shortest Hough segment, and its vote threshold"""
+        return self.scaled(100, 20)
+
+    @property
+    def hough_max_gap(self) -> int:
+        """Largest gap bridged inside one Hough segment"""
+        return self.scaled(10, 2)
+
+    @property
+    def axis_tolerance(self) -> int:
+        """Largest endpoint offset of a segment that still counts as horizontal/vertical"""
+        return self.scaled(10, 2)
+
+    def merge_gap(self, axis: int) -> int:
+        """Line merge gap across the page (axis 0: horizontal lines, 1: vertical lines)"""
+        from ocr_processing.table_detector import line_merge_gap
+        return line_merge_gap(self.page_shape[axis])
+
+    def reduced(self, length: int) -> int:
+        """A working-resolution length at detection scale"""
+        return max(1, int(round(length / self.factor)))
+
+    def to_working(self, positions: Iterable[int]) -> List[int]:
+        """
+        Detection-scale positions at working resolution
+
+        A detection pixel covers factor working pixels; its middle is the
+        unbiased estimate of where in that block the edge or line lies.
+        """
+        offset = self.factor // 2
+        return [int(p) * self.factor + offset for p in positions]
+
+
+def line_params(page_shape: Tuple[int, ...], reduce: bool = True) -> LineParams:
+    """
+    Line detection parameters of a page
+
+    Crops of a page (e.g. localized tables) must use the parameters of the
+    whole page, so sizes do not change with the crop.
+
+    Args:
+        page_shape: Shape of the whole page at working resolution
+        reduce: Pick a reduction factor from the settings (False: detect at full size)
+
+    Returns:
+        LineParams for the page
+    """
+    height, width = page_shape[:2]
+    factor = 1
+    if reduce:
+        size, max_factor = get_line_detection_settings()
+        factor = int(min(max_factor, max(1, max(height, width) // size)))
+    return LineParams((int(height), int(width)), factor)
+
+
+def reduce_binary(binary: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Shrink a binary image by a whole factor, keeping thin lines
+
+    Blocks are averaged and kept where at least half a pixel row or column
+    of ink crosses them, so a 1px ruling survives any factor while isolated
+    specks fade out.
+
+    Args:
+        binary: Binary image with ink as 255
+        factor: Reduction factor
+
+    Returns:
+        Binary image of size (height // factor, width // factor)
+    """
+    if factor <= 1:
+        return binary
+    height, width = binary.shape[:2]
+    height, width = height - height % factor, width - width % factor
+    small = cv2.resize(binary[:height, :width], (width // factor, height // factor),
+                       interpolation=cv2.INTER_AREA)
+    _, small = cv2.threshold(small, 255 // (2 * factor), 255, cv2.THRESH_BINARY)
+    return small
@@ -0,0 +1,52 @@
+"""
+Strategy Stats Command
+Prints the recorded win rate and cost of every table detection strategy per
+image-quality bucket
+"""
+from django.core.management.base import BaseCommand
+
+from ocr_processing.models import StrategyBucket, StrategyStat
+from ocr_processing.strategy_stats import get_telemetry_settings
+
+
+class Command(BaseCommand):
+    help = "Show table detection strategy win rates and costs per image-quality bucket"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bucket', help="Only show buckets starting with this prefix, e.g. 'high/clean'")
+        parser.add_argument('--reset', action='store_true', help="Delete the shown stats instead of printing them")
+
+    def handle(self, *args, **options):
+        rows = StrategyStat.objects.all()
+        buckets = StrategyBucket.objects.all()
+        if options['bucket']:
+            rows = rows.filter(bucket__startswith=options['bucket'])
+            buckets = buckets.filter(bucket__startswith=options['bucket'])
+
+        if options['reset']:
+            deleted, _ = rows.delete()
+            buckets.delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} strategy stat rows"))
+            return
+
+        rows = list(rows)
+        if not rows:
+            self.stdout.write("No strategy stats recorded yet")
+            return
+
+        _, prune_min_runs, _ = get_telemetry_settings()
+        header = f"{'Strategy':<12} {'Runs':>6} {'Wins':>6} {'Win %':>6} {'Found %':>8} {'Mean ms':>9} {'Mean conf':>10}"
+        bucket = None
+        for row in sorted(rows, key=lambda r: (r.bucket, -r.win_rate, r.mean_ms)):
+            if row.bucket != bucket:
+                bucket = row.bucket
+                self.stdout.write("")
+                self.stdout.write(self.style.MIGRATE_HEADING(bucket))
+                self.stdout.write(header)
+                self.stdout.write("-" * len(header))
+            pruned = prune_min_runs > 0 and row.runs >= prune_min_runs and row.wins == 0
+            self.stdout.write(
+                f"{row.method:<12} {row.runs:>6} {row.wins:>6} {row.win_rate * 100:>6.1f} "
+                f"{(row.found / row.runs * 100 if row.runs else 0):>8.1f} {row.mean_ms:>9.1f} "
+                f"{row.mean_confidence:>10.1f}" + ("  (pruned)" if pruned else "")
+            )
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_processing', '0002_alter_ocrconfiguration_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StrategyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(help_text='Coarse image-quality bucket (see strategy_stats.quality_bucket)', max_length=100)),
+                ('method', models.CharField(help_text="Strategy method name, e.g. 'morphology'", max_length=50)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('found', models.PositiveIntegerField(default=0, help_text='Runs that found a table')),
+                ('wins', models.PositiveIntegerField(default=0, help_text='Runs whose table was selected')),
+                ('total_ms', models.FloatField(default=0.0)),
+                ('confidence_sum', models.FloatField(default=0.0, help_text='Sum of confidences of runs that found a table')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Strategy Statistic',
+                'verbose_name_plural': 'Strategy Statistics',
+                'ordering': ['bucket', 'method'],
+                'unique_together': {('bucket', 'method')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StrategyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(help_text='Coarse image-quality bucket (see strategy_stats.quality_bucket)', max_length=100, unique=True)),
+                ('detections', models.PositiveIntegerField(default=0, help_text='Detections run, with or without a winner')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Strategy Bucket',
+                'verbose_name_plural': 'Strategy Buckets',
+                'ordering': ['bucket'],
+            },
+        ),
+    ]
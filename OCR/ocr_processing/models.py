@@ -60,3 +60,54 @@ class ProcessingTask(models.Model):
     
     def __str__(self):
         return f"{self.task_name} - {self.processing_status}"
+
+
+class StrategyStat(models.Model):
+    """Accumulated outcomes of one table detection strategy on one image-quality bucket"""
+    
+    bucket = models.CharField(max_length=100, help_text="Coarse image-quality bucket (see strategy_stats.quality_bucket)")
+    method = models.CharField(max_length=50, help_text="Strategy method name, e.g. 'morphology'")
+    runs = models.PositiveIntegerField(default=0)
+    found = models.PositiveIntegerField(default=0, help_text="Runs that found a table")
+    wins = models.PositiveIntegerField(default=0, help_text="Runs whose table was selected")
+    total_ms = models.FloatField(default=0.0)
+    confidence_sum = models.FloatField(default=0.0, help_text="Sum of confidences of runs that found a table")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['bucket', 'method']
+        unique_together = [('bucket', 'method')]
+        verbose_name = 'Strategy Statistic'
+        verbose_name_plural = 'Strategy Statistics'
+    
+    def __str__(self):
+        return f"{self.bucket} / {self.method}: {self.wins}/{self.runs} wins"
+    
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.runs if self.runs else 0.0
+    
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.runs if self.runs else 0.0
+    
+    @property
+    def mean_confidence(self) -> float:
+        return self.confidence_sum / self.found if self.found else 0.0
+
+
+class StrategyBucket(models.Model):
+    """Number of table detections run on pages of one image-quality bucket"""
+    
+    bucket = models.CharField(max_length=100, unique=True,
+                              help_text="Coarse image-quality bucket (see strategy_stats.quality_bucket)")
+    detections = models.PositiveIntegerField(default=0, help_text="Detections run, with or without a winner")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['bucket']
+        verbose_name = 'Strategy Bucket'
+        verbose_name_plural = 'Strategy Buckets'
+    
+    def __str__(self):
+        return f"{self.bucket}: {self.detections} detections"
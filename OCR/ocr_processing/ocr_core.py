@@ -4,16 +4,31 @@ Handles text extraction from images using multiple OCR engines
 """
 import cv2
 import numpy as np
-import pytesseract
 import easyocr
-from PIL import Image, ImageEnhance
 import json
 import logging
-from typing import List, Dict, Tuple, Optional, Any
+import threading
+from typing import List, Dict, Tuple, Optional, Any, Iterator
 from dataclasses import dataclass
+from ocr_processing.tesseract_backend import create_tesseract_backend
+from ocr_processing.pdf_text_layer import PDFTextLayer
+from ocr_processing.result_cache import cached_call, UNCACHEABLE_ENGINES
+from ocr_processing.resolution import load_normalized, normalize_array
+from ocr_processing.deskew import estimate_skew_angle, rotate_image
+from ocr_processing.denoise import denoise_tiered, get_denoise_budget_ms
 
 logger = logging.getLogger(__name__)
 
+
+def get_ocr_setting(name: str, default: Any) -> Any:
+    """Read an OCR setting from Django settings, falling back to a default"""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
 @dataclass
 class OCRResult:
     """Container for OCR processing results"""
@@ -21,6 +36,11 @@ class OCRResult:
     confidence: float
     bbox: Optional[Tuple[int, int, int, int]] = None
     engine: str = "unknown"
+    page_number: Optional[int] = None
+    pages: Optional[List['OCRResult']] = None  # Per-page results for multi-page documents
+    source: str = "ocr"  # "ocr" or "text_layer" (embedded PDF text, no OCR needed)
+    layout: Optional[Dict[str, Any]] = None  # Word positions and ruling lines from the text layer
+    preprocessing: Optional[Dict[str, Any]] = None  # Denoise tier and timing chosen for the page
     
 @dataclass
 class FieldData:
@@ -35,27 +55,16 @@ class ImagePreprocessor:
     
     @staticmethod
     def denoise_image(image: np.ndarray) -> np.ndarray:
-        """Apply denoising filter to image"""
-        return cv2.fastNlMeansDenoising(image)
+        """Apply the denoising tier suited to the image's noise level"""
+        return denoise_tiered(image).image
     
     @staticmethod
     def deskew_image(image: np.ndarray) -> np.ndarray:
         """Correct skew in scanned documents"""
-        coords = np.column_stack(np.where(image > 0))
-        if len(coords) == 0:
-            return image
-        angle = cv2.minAreaRect(coords)[-1]
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
+        angle = estimate_skew_angle(image)
         if abs(angle) < 0.5:
             return image
-        (h, w) = image.shape[:2]
-        center = (w // 2, h // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(image, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-        return rotated
+        return rotate_image(image, angle)
     
     @staticmethod
     def enhance_contrast(image: np.ndarray) -> np.ndarray:
@@ -69,14 +78,40 @@ class ImagePreprocessor:
                         deskew: bool = True, 
                         enhance: bool = True) -> np.ndarray:
         """Complete image preprocessing pipeline"""
-        # Load image
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        # Load image at working resolution
+        image, _ = load_normalized(image_path, grayscale=True)
         if image is None:
             raise ValueError(f"Could not load image: {image_path}")
         
+        return cls.preprocess_array(image, denoise=denoise, deskew=deskew, enhance=enhance)
+    
+    @classmethod
+    def preprocess_array(cls, image: np.ndarray,
+                         denoise: bool = True,
+                         deskew: bool = True,
+                         enhance: bool = True,
+                         details: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Preprocessing pipeline for an already loaded grayscale image
+        
+        Args:
+            image: Grayscale image
+            denoise: Apply tiered denoising
+            deskew: Correct skew
+            enhance: Apply CLAHE
+            details: Optional dict that receives the denoise tier and elapsed time
+            
+        Returns:
+            Preprocessed image
+        """
         # Apply preprocessing steps
         if denoise:
-            image = cls.denoise_image(image)
+            denoised = denoise_tiered(image)
+            image = denoised.image
+            if details is not None:
+                details['denoise_tier'] = denoised.tier
+                details['denoise_ms'] = round(denoised.elapsed_ms, 1)
+                details['noise_level'] = round(denoised.noise_level, 2)
         if enhance:
             image = cls.enhance_contrast(image)
         if deskew:
@@ -87,20 +122,20 @@ class ImagePreprocessor:
 class OCREngine:
     """Main OCR processing engine supporting multiple backends"""
     
-    def __init__(self, preferred_engine: str = "tesseract"):
+    def __init__(self, preferred_engine: str = "tesseract", tesseract_backend: str = "pytesseract"):
         self.preferred_engine = preferred_engine
+        self.tesseract_backend = create_tesseract_backend(tesseract_backend)
         self.tesseract_available = self._check_tesseract()
         self.easyocr_reader = None
+        # EasyOCR model inference is not safe to run concurrently on one reader
+        self._easyocr_lock = threading.Lock()
+        self._engine_version = None
         if preferred_engine == "easyocr":
             self._init_easyocr()
     
     def _check_tesseract(self) -> bool:
         """Check if Tesseract is available"""
-        try:
-            pytesseract.get_tesseract_version()
-            return True
-        except Exception:
-            return False
+        return self.tesseract_backend.is_available()
     
     def _init_easyocr(self):
         """Initialize EasyOCR reader"""
@@ -130,11 +165,8 @@ class OCREngine:
         if not self.tesseract_available:
             raise RuntimeError("Tesseract not available")
         
-        # Convert numpy array to PIL Image
-        pil_image = Image.fromarray(image)
-        
         # Extract text with confidence
-        data = pytesseract.image_to_data(pil_image, output_type=pytesseract.Output.DICT)
+        data = self.tesseract_backend.image_to_data(image)
         text_parts = []
         confidences = []
         
@@ -157,7 +189,8 @@ class OCREngine:
         if self.easyocr_reader is None:
             raise RuntimeError("EasyOCR not available")
         
-        results = self.easyocr_reader.readtext(image)
+        with self._easyocr_lock:
+            results = self.easyocr_reader.readtext(image)
         text_parts = []
         confidences = []
         
@@ -175,106 +208,197 @@ class OCREngine:
             engine="easyocr"
         )
     
+    @property
+    def engine_version(self) -> str:
+        """Version string of the OCR backend in use (looked up once)"""
+        if self._engine_version is None:
+            if self.preferred_engine == "easyocr" and self.easyocr_reader is not None:
+                self._engine_version = f"easyocr-{getattr(easyocr, '__version__', 'unknown')}"
+            else:
+                self._engine_version = f"{self.tesseract_backend.name}-{self.tesseract_backend.version()}"
+        return self._engine_version
+    
+    def cache_config(self, **extra: Any) -> Dict[str, Any]:
+        """
+        Settings that determine this engine's output, used in result cache keys
+        
+        Args:
+            **extra: Operation-specific settings (e.g. preprocessing flags)
+            
+        Returns:
+            Dictionary describing the engine configuration
+        """
+        config = {
+            'engine': self.preferred_engine,
+            'engine_version': self.engine_version,
+            'tesseract_available': self.tesseract_available,
+            'easyocr_loaded': self.easyocr_reader is not None,
+            # Changes which denoise tier pages get, and so the recognized text
+            'denoise_budget_ms': get_denoise_budget_ms(),
+        }
+        config.update(extra)
+        return config
+    
     def extract_text(self, image_path: str, preprocess: bool = True) -> OCRResult:
-        """Main text extraction method"""
+        """Main text extraction method (results are cached by file content)"""
+        config = self.cache_config(
+            preprocess=preprocess,
+            pdf_dpi=get_ocr_setting('OCR_PDF_DPI', 200),
+            pdf_text_layer=get_ocr_setting('OCR_PDF_USE_TEXT_LAYER', True),
+        )
+        return cached_call(
+            image_path, "extract_text", config,
+            lambda: self._extract_text_uncached(image_path, preprocess),
+            is_cacheable=lambda result: result.engine not in UNCACHEABLE_ENGINES
+        )
+    
+    def _extract_text_uncached(self, image_path: str, preprocess: bool = True) -> OCRResult:
+        """Run text extraction without consulting the result cache"""
         try:
             # Check if it's a PDF file
             if image_path.lower().endswith('.pdf'):
                 return self._process_pdf(image_path, preprocess)
             
-            # Preprocess image if requested
-            if preprocess:
-                image = ImagePreprocessor.preprocess_image(image_path)
-            else:
-                image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-            
+            # Load at working resolution, then preprocess if requested
+            image, _ = load_normalized(image_path, grayscale=True)
             if image is None:
                 raise ValueError(f"Could not load image: {image_path}")
             
-            # Try preferred engine first
-            if self.preferred_engine == "tesseract" and self.tesseract_available:
-                return self.extract_text_tesseract(image)
-            elif self.preferred_engine == "easyocr" and self.easyocr_reader:
-                return self.extract_text_easyocr(image)
+            details = {}
+            if preprocess:
+                image = ImagePreprocessor.preprocess_array(image, details=details)
             
-            # Fallback to available engine
-            if self.tesseract_available:
-                return self.extract_text_tesseract(image)
-            elif self.easyocr_reader:
-                return self.extract_text_easyocr(image)
-            else:
-                raise RuntimeError("No OCR engine available")
+            result = self.extract_text_from_image(image)
+            result.preprocessing = details or None
+            return result
                 
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
             return OCRResult(text="", confidence=0.0, engine="error")
     
+    def extract_text_from_image(self, image: np.ndarray) -> OCRResult:
+        """Run the preferred (or first available) engine on a loaded image"""
+        # Try preferred engine first
+        if self.preferred_engine == "tesseract" and self.tesseract_available:
+            return self.extract_text_tesseract(image)
+        elif self.preferred_engine == "easyocr" and self.easyocr_reader:
+            return self.extract_text_easyocr(image)
+        
+        # Fallback to available engine
+        if self.tesseract_available:
+            return self.extract_text_tesseract(image)
+        elif self.easyocr_reader:
+            return self.extract_text_easyocr(image)
+        else:
+            raise RuntimeError("No OCR engine available")
+    
+    def ocr_page(self, page_image: np.ndarray, page_number: int, preprocess: bool = True) -> OCRResult:
+        """
+        Preprocess and OCR one rasterized page
+        
+        Args:
+            page_image: Grayscale page image
+            page_number: 1-based page number
+            preprocess: Apply preprocessing before OCR
+            
+        Returns:
+            OCRResult for the page
+        """
+        try:
+            page_image, _ = normalize_array(page_image)
+            details = {}
+            if preprocess:
+                page_image = ImagePreprocessor.preprocess_array(page_image, details=details)
+            result = self.extract_text_from_image(page_image)
+            result.preprocessing = details or None
+        except Exception as e:
+            logger.error(f"OCR failed on page {page_number}: {e}")
+            result = OCRResult(text="", confidence=0.0, engine="error")
+        
+        result.page_number = page_number
+        return result
+    
+    def iter_pdf_pages(self, pdf_path: str, preprocess: bool = True,
+                       dpi: Optional[int] = None,
+                       use_text_layer: Optional[bool] = None) -> Iterator[OCRResult]:
+        """
+        Stream results page by page
+        
+        Pages with a usable embedded text layer are read directly; the rest are
+        rasterized and OCR'd one at a time, so only one page image is held in
+        memory at once.
+        
+        Args:
+            pdf_path: Path to PDF file
+            preprocess: Apply preprocessing before OCR
+            dpi: Rasterization resolution (defaults to OCR_PDF_DPI)
+            use_text_layer: Try the embedded text layer first (defaults to OCR_PDF_USE_TEXT_LAYER)
+            
+        Yields:
+            OCRResult for each page, in page order
+        """
+        if use_text_layer is None:
+            use_text_layer = get_ocr_setting('OCR_PDF_USE_TEXT_LAYER', True)
+        page_count = get_pdf_page_count(pdf_path)
+        
+        with PDFTextLayer(pdf_path) as text_layer:
+            for page_number in range(1, page_count + 1):
+                result = text_layer.page_result(page_number) if use_text_layer else None
+                if result is None:
+                    result = self.ocr_pdf_page(pdf_path, page_number, dpi, preprocess)
+                yield result
+    
+    def ocr_pdf_page(self, pdf_path: str, page_number: int,
+                     dpi: Optional[int] = None, preprocess: bool = True) -> OCRResult:
+        """Rasterize and OCR a single PDF page"""
+        for _, page_image in iter_pdf_page_images(pdf_path, dpi=dpi,
+                                                  first_page=page_number, last_page=page_number):
+            return self.ocr_page(page_image, page_number, preprocess)
+        
+        return OCRResult(text="", confidence=0.0, engine="error", page_number=page_number)
+    
     def _process_pdf(self, pdf_path: str, preprocess: bool = True) -> OCRResult:
-        """Process PDF file by converting to images first"""
+        """Process every page of a PDF file and combine the page results"""
         try:
-            # Try to process PDF if pdf2image is available
-            try:
-                from pdf2image import convert_from_path
-                import tempfile
-                import os
-                
-                # Convert PDF to images
-                images = convert_from_path(pdf_path, first_page=1, last_page=1)  # Process first page only
-                if not images:
-                    raise ValueError("No images extracted from PDF")
-                
-                # Create temp file path (but don't use context manager to avoid locking)
-                tmp_fd, tmp_path = tempfile.mkstemp(suffix='.png')
-                
-                try:
-                    # Close the file descriptor immediately to avoid locks
-                    os.close(tmp_fd)
-                    
-                    # Save PIL image to temp file
-                    images[0].save(tmp_path, 'PNG')
-                    
-                    # Process the image with OCR
-                    if preprocess:
-                        image = ImagePreprocessor.preprocess_image(tmp_path)
-                    else:
-                        image = cv2.imread(tmp_path, cv2.IMREAD_GRAYSCALE)
-                    
-                    # Extract text using available engine
-                    if self.preferred_engine == "tesseract" and self.tesseract_available:
-                        result = self.extract_text_tesseract(image)
-                    elif self.preferred_engine == "easyocr" and self.easyocr_reader:
-                        result = self.extract_text_easyocr(image)
-                    elif self.tesseract_available:
-                        result = self.extract_text_tesseract(image)
-                    elif self.easyocr_reader:
-                        result = self.extract_text_easyocr(image)
-                    else:
-                        return OCRResult(text="", confidence=0.0, engine="no_engine")
-                    
-                    return OCRResult(
-                        text=result.text,
-                        confidence=result.confidence,
-                        engine=f"pdf_{result.engine}"
-                    )
-                    
-                finally:
-                    # Clean up temp file - use try/except for Windows file locking issues
-                    try:
-                        if os.path.exists(tmp_path):
-                            os.unlink(tmp_path)
-                    except (OSError, PermissionError) as e:
-                        # Log but don't fail if we can't delete temp file
-                        logger.warning(f"Could not delete temp file {tmp_path}: {e}")
-                        # Temp files will be cleaned up by system eventually
-                    
-            except ImportError:
-                # pdf2image not available, return informative message
-                return OCRResult(
-                    text="PDF processing requires pdf2image library. Please install it for PDF support.",
-                    confidence=0.0,
-                    engine="pdf_missing_dependency"
-                )
+            page_count = get_pdf_page_count(pdf_path)
+            if page_count == 0:
+                raise ValueError("No images extracted from PDF")
+            
+            if self._pdf_page_workers(page_count) > 1:
+                # Read text layers up front so only pages that need OCR go to the pool
+                pages_by_number = {}
+                if get_ocr_setting('OCR_PDF_USE_TEXT_LAYER', True):
+                    with PDFTextLayer(pdf_path) as text_layer:
+                        for page_number in range(1, page_count + 1):
+                            result = text_layer.page_result(page_number)
+                            if result is not None:
+                                pages_by_number[page_number] = result
                 
+                ocr_page_numbers = [n for n in range(1, page_count + 1) if n not in pages_by_number]
+                workers = self._pdf_page_workers(len(ocr_page_numbers))
+                if workers > 1:
+                    ocr_pages = self._process_pdf_parallel(pdf_path, ocr_page_numbers, workers, preprocess)
+                else:
+                    ocr_pages = [self.ocr_pdf_page(pdf_path, n, preprocess=preprocess)
+                                 for n in ocr_page_numbers]
+                for result in ocr_pages:
+                    pages_by_number[result.page_number] = result
+                pages = [pages_by_number[n] for n in sorted(pages_by_number)]
+            else:
+                pages = list(self.iter_pdf_pages(pdf_path, preprocess))
+            
+            if not any(page.engine not in ("error", "no_engine") for page in pages):
+                return OCRResult(text="", confidence=0.0, engine="no_engine", pages=pages)
+            
+            return combine_page_results(pages)
+            
+        except ImportError:
+            # pdf2image not available, return informative message
+            return OCRResult(
+                text="PDF processing requires pdf2image library. Please install it for PDF support.",
+                confidence=0.0,
+                engine="pdf_missing_dependency"
+            )
         except Exception as e:
             logger.error(f"PDF processing failed: {e}")
             return OCRResult(
@@ -282,6 +406,36 @@ class OCREngine:
                 confidence=0.0,
                 engine="pdf_error"
             )
+    
+    def _pdf_page_workers(self, page_count: int) -> int:
+        """Decide how many processes to spread PDF pages across"""
+        if page_count < 2 or self.preferred_engine == "easyocr":
+            # Loading the EasyOCR model in every worker process costs more than it saves
+            return 1
+        import os
+        workers = get_ocr_setting('OCR_PDF_PAGE_WORKERS', os.cpu_count() or 1)
+        return max(1, min(int(workers or 1), page_count))
+    
+    def _process_pdf_parallel(self, pdf_path: str, page_numbers: List[int],
+                              workers: int, preprocess: bool) -> List[OCRResult]:
+        """Rasterize and OCR pages on the shared page pool, each worker rendering its own page"""
+        from concurrent.futures.process import BrokenProcessPool
+        
+        dpi = get_ocr_setting('OCR_PDF_DPI', 200)
+        tasks = [
+            (pdf_path, page_number, dpi, preprocess,
+             self.preferred_engine, self.tesseract_backend.name)
+            for page_number in page_numbers
+        ]
+        
+        pool = _get_pdf_pool()
+        logger.info(f"Processing {len(page_numbers)} PDF pages across {workers} processes")
+        try:
+            return list(pool.map(_ocr_pdf_page_worker, tasks))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            _discard_pdf_pool(pool)
+            raise
 
 class TemplateProcessor:
     """Process documents using predefined templates"""
@@ -407,6 +561,133 @@ class TemplateProcessor:
         
         return ""  # Field not found
 
+def get_pdf_page_count(pdf_path: str) -> int:
+    """Get the number of pages in a PDF (raises ImportError without pdfplumber or pdf2image)"""
+    try:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except ImportError:
+        from pdf2image import pdfinfo_from_path
+        return int(pdfinfo_from_path(pdf_path).get('Pages', 0))
+
+
+def iter_pdf_page_images(pdf_path: str, dpi: Optional[int] = None,
+                         first_page: int = 1,
+                         last_page: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Rasterize PDF pages one at a time
+    
+    Args:
+        pdf_path: Path to PDF file
+        dpi: Rasterization resolution (defaults to OCR_PDF_DPI)
+        first_page: First page to render (1-based)
+        last_page: Last page to render (defaults to the last page)
+        
+    Yields:
+        Tuple of (page_number, grayscale page image)
+    """
+    from pdf2image import convert_from_path
+    
+    dpi = dpi or get_ocr_setting('OCR_PDF_DPI', 200)
+    if last_page is None:
+        last_page = get_pdf_page_count(pdf_path)
+    
+    for page_number in range(first_page, last_page + 1):
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, grayscale=True
+        )
+        if not images:
+            continue
+        yield page_number, np.array(images[0].convert('L'))
+
+
+def combine_page_results(pages: List[OCRResult]) -> OCRResult:
+    """
+    Combine per-page OCR results into one document-level result
+    
+    Args:
+        pages: Page results in page order
+        
+    Returns:
+        OCRResult with concatenated text, mean confidence of pages with text,
+        and the page results attached
+    """
+    text_pages = [page for page in pages if page.text]
+    confidence = (
+        sum(page.confidence for page in text_pages) / len(text_pages)
+        if text_pages else 0.0
+    )
+    # Report the OCR engine if any page needed OCR, otherwise the text layer
+    engines = [page.engine for page in pages if page.source == "ocr"
+               and page.engine not in ("error", "no_engine")]
+    engines = engines or [page.engine for page in pages if page.source == "text_layer"]
+    
+    return OCRResult(
+        text="\n\n".join(page.text for page in text_pages),
+        confidence=confidence,
+        engine=f"pdf_{engines[0] if engines else 'error'}",
+        pages=pages
+    )
+
+
+# Engines of a page worker process, by (preferred_engine, tesseract_backend)
+_worker_engines: Dict[Tuple[str, str], OCREngine] = {}
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool():
+    """
+    Process-wide pool PDF pages are OCR'd on, created on first use
+
+    Workers are spawned rather than forked: this process runs request and
+    pool threads, and a forked child would inherit their locks in whatever
+    state they happened to be. Spawning costs an interpreter start and the
+    imports once per worker; the pool then lives as long as the process, and
+    each worker keeps its engine for every later page.
+
+    Returns:
+        ProcessPoolExecutor with OCR_PDF_PAGE_WORKERS workers
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                import multiprocessing
+                import os
+                from concurrent.futures import ProcessPoolExecutor
+                workers = max(1, int(get_ocr_setting('OCR_PDF_PAGE_WORKERS', os.cpu_count() or 1) or 1))
+                _pdf_pool = ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+                logger.info(f"Started PDF page pool with {workers} spawned worker(s)")
+    return _pdf_pool
+
+
+def _discard_pdf_pool(pool) -> None:
+    """Drop a broken page pool so the next PDF starts a new one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _ocr_pdf_page_worker(task: Tuple) -> OCRResult:
+    """Process pool entry point: rasterize and OCR a single PDF page"""
+    pdf_path, page_number, dpi, preprocess, preferred_engine, tesseract_backend = task
+    
+    # One engine per configuration and worker process, reused for every page
+    # it handles; the long-lived pool serves requests for different engines
+    key = (preferred_engine, tesseract_backend)
+    engine = _worker_engines.get(key)
+    if engine is None:
+        engine = _worker_engines[key] = OCREngine(preferred_engine, tesseract_backend=tesseract_backend)
+    
+    return engine.ocr_pdf_page(pdf_path, page_number, dpi, preprocess)
+
+
 # Utility functions
 def get_supported_formats() -> List[str]:
     """Get list of supported image formats"""
@@ -0,0 +1,144 @@
+"""
+PDF Text Layer Extraction
+Reads embedded text from born-digital PDF pages so they can skip rasterization and OCR
+"""
+import logging
+import string
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    pdfplumber = None
+    PDFPLUMBER_AVAILABLE = False
+
+# Minimum non-whitespace characters for a page's text layer to count as usable
+DEFAULT_MIN_CHARS = 25
+
+# Share of characters that must be ordinary printable text; broken font
+# encodings produce "(cid:123)" sequences or private-use glyphs instead
+MIN_PRINTABLE_RATIO = 0.9
+
+_PRINTABLE = set(string.printable) | set("–—‘’“”•€£°±×é")
+
+
+class PDFTextLayer:
+    """
+    Opens a PDF once and hands out text-layer results page by page
+
+    Usage:
+        with PDFTextLayer(pdf_path) as text_layer:
+            result = text_layer.page_result(1)  # None if the page needs OCR
+    """
+
+    def __init__(self, pdf_path: str, min_chars: int = DEFAULT_MIN_CHARS):
+        self.pdf_path = pdf_path
+        self.min_chars = min_chars
+        self._pdf = None
+
+    def __enter__(self) -> 'PDFTextLayer':
+        if PDFPLUMBER_AVAILABLE:
+            try:
+                self._pdf = pdfplumber.open(self.pdf_path)
+            except Exception as e:
+                logger.warning(f"Could not read PDF text layer of {self.pdf_path}: {e}")
+                self._pdf = None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    def is_usable(self, text: str) -> bool:
+        """
+        Check whether extracted text is real content rather than an empty or garbled layer
+
+        Args:
+            text: Text extracted from the page
+
+        Returns:
+            True if the page can skip OCR
+        """
+        if '(cid:' in text:
+            return False
+        chars = [c for c in text if not c.isspace()]
+        if len(chars) < self.min_chars:
+            return False
+        printable = sum(1 for c in chars if c in _PRINTABLE or c.isalnum())
+        return printable / len(chars) >= MIN_PRINTABLE_RATIO
+
+    def page_layout(self, page_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Extract text, word positions and ruling lines from one page
+
+        Args:
+            page_number: 1-based page number
+
+        Returns:
+            Dictionary with text, words, h_lines, v_lines, width and height
+            (coordinates in PDF points), or None if the page cannot be read
+        """
+        if self._pdf is None or not 1 <= page_number <= len(self._pdf.pages):
+            return None
+
+        try:
+            page = self._pdf.pages[page_number - 1]
+            text = page.extract_text() or ""
+            words: List[Dict[str, Any]] = [
+                {
+                    'text': word['text'],
+                    'x0': round(float(word['x0']), 2),
+                    'top': round(float(word['top']), 2),
+                    'x1': round(float(word['x1']), 2),
+                    'bottom': round(float(word['bottom']), 2),
+                }
+                for word in page.extract_words()
+            ]
+            # Ruling lines from drawn lines and rectangle edges
+            h_lines = sorted({round(float(edge['top']), 1) for edge in page.edges
+                              if edge.get('orientation') == 'h'})
+            v_lines = sorted({round(float(edge['x0']), 1) for edge in page.edges
+                              if edge.get('orientation') == 'v'})
+        except Exception as e:
+            logger.warning(f"Text layer extraction failed on page {page_number}: {e}")
+            return None
+
+        return {
+            'text': text,
+            'words': words,
+            'h_lines': h_lines,
+            'v_lines': v_lines,
+            'width': float(page.width),
+            'height': float(page.height),
+        }
+
+    def page_result(self, page_number: int):
+        """
+        Build an OCRResult from the text layer if it is usable
+
+        Args:
+            page_number: 1-based page number
+
+        Returns:
+            OCRResult with source "text_layer", or None if the page needs OCR
+        """
+        from ocr_processing.ocr_core import OCRResult
+
+        layout = self.page_layout(page_number)
+        if layout is None or not self.is_usable(layout['text']):
+            return None
+
+        text = layout.pop('text').strip()
+        logger.info(f"Page {page_number}: using embedded text layer ({len(layout['words'])} words)")
+        return OCRResult(
+            text=text,
+            confidence=100.0,  # Embedded text is exact, not recognized
+            engine="text_layer",
+            page_number=page_number,
+            source="text_layer",
+            layout=layout
+        )
@@ -0,0 +1,216 @@
+"""
+Template Processing Profile
+Per-template record of the detection settings that worked for its documents,
+applied directly to new documents and refreshed from their outcomes
+"""
+import logging
+from collections import Counter
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from ocr_processing.detection_context import BINARIZATION_ADAPTIVE
+from ocr_processing.enhanced_table_detector import EnhancedTableDetector, DetectionStrategy
+
+logger = logging.getLogger(__name__)
+
+# Key of the profile inside Template.structure
+PROFILE_KEY = 'processing_profile'
+
+# Prefix template_upload gives detection_method for enhanced detections
+ENHANCED_PREFIX = 'enhanced_'
+
+DEFAULT_MIN_CONFIDENCE = 60.0
+DEFAULT_WINDOW = 10
+DEFAULT_REFRESH_AFTER = 3
+
+
+def get_profile_settings() -> Tuple[bool, float, int, int]:
+    """
+    Template processing profile settings
+
+    Returns:
+        Tuple of (enabled, min_confidence, window, refresh_after)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    enabled = bool(get_ocr_setting('OCR_TEMPLATE_PROFILE', True))
+    min_confidence = float(get_ocr_setting('OCR_TEMPLATE_PROFILE_MIN_CONFIDENCE', DEFAULT_MIN_CONFIDENCE))
+    window = int(get_ocr_setting('OCR_TEMPLATE_PROFILE_WINDOW', DEFAULT_WINDOW))
+    refresh_after = int(get_ocr_setting('OCR_TEMPLATE_PROFILE_REFRESH_AFTER', DEFAULT_REFRESH_AFTER))
+    return enabled, min_confidence, max(1, window), max(1, refresh_after)
+
+
+@dataclass
+class ProcessingProfile:
+    """Detection settings learned for one template"""
+    strategy: str  # Strategy method, e.g. "morphology"
+    line_kernel: Optional[int] = None  # Working pixels; None scales with the page
+    binarization: str = BINARIZATION_ADAPTIVE
+    denoise_tier: Optional[str] = None  # None lets preprocessing choose
+    engine: Optional[str] = None  # None uses OCR_DEFAULT_ENGINE
+    confidence: float = 0.0  # Confidence of the detection the profile was built from
+    recent: List[Dict[str, Any]] = field(default_factory=list)  # Latest document outcomes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProcessingProfile':
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    @classmethod
+    def from_strategy(cls, strategy: DetectionStrategy, engine: Optional[str] = None) -> 'ProcessingProfile':
+        """Profile repeating a detection's winning strategy with the settings it ran with"""
+        return cls(
+            strategy=strategy.method,
+            line_kernel=strategy.line_kernel,
+            binarization=strategy.binarization or BINARIZATION_ADAPTIVE,
+            denoise_tier=strategy.denoise_tier,
+            engine=engine,
+            confidence=strategy.confidence
+        )
+
+
+def profile_for_template(structure: Optional[Dict[str, Any]]) -> Optional[ProcessingProfile]:
+    """
+    Processing profile stored in a Template.structure
+
+    Templates analysed before profiles existed get one from their recorded
+    detection_method, with preprocessing left to choose the denoise tier.
+
+    Returns:
+        The profile, or None if the template was not built by enhanced detection
+    """
+    if not structure:
+        return None
+    if structure.get(PROFILE_KEY):
+        return ProcessingProfile.from_dict(structure[PROFILE_KEY])
+    method = structure.get('detection_method') or ''
+    if method.startswith(ENHANCED_PREFIX) and method != ENHANCED_PREFIX + 'none':
+        return ProcessingProfile(
+            strategy=method[len(ENHANCED_PREFIX):],
+            confidence=float(structure.get('detection_confidence') or 0.0)
+        )
+    return None
+
+
+def detect_with_profile(image_path: str, profile: ProcessingProfile,
+                        ocr_engine=None) -> Tuple[List[Any], DetectionStrategy, bool]:
+    """
+    Detect a document's tables with its template's profile, searching only on failure
+
+    The profile's strategy runs alone, with its kernel, binarization and
+    denoise tier. When it finds no table or stays below
+    OCR_TEMPLATE_PROFILE_MIN_CONFIDENCE, every strategy is tried as usual.
+
+    Args:
+        image_path: Path to the document image
+        profile: The template's processing profile
+        ocr_engine: Optional OCR engine instance
+
+    Returns:
+        Tuple of (table structures top to bottom, strategy_info of the largest
+        table, whether the profile was used)
+    """
+    _, min_confidence, _, _ = get_profile_settings()
+    detector = EnhancedTableDetector(ocr_engine, profile.line_kernel, profile.binarization)
+    try:
+        result, strategy = detector.detect_single_strategy(image_path, profile.strategy, profile.denoise_tier)
+    except ValueError as e:
+        logger.warning(f"Processing profile could not be applied: {e}")
+        result, strategy = None, DetectionStrategy("None", 0, 0, "none")
+
+    if result is not None and result.cells and strategy.confidence >= min_confidence:
+        logger.info(f"[PROFILE] {strategy.name}: {strategy.cells_found} cells, "
+                    f"confidence {strategy.confidence:.1f}%")
+        return [table for table, _ in detector.tables], strategy, True
+
+    logger.info(f"[PROFILE] {profile.strategy} was not good enough "
+                f"({strategy.confidence:.1f}%), trying every strategy")
+    detector = EnhancedTableDetector(ocr_engine)
+    _, strategy = detector.detect_with_multiple_strategies(image_path)
+    return [table for table, _ in detector.tables], strategy, False
+
+
+def update_profile(profile: ProcessingProfile, strategy: DetectionStrategy, used_profile: bool,
+                   window: int = DEFAULT_WINDOW, refresh_after: int = DEFAULT_REFRESH_AFTER) -> bool:
+    """
+    Add a document outcome to a profile, switching strategy when the profile keeps failing
+
+    Once refresh_after of the last window documents needed the full search,
+    the profile adopts the strategy that won most of those searches, with
+    the line kernel, binarization and denoise tier of its latest win, and its
+    outcome window starts over.
+
+    Args:
+        profile: Profile to update in place
+        strategy: Strategy that produced the document's table
+        used_profile: Whether the profile's own strategy was good enough
+        window: Number of outcomes kept
+        refresh_after: Full searches within the window that trigger a refresh
+
+    Returns:
+        True if the profile switched strategy
+    """
+    profile.recent.append({
+        'method': strategy.method,
+        'confidence': round(float(strategy.confidence), 1),
+        'denoise_tier': strategy.denoise_tier,
+        'line_kernel': strategy.line_kernel,
+        'binarization': strategy.binarization,
+        'profile': used_profile,
+    })
+    del profile.recent[:-window]
+
+    searched = [entry for entry in profile.recent
+                if not entry['profile'] and entry['method'] != 'none']
+    if len(searched) < refresh_after:
+        return False
+
+    counts = Counter(entry['method'] for entry in searched)
+    method = max(counts, key=lambda name: (
+        counts[name],
+        sum(entry['confidence'] for entry in searched if entry['method'] == name)
+    ))
+    if method == profile.strategy:
+        return False
+
+    latest = [entry for entry in searched if entry['method'] == method][-1]
+    logger.info(f"[PROFILE] Switching from {profile.strategy} to {method} "
+                f"after {len(searched)} full searches")
+    profile.strategy = method
+    profile.line_kernel = latest.get('line_kernel')
+    profile.binarization = latest.get('binarization') or BINARIZATION_ADAPTIVE
+    profile.denoise_tier = latest['denoise_tier']
+    profile.confidence = latest['confidence']
+    profile.recent = []
+    return True
+
+
+def record_document_outcome(template, strategy: DetectionStrategy, used_profile: bool) -> None:
+    """
+    Persist one document's outcome in its template's processing profile
+
+    The template row is locked while its structure is read and written
+    back, so concurrent documents do not drop each other's outcomes.
+
+    Args:
+        template: templates.models.Template the document was processed with
+        strategy: Strategy that produced the document's table
+        used_profile: Whether the profile's own strategy was good enough
+    """
+    from django.db import transaction
+
+    _, _, window, refresh_after = get_profile_settings()
+    try:
+        with transaction.atomic():
+            locked = type(template).objects.select_for_update().get(pk=template.pk)
+            profile = profile_for_template(locked.structure)
+            if profile is None:
+                return
+            update_profile(profile, strategy, used_profile, window, refresh_after)
+            locked.structure = dict(locked.structure, **{PROFILE_KEY: profile.to_dict()})
+            locked.save(update_fields=['structure'])
+            template.structure = locked.structure
+    except Exception as e:
+        logger.warning(f"Could not update processing profile of template {template.pk}: {e}")
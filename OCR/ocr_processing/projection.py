@@ -0,0 +1,119 @@
+"""
+Projection-Profile Line Detection
+Finds table rulings from row/column ink projections and run lengths of a
+binarized page, without morphology or contour extraction
+"""
+import numpy as np
+import logging
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A ruling must span at least this share of the page (as in the Morphology strategy)
+MIN_LINE_RATIO = 0.3
+
+# Gaps up to this many pixels (at working resolution) inside a ruling are bridged
+MAX_RUN_GAP = 4
+
+# Pages with a longer side than this are max-pooled 2x before analysis
+DOWNSCALE_ABOVE = 2000
+
+
+def _pool_max(binary: np.ndarray, factor: int) -> np.ndarray:
+    """Downscale a boolean mask by OR-ing factor x factor blocks (keeps 1px lines)"""
+    height = binary.shape[0] // factor * factor
+    width = binary.shape[1] // factor * factor
+    pooled = binary[0:height:factor, 0:width:factor].copy()
+    for dy in range(factor):
+        for dx in range(factor):
+            if dy or dx:
+                pooled |= binary[dy:height:factor, dx:width:factor]
+    return pooled
+
+
+def longest_runs(mask: np.ndarray, max_gap: int = 0) -> np.ndarray:
+    """
+    Length of the longest run of True values in every row
+
+    Args:
+        mask: 2-D boolean array
+        max_gap: Runs separated by at most this many False values count as one
+
+    Returns:
+        Array with the longest run length per row
+    """
+    rows, width = mask.shape
+    result = np.zeros(rows, dtype=np.int64)
+    if rows == 0 or width == 0:
+        return result
+
+    # Pad every row with False on both sides so runs never cross rows
+    padded = np.zeros((rows, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1).ravel()
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return result
+    row = starts // (width + 1)
+
+    # Chain runs of the same row whose gap is small enough
+    new_group = np.ones(len(starts), dtype=bool)
+    new_group[1:] = (row[1:] != row[:-1]) | (starts[1:] - ends[:-1] > max_gap)
+    group_starts = np.flatnonzero(new_group)
+    group_ends = np.append(group_starts[1:], len(starts)) - 1
+    lengths = ends[group_ends] - starts[group_starts]
+
+    np.maximum.at(result, row[group_starts], lengths)
+    return result
+
+
+def _ruling_positions(mask: np.ndarray, axis: int, min_length: int, max_gap: int) -> np.ndarray:
+    """Indices of rows (axis 0) or columns (axis 1) of mask holding a ruling at least min_length long"""
+    # Projection first: only rows/columns with enough ink can hold a ruling
+    candidates = np.flatnonzero(mask.sum(axis=1 - axis) >= min_length)
+    if len(candidates) == 0:
+        return candidates
+    lines = mask[candidates] if axis == 0 else mask[:, candidates].T
+    return candidates[longest_runs(lines, max_gap) >= min_length]
+
+
+def find_rulings(binary: np.ndarray, min_line_ratio: float = MIN_LINE_RATIO,
+                 max_gap: int = MAX_RUN_GAP) -> Tuple[List[int], List[int]]:
+    """
+    Find horizontal and vertical rulings of a binarized page
+
+    A row (column) holds a horizontal (vertical) ruling when it contains a
+    run of ink, allowing short gaps, spanning at least min_line_ratio of
+    the page. Adjacent ruling rows of a thick line are merged into one
+    position. Large pages are max-pooled 2x first.
+
+    Args:
+        binary: Binary page with ink as non-zero
+        min_line_ratio: Shortest ruling as a share of page width/height
+        max_gap: Largest gap inside a ruling, in working-resolution pixels
+
+    Returns:
+        Tuple of (horizontal_lines y positions, vertical_lines x positions)
+    """
+    from ocr_processing.table_detector import merge_close_lines, line_merge_gap
+
+    height, width = binary.shape[:2]
+    mask = binary > 0
+    factor = 2 if max(height, width) > DOWNSCALE_ABOVE else 1
+    if factor > 1:
+        mask = _pool_max(mask, factor)
+    gap = max(1, max_gap // factor)
+
+    rows = _ruling_positions(mask, 0, int(mask.shape[1] * min_line_ratio), gap)
+    cols = _ruling_positions(mask, 1, int(mask.shape[0] * min_line_ratio), gap)
+
+    # Back to working-resolution pixel centers
+    rows = rows * factor + (factor - 1) / 2
+    cols = cols * factor + (factor - 1) / 2
+
+    h_lines = merge_close_lines(np.round(rows).astype(np.int64), line_merge_gap(height))
+    v_lines = merge_close_lines(np.round(cols).astype(np.int64), line_merge_gap(width))
+
+    logger.info(f"Projection profile found {len(h_lines)} horizontal and {len(v_lines)} vertical rulings")
+    return h_lines, v_lines
@@ -0,0 +1,132 @@
+"""
+Image Pyramid
+Per-page stack of downsampled copies, built once and shared by quality
+analysis, skew estimation and coarse localization
+"""
+import cv2
+import numpy as np
+import logging
+from typing import List, Tuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Levels are never reduced below this long side
+MIN_LEVEL_SIZE = 200
+
+# Tiles used for scale-dependent statistics (noise, sharpness) at full resolution
+SAMPLE_TILE_SIZE = 256
+SAMPLE_TILE_COUNT = 16
+
+
+class ImagePyramid:
+    """
+    Grayscale page with lazily built half-resolution levels
+
+    Level 0 is the page itself; each further level halves width and height.
+    Callers ask for the smallest level that still has enough detail for their
+    step (e.g. level_for_size(800) for skew estimation) and only final
+    processing touches level 0.
+    """
+
+    def __init__(self, image: np.ndarray):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self._levels: List[np.ndarray] = [image]
+
+    @property
+    def base(self) -> np.ndarray:
+        """Full-resolution grayscale image"""
+        return self._levels[0]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._levels[0].shape[:2]
+
+    def level(self, index: int) -> np.ndarray:
+        """
+        Get a pyramid level, building missing levels on demand
+
+        Args:
+            index: 0 for full resolution, n for 1/2**n scale
+
+        Returns:
+            Grayscale image at that level (the smallest level if index is too large)
+        """
+        while len(self._levels) <= index:
+            previous = self._levels[-1]
+            if max(previous.shape[:2]) // 2 < MIN_LEVEL_SIZE:
+                break
+            height, width = previous.shape[:2]
+            self._levels.append(
+                cv2.resize(previous, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+            )
+        return self._levels[min(index, len(self._levels) - 1)]
+
+    def level_for_size(self, max_side: int) -> Tuple[np.ndarray, float]:
+        """
+        Get the largest level whose long side is at most max_side
+
+        Args:
+            max_side: Largest acceptable width/height
+
+        Returns:
+            Tuple of (image, scale relative to level 0)
+        """
+        index = 0
+        while max(self.level(index).shape[:2]) > max_side:
+            image = self.level(index + 1)
+            if image is self.level(index):
+                break  # Cannot reduce further
+            index += 1
+        image = self.level(index)
+        return image, image.shape[1] / self.base.shape[1]
+
+    def level_at_least(self, min_side: int) -> Tuple[np.ndarray, float]:
+        """
+        Get the smallest level whose long side is still at least min_side
+
+        Use this when a step resizes to min_side itself, so it starts from
+        the cheapest level that does not lose detail.
+
+        Args:
+            min_side: Smallest acceptable width/height
+
+        Returns:
+            Tuple of (image, scale relative to level 0)
+        """
+        index = 0
+        while True:
+            candidate = self.level(index + 1)
+            if candidate is self.level(index) or max(candidate.shape[:2]) < min_side:
+                break
+            index += 1
+        image = self.level(index)
+        return image, image.shape[1] / self.base.shape[1]
+
+    def sample_tiles(self, tile_size: int = SAMPLE_TILE_SIZE,
+                     count: int = SAMPLE_TILE_COUNT) -> Iterator[np.ndarray]:
+        """
+        Yield full-resolution tiles spread evenly over the page
+
+        Statistics that depend on pixel scale (noise, sharpness) are measured
+        on these instead of on the whole page or on a downsampled level.
+
+        Args:
+            tile_size: Tile width and height
+            count: Approximate number of tiles
+
+        Yields:
+            Views into the level 0 image
+        """
+        base = self.base
+        height, width = base.shape[:2]
+        if height <= tile_size * 2 or width <= tile_size * 2:
+            yield base
+            return
+
+        per_side = max(1, int(np.sqrt(count)))
+        ys = np.linspace(0, height - tile_size, per_side).astype(int)
+        xs = np.linspace(0, width - tile_size, per_side).astype(int)
+        for y in ys:
+            for x in xs:
+                yield base[y:y + tile_size, x:x + tile_size]
@@ -0,0 +1,278 @@
+"""
+Resolution Normalization
+Ingest stage that resamples pages to a working resolution before preprocessing,
+and maps detected coordinates back to original pixel space
+"""
+import cv2
+import numpy as np
+import logging
+from PIL import Image
+from typing import List, Tuple, Optional, Any
+from dataclasses import dataclass
+
+from ocr_processing.utils import MAX_IMAGE_DIMENSION
+
+logger = logging.getLogger(__name__)
+
+# Scans above this resolution are resampled down to it
+TARGET_DPI = 300
+
+# Tesseract reads best with an x-height around 20-30px; pages whose text is
+# much larger than this are downscaled until it is near the target
+TARGET_X_HEIGHT = 30
+MAX_X_HEIGHT = 2 * TARGET_X_HEIGHT
+
+# Text height is measured on a copy with at most this long side; text small
+# enough to vanish there is far below MAX_X_HEIGHT anyway
+X_HEIGHT_SAMPLE_SIZE = 1500
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+_REDUCED_FLAGS = {
+    True: {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+           8: cv2.IMREAD_REDUCED_GRAYSCALE_8},
+    False: {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8},
+}
+
+
+@dataclass
+class ResolutionInfo:
+    """How a page was resampled for processing"""
+    original_size: Tuple[int, int]  # (width, height) in original pixels
+    working_size: Tuple[int, int]  # (width, height) after resampling
+    scale: float  # working pixels per original pixel (<= 1)
+    dpi: Optional[float] = None  # Resolution declared in the file header
+    x_height: Optional[float] = None  # Estimated text height in working pixels
+
+    @property
+    def is_resampled(self) -> bool:
+        return self.scale != 1.0
+
+
+def read_image_header(image_path: str) -> Tuple[int, int, Optional[float]]:
+    """
+    Read image size and DPI from the file header without decoding pixels
+
+    Args:
+        image_path: Path to image file
+
+    Returns:
+        Tuple of (width, height, dpi) with width/height in display orientation
+    """
+    with Image.open(image_path) as img:
+        width, height = img.size
+        dpi = img.info.get('dpi')
+        try:
+            orientation = img.getexif().get(0x0112)
+        except Exception:
+            orientation = None
+
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+
+    dpi_value = None
+    if dpi:
+        try:
+            dpi_value = float(dpi[0]) if isinstance(dpi, (tuple, list)) else float(dpi)
+        except (TypeError, ValueError):
+            dpi_value = None
+    # Cameras and screenshots commonly write a meaningless 72/96 DPI
+    if dpi_value is not None and dpi_value < 100:
+        dpi_value = None
+
+    return width, height, dpi_value
+
+
+def estimate_x_height(gray: np.ndarray, max_side: int = X_HEIGHT_SAMPLE_SIZE) -> Optional[float]:
+    """
+    Estimate typical text height from connected component sizes
+
+    Large pages are measured on a downsampled copy, so the cost does not
+    grow with the page.
+
+    Args:
+        gray: Grayscale image
+        max_side: Long side of the copy the components are measured on
+
+    Returns:
+        Median height of character-like components in pixels of gray, or
+        None if the page has too little text to tell
+    """
+    sample_scale = min(1.0, max_side / max(gray.shape[:2]))
+    if sample_scale < 1.0:
+        gray = cv2.resize(gray, None, fx=sample_scale, fy=sample_scale, interpolation=cv2.INTER_AREA)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+
+    # Character-like: a few pixels tall, not ruling lines, not page-sized blobs
+    is_char = (
+        (heights >= 3) & (heights < gray.shape[0] * 0.05) &
+        (widths < heights * 3) & (areas >= 4)
+    )
+    if is_char.sum() < 20:
+        return None
+    return float(np.median(heights[is_char])) / sample_scale
+
+
+def compute_scale(width: int, height: int, dpi: Optional[float] = None,
+                  max_dimension: int = MAX_IMAGE_DIMENSION,
+                  target_dpi: int = TARGET_DPI) -> float:
+    """
+    Working scale implied by header information alone (never upscales)
+
+    Args:
+        width: Original width in pixels
+        height: Original height in pixels
+        dpi: Declared DPI, if trustworthy
+        max_dimension: Largest allowed width/height
+        target_dpi: Resolution high-DPI scans are reduced to
+
+    Returns:
+        Scale factor in (0, 1]
+    """
+    scale = 1.0
+    long_side = max(width, height)
+    if long_side > max_dimension:
+        scale = min(scale, max_dimension / long_side)
+    if dpi and dpi > target_dpi:
+        scale = min(scale, target_dpi / dpi)
+    return scale
+
+
+def normalize_array(image: np.ndarray, dpi: Optional[float] = None,
+                    max_dimension: int = MAX_IMAGE_DIMENSION) -> Tuple[np.ndarray, ResolutionInfo]:
+    """
+    Resample an already decoded page to the working resolution
+
+    Args:
+        image: Grayscale or BGR image
+        dpi: Resolution the page was scanned or rendered at, if known
+        max_dimension: Largest allowed width/height
+
+    Returns:
+        Tuple of (working image, ResolutionInfo)
+    """
+    height, width = image.shape[:2]
+    scale = compute_scale(width, height, dpi, max_dimension)
+    return _finish_normalization(image, (width, height), scale, dpi)
+
+
+def load_normalized(image_path: str, grayscale: bool = False,
+                    max_dimension: int = MAX_IMAGE_DIMENSION) -> Tuple[Optional[np.ndarray], Optional[ResolutionInfo]]:
+    """
+    Decode an image directly at (close to) its working resolution
+
+    The header is read first; when the page must shrink by 2x or more, OpenCV's
+    reduced decoding is used so the full-resolution bitmap is never materialized
+    (JPEG decodes at reduced size natively).
+
+    Args:
+        image_path: Path to image file
+        grayscale: Decode as grayscale instead of BGR
+        max_dimension: Largest allowed width/height
+
+    Returns:
+        Tuple of (working image, ResolutionInfo), or (None, None) if unreadable
+    """
+    try:
+        width, height, dpi = read_image_header(image_path)
+    except Exception:
+        # Not readable by PIL (or unusual format) - fall back to a full decode
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR)
+        if image is None:
+            return None, None
+        return normalize_array(image, max_dimension=max_dimension)
+
+    scale = compute_scale(width, height, dpi, max_dimension)
+
+    reduction = 1
+    for factor in (8, 4, 2):
+        if scale <= 1.0 / factor:
+            reduction = factor
+            break
+
+    if reduction > 1:
+        image = cv2.imread(image_path, _REDUCED_FLAGS[grayscale][reduction])
+    else:
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR)
+    if image is None:
+        return None, None
+
+    return _finish_normalization(image, (width, height), scale, dpi)
+
+
+def _finish_normalization(image: np.ndarray, original_size: Tuple[int, int],
+                          scale: float, dpi: Optional[float]) -> Tuple[np.ndarray, ResolutionInfo]:
+    """Resize a (possibly reduced) decode to the exact working scale and refine by x-height"""
+    original_width, original_height = original_size
+
+    # Measure text size cheaply at the current scale and shrink pages whose
+    # text is far larger than OCR needs (e.g. close-up phone photos)
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    decoded_scale = gray.shape[1] / original_width
+    x_height = estimate_x_height(gray)
+    if x_height is not None:
+        x_height_at_scale = x_height * scale / decoded_scale
+        if x_height_at_scale > MAX_X_HEIGHT:
+            scale *= TARGET_X_HEIGHT / x_height_at_scale
+
+    working_width = max(1, int(round(original_width * scale)))
+    working_height = max(1, int(round(original_height * scale)))
+    if (image.shape[1], image.shape[0]) != (working_width, working_height):
+        interpolation = cv2.INTER_AREA if working_width < image.shape[1] else cv2.INTER_CUBIC
+        image = cv2.resize(image, (working_width, working_height), interpolation=interpolation)
+
+    info = ResolutionInfo(
+        original_size=(original_width, original_height),
+        working_size=(working_width, working_height),
+        scale=working_width / original_width,
+        dpi=dpi,
+        x_height=x_height * working_width / gray.shape[1] if x_height is not None else None
+    )
+
+    if info.is_resampled:
+        logger.info(
+            f"Resampled page {original_width}x{original_height} -> "
+            f"{working_width}x{working_height} (scale {info.scale:.3f})"
+        )
+
+    return image, info
+
+
+def box_to_original(bbox: Tuple[int, int, int, int], info: ResolutionInfo) -> Tuple[int, int, int, int]:
+    """
+    Map an (x, y, width, height) box from working to original pixel space
+
+    Args:
+        bbox: Box in working pixels
+        info: ResolutionInfo from normalization
+
+    Returns:
+        Box in original pixels
+    """
+    if info is None or not info.is_resampled:
+        return bbox
+    inv = 1.0 / info.scale
+    x, y, w, h = bbox
+    return int(round(x * inv)), int(round(y * inv)), int(round(w * inv)), int(round(h * inv))
+
+
+def cells_to_original(cells: List[Any], info: Optional[ResolutionInfo]) -> None:
+    """
+    Map CellInfo coordinates from working to original pixel space, in place
+
+    Args:
+        cells: Objects with x, y, width and height attributes
+        info: ResolutionInfo from normalization
+    """
+    if info is None or not info.is_resampled:
+        return
+    for cell in cells:
+        cell.x, cell.y, cell.width, cell.height = box_to_original(
+            (cell.x, cell.y, cell.width, cell.height), info
+        )
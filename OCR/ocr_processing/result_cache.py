@@ -0,0 +1,393 @@
+"""
+OCR Result Cache
+Content-addressed cache for OCR and table detection results, with an in-memory
+LRU tier and an on-disk tier shared by all worker processes on the host
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the structure of cached objects changes
+CACHE_SCHEMA_VERSION = 2
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024  # 64MB
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024  # 512MB
+
+# File in the cache directory holding the generation shared by all workers
+GENERATION_FILE = 'generation'
+
+# Engine names that mean the result is an error and must not be cached
+UNCACHEABLE_ENGINES = {'error', 'no_engine', 'pdf_error', 'pdf_missing_dependency'}
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file's bytes
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class OCRResultCache:
+    """
+    Two-tier cache keyed by file content plus processing configuration
+
+    The key covers the SHA-256 of the file bytes, an operation namespace
+    (e.g. "extract_text" or "table:morphology") and a configuration dict
+    (engine, engine version, preprocessing settings), so re-uploads and
+    duplicates hit the cache while any change of engine or settings misses.
+    Values are stored pickled in both tiers, so every hit returns a fresh copy
+    that callers can modify freely.
+
+    Keys also include a generation number kept in the cache directory.
+    clear() advances it, so every worker process stops hitting entries
+    made before the clear, including those in its own memory tier.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES,
+                 enabled: bool = True):
+        self.cache_dir = str(cache_dir) if cache_dir else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._generation = 0  # Used when there is no cache directory to share it through
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+
+    def make_key(self, file_path: str, namespace: str, config: Dict[str, Any]) -> str:
+        """
+        Build a cache key from file content, operation and configuration
+
+        Args:
+            file_path: Path to the input file
+            namespace: Operation name
+            config: Engine and preprocessing settings that affect the result
+
+        Returns:
+            Hex key
+        """
+        payload = json.dumps(
+            {'schema': CACHE_SCHEMA_VERSION, 'generation': self.generation(),
+             'namespace': namespace, 'config': config},
+            sort_keys=True, default=str
+        )
+        config_digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{file_digest(file_path)}:{config_digest}".encode('ascii')).hexdigest()
+
+    def generation(self) -> int:
+        """
+        Current cache generation, as last advanced by clear() in any worker
+
+        Returns:
+            Generation number (0 until the cache is first cleared)
+        """
+        if self.cache_dir:
+            try:
+                with open(os.path.join(self.cache_dir, GENERATION_FILE), 'r') as f:
+                    return int(f.read().strip() or 0)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read OCR cache generation: {e}")
+        return self._generation
+
+    def _advance_generation(self) -> None:
+        """Move every worker sharing the cache directory to a new generation"""
+        generation = self.generation() + 1
+        self._generation = generation
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(generation))
+            os.replace(tmp_path, os.path.join(self.cache_dir, GENERATION_FILE))
+        except OSError as e:
+            logger.warning(f"Could not advance OCR cache generation: {e}")
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            A fresh copy of the cached value, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+
+        if data is None and self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # Keep recently used entries from being evicted
+                with self._lock:
+                    self._counters['disk_hits'] += 1
+                self._remember(key, data)
+            except FileNotFoundError:
+                data = None
+            except OSError as e:
+                logger.warning(f"Could not read OCR cache entry {key}: {e}")
+                data = None
+
+        if data is None:
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable OCR cache entry {key}: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers
+
+        Args:
+            key: Key from make_key
+            value: Picklable result object
+        """
+        if not self.enabled:
+            return
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Result is not cacheable: {e}")
+            return
+
+        self._remember(key, data)
+        with self._lock:
+            self._counters['stores'] += 1
+
+        if self.cache_dir:
+            self._write_disk(key, data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Put an entry in the memory tier, evicting least recently used entries"""
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._counters['evictions'] += 1
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        """Atomically write an entry to the disk tier"""
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so other workers never read partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write OCR cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            over_limit = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used disk entries until under 90% of the size limit"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            target = self.max_disk_bytes * 0.9
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    with self._lock:
+                        self._counters['evictions'] += 1
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def delete(self, key: str) -> None:
+        """Remove one entry from both tiers"""
+        with self._lock:
+            data = self._memory.pop(key, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+        if self.cache_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Invalidate every cached result
+
+        Call this when engine configuration changes in a way the cache key
+        cannot see (e.g. Tesseract language data was replaced). Other worker
+        processes see the new generation on their next lookup; without a cache
+        directory only this process is invalidated.
+        """
+        self._advance_generation()
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith('.pkl'):
+                        try:
+                            os.remove(os.path.join(root, name))
+                        except OSError:
+                            pass
+        logger.info(f"OCR result cache cleared (generation {self._generation})")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and tier sizes
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+            stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (
+            (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        )
+        stats['enabled'] = self.enabled
+        return stats
+
+
+_cache: Optional[OCRResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> OCRResultCache:
+    """
+    Get the process-wide result cache configured from settings
+
+    Returns:
+        Shared OCRResultCache
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from ocr_processing.ocr_core import get_ocr_setting
+                _cache = OCRResultCache(
+                    cache_dir=get_ocr_setting('OCR_RESULT_CACHE_DIR', None),
+                    max_memory_bytes=get_ocr_setting('OCR_RESULT_CACHE_MEMORY_BYTES', DEFAULT_MEMORY_BYTES),
+                    max_disk_bytes=get_ocr_setting('OCR_RESULT_CACHE_DISK_BYTES', DEFAULT_DISK_BYTES),
+                    enabled=get_ocr_setting('OCR_RESULT_CACHE_ENABLED', True)
+                )
+    return _cache
+
+
+def cached_call(file_path: str, namespace: str, config: Dict[str, Any], compute, is_cacheable=None):
+    """
+    Return a cached result for (file content, namespace, config) or compute and store it
+
+    Args:
+        file_path: Input file
+        namespace: Operation name
+        config: Settings that affect the result
+        compute: Zero-argument function producing the result
+        is_cacheable: Optional predicate deciding whether a computed result may be stored
+
+    Returns:
+        Cached or freshly computed result
+    """
+    cache = get_result_cache()
+    if not cache.enabled:
+        return compute()
+
+    try:
+        key = cache.make_key(file_path, namespace, config)
+    except OSError as e:
+        logger.warning(f"Could not hash {file_path} for caching: {e}")
+        return compute()
+
+    result = cache.get(key)
+    if result is not None:
+        logger.info(f"OCR cache hit for {namespace} ({os.path.basename(file_path)})")
+        return result
+
+    result = compute()
+    if result is not None and (is_cacheable is None or is_cacheable(result)):
+        cache.set(key, result)
+    return result
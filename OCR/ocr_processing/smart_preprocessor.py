@@ -3,14 +3,38 @@ Smart Image Preprocessing Module
 Handles complex real-world document images with advanced preprocessing techniques
 """
 import cv2
+import time
 import numpy as np
 from PIL import Image, ImageEnhance
 import logging
 from typing import Tuple, Dict, Any, Optional
 from dataclasses import dataclass
 
+from ocr_processing.deskew import estimate_skew_angle, THUMBNAIL_SIZE as SKEW_THUMBNAIL_SIZE
+from ocr_processing.denoise import (
+    estimate_noise, denoise_tiered, choose_tier, apply_tier, strength_for_noise,
+    get_denoise_budget_ms, TIER_SKIP
+)
+from ocr_processing.pyramid import ImagePyramid
+from ocr_processing.tiling import process_tiled, should_tile
+from ocr_processing.work_buffers import WorkBuffers, get_work_buffers
+
 logger = logging.getLogger(__name__)
 
+# Long side of the pyramid level used for brightness and contrast
+QUALITY_LEVEL_SIZE = 2048
+
+# Shadow background is estimated at 1/4 scale (pyramid level 2)
+SHADOW_PYRAMID_LEVEL = 2
+SHADOW_DOWNSCALE = 2 ** SHADOW_PYRAMID_LEVEL
+
+# CLAHE grid over the whole page; tiled runs keep the same cell size per tile
+CLAHE_GRID = (8, 8)
+
+SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                           [-1,  9, -1],
+                           [-1, -1, -1]])
+
 
 @dataclass
 class ImageQualityMetrics:
@@ -22,6 +46,8 @@ class ImageQualityMetrics:
     skew_angle: float
     resolution: Tuple[int, int]
     quality_score: float  # 0-100
+    denoise_tier: str = TIER_SKIP  # Denoiser chosen by preprocessing
+    denoise_ms: float = 0.0  # Time spent denoising
 
 
 class SmartImagePreprocessor:
@@ -33,37 +59,48 @@ class SmartImagePreprocessor:
     def __init__(self):
         self.min_quality_score = 60
         
-    def analyze_image_quality(self, image: np.ndarray) -> ImageQualityMetrics:
+    def analyze_image_quality(self, image: np.ndarray,
+                              pyramid: Optional[ImagePyramid] = None) -> ImageQualityMetrics:
         """
         Analyze image to determine optimal preprocessing strategy
         
+        Global statistics and skew are measured on reduced pyramid levels;
+        scale-dependent ones (sharpness, noise) on a sample of full-resolution tiles.
+        
         Args:
             image: Input image (BGR or grayscale)
+            pyramid: Pyramid of the same image, built if not given
             
         Returns:
             ImageQualityMetrics with analysis results
         """
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        # Measure brightness (mean intensity)
-        brightness = np.mean(gray)
-        
-        # Measure contrast (standard deviation)
-        contrast = np.std(gray)
-        
-        # Measure sharpness (Laplacian variance)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        sharpness = laplacian.var()
+        if pyramid is None:
+            pyramid = ImagePyramid(image)
+        gray = pyramid.base
+        overview, _ = pyramid.level_for_size(QUALITY_LEVEL_SIZE)
+        
+        # Measure brightness (mean intensity) and contrast (standard deviation)
+        mean, stddev = cv2.meanStdDev(overview)
+        brightness = float(mean[0, 0])
+        contrast = float(stddev[0, 0])
+        
+        # Measure sharpness (Laplacian variance) and noise at full resolution,
+        # on evenly spread tiles only
+        tiles = list(pyramid.sample_tiles())
+        total = total_sq = count = 0.0
+        for tile in tiles:
+            laplacian = cv2.Laplacian(tile, cv2.CV_32F)
+            total += float(laplacian.sum(dtype=np.float64))
+            total_sq += float(np.square(laplacian, dtype=np.float64).sum())
+            count += laplacian.size
+        sharpness = total_sq / count - (total / count) ** 2
         
         # Estimate noise level
-        noise_level = self._estimate_noise(gray)
+        noise_level = float(np.mean([self._estimate_noise(tile) for tile in tiles]))
         
-        # Detect skew angle
-        skew_angle = self._detect_skew_angle(gray)
+        # Detect skew angle on the smallest level the estimator can use
+        skew_source, _ = pyramid.level_at_least(SKEW_THUMBNAIL_SIZE)
+        skew_angle = self._detect_skew_angle(skew_source)
         
         # Calculate overall quality score
         quality_score = self._calculate_quality_score(
@@ -88,43 +125,16 @@ class SmartImagePreprocessor:
     
     def _estimate_noise(self, gray: np.ndarray) -> float:
         """Estimate noise level using median absolute deviation"""
-        H, W = gray.shape
-        M = [[1, -2, 1],
-             [-2, 4, -2],
-             [1, -2, 1]]
-        sigma = np.sum(np.sum(np.absolute(cv2.filter2D(gray, -1, np.array(M)))))
-        sigma = sigma * np.sqrt(0.5 * np.pi) / (6 * (W-2) * (H-2))
-        return sigma
+        return estimate_noise(gray)
     
     def _detect_skew_angle(self, gray: np.ndarray) -> float:
         """
-        Detect document skew angle using Hough Line Transform
+        Detect document skew angle on a downsampled, binarized copy
         
         Returns:
             Skew angle in degrees
         """
-        # Apply edge detection
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
-        
-        # Detect lines
-        lines = cv2.HoughLines(edges, 1, np.pi/180, 200)
-        
-        if lines is None:
-            return 0.0
-        
-        # Calculate angles
-        angles = []
-        for rho, theta in lines[:, 0]:
-            angle = np.degrees(theta) - 90
-            # Filter out vertical and horizontal lines
-            if -45 < angle < 45:
-                angles.append(angle)
-        
-        if not angles:
-            return 0.0
-        
-        # Return median angle
-        return float(np.median(angles))
+        return estimate_skew_angle(gray)
     
     def _calculate_quality_score(self, brightness: float, contrast: float, 
                                  sharpness: float, noise: float) -> float:
@@ -186,79 +196,112 @@ class SmartImagePreprocessor:
         logger.info(f"Rotated image by {angle:.2f}°")
         return rotated
     
-    def remove_shadows(self, image: np.ndarray) -> np.ndarray:
+    def remove_shadows(self, image: np.ndarray, mode: Optional[str] = None,
+                       pyramid: Optional[ImagePyramid] = None,
+                       dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Remove shadows and lighting variations using morphological operations
         
+        In "downsampled" mode the background is estimated on a 1/4 scale copy
+        (a pyramid level when one is given) and upsampled, so only the final
+        subtraction runs at full resolution. "full" mode estimates it at full
+        resolution.
+        
         Args:
             image: Grayscale image
+            mode: "downsampled" or "full" (OCR_SHADOW_REMOVAL_MODE if None)
+            pyramid: Pyramid whose base is this image
+            dst: Optional preallocated output (must not be image)
             
         Returns:
             Shadow-corrected image
         """
-        # Dilate to remove text, leaving only background
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
-        dilated = cv2.dilate(image, kernel, iterations=2)
+        if mode is None:
+            from ocr_processing.ocr_core import get_ocr_setting
+            mode = get_ocr_setting('OCR_SHADOW_REMOVAL_MODE', 'downsampled')
         
-        # Blur the background
-        background = cv2.medianBlur(dilated, 21)
+        if mode == "full":
+            background = self._estimate_background(image, 15, 21)
+        else:
+            background = self._estimate_background_downsampled(image, pyramid, dst)
         
         # Subtract background from original
-        corrected = cv2.absdiff(image, background)
+        corrected = cv2.absdiff(image, background, dst=dst)
         
         # Invert if needed
-        corrected = 255 - corrected
+        corrected = cv2.bitwise_not(corrected, dst=corrected)
         
-        logger.info("Shadow removal applied")
+        logger.info(f"Shadow removal applied ({mode})")
         return corrected
     
-    def enhance_contrast_adaptive(self, image: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _estimate_background(image: np.ndarray, kernel_size: int, blur_size: int) -> np.ndarray:
+        """Dilate to remove text, leaving only background, then blur it"""
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+        dilated = cv2.dilate(image, kernel, iterations=2)
+        return cv2.medianBlur(dilated, blur_size)
+    
+    def _estimate_background_downsampled(self, image: np.ndarray,
+                                         pyramid: Optional[ImagePyramid] = None,
+                                         dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimate the background at 1/SHADOW_DOWNSCALE scale and upsample it (into dst if given)"""
+        height, width = image.shape[:2]
+        if pyramid is not None and pyramid.base is image:
+            small = pyramid.level(SHADOW_PYRAMID_LEVEL)
+        else:
+            small = cv2.resize(image, (max(1, width // SHADOW_DOWNSCALE), max(1, height // SHADOW_DOWNSCALE)),
+                               interpolation=cv2.INTER_AREA)
+        
+        # Scale the full-resolution kernel sizes with the image (blur size must stay odd)
+        factor = width / small.shape[1]
+        kernel_size = max(3, int(round(15 / factor)))
+        blur_size = max(3, int(round(21 / factor)) | 1)
+        background = self._estimate_background(small, kernel_size, blur_size)
+        
+        return cv2.resize(background, (width, height), dst=dst, interpolation=cv2.INTER_LINEAR)
+    
+    def enhance_contrast_adaptive(self, image: np.ndarray,
+                                  dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply adaptive histogram equalization (CLAHE)
         
         Args:
             image: Grayscale image
+            dst: Optional preallocated output (must not be image)
             
         Returns:
             Contrast-enhanced image
         """
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(image)
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=CLAHE_GRID)
+        enhanced = clahe.apply(image, dst)
         
         logger.info("Adaptive contrast enhancement applied")
         return enhanced
     
-    def denoise_smart(self, image: np.ndarray, noise_level: float) -> np.ndarray:
+    def denoise_smart(self, image: np.ndarray, noise_level: float,
+                      budget_ms: Optional[float] = None) -> np.ndarray:
         """
         Apply noise reduction based on detected noise level
         
         Args:
             image: Grayscale image
             noise_level: Estimated noise level
+            budget_ms: Denoising time budget (OCR_DENOISE_BUDGET_MS if None)
             
         Returns:
             Denoised image
         """
-        if noise_level < 5:
-            # Low noise - no denoising needed
-            return image
-        elif noise_level < 15:
-            # Medium noise - gentle denoising
-            denoised = cv2.fastNlMeansDenoising(image, None, h=10, templateWindowSize=7, searchWindowSize=21)
-        else:
-            # High noise - aggressive denoising
-            denoised = cv2.fastNlMeansDenoising(image, None, h=15, templateWindowSize=7, searchWindowSize=21)
-        
-        logger.info(f"Denoising applied (noise level: {noise_level:.2f})")
-        return denoised
+        return denoise_tiered(image, noise_level, budget_ms).image
     
-    def sharpen_if_needed(self, image: np.ndarray, sharpness: float) -> np.ndarray:
+    def sharpen_if_needed(self, image: np.ndarray, sharpness: float,
+                          dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply sharpening if image is blurry
         
         Args:
             image: Grayscale image
             sharpness: Measured sharpness score
+            dst: Optional preallocated output (must not be image)
             
         Returns:
             Sharpened image
@@ -267,60 +310,66 @@ class SmartImagePreprocessor:
             # Image is sharp enough
             return image
         
-        # Create sharpening kernel
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]])
-        
-        sharpened = cv2.filter2D(image, -1, kernel)
+        sharpened = cv2.filter2D(image, -1, SHARPEN_KERNEL, dst=dst)
         
         logger.info(f"Sharpening applied (sharpness: {sharpness:.1f})")
         return sharpened
     
-    def normalize_brightness(self, image: np.ndarray, target: float = 180) -> np.ndarray:
+    def normalize_brightness(self, image: np.ndarray, target: float = 180,
+                             dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Normalize image brightness to target level
         
         Args:
             image: Grayscale image
             target: Target mean brightness (0-255)
+            dst: Optional preallocated output (may be image itself)
             
         Returns:
             Brightness-normalized image
         """
-        current_mean = np.mean(image)
+        current_mean = cv2.mean(image)[0]
         
-        if abs(current_mean - target) < 10:
+        lut = self._brightness_lut(current_mean, target)
+        if lut is None:
             return image
         
-        # Calculate adjustment factor
-        factor = target / current_mean
-        
-        # Apply adjustment
-        normalized = np.clip(image * factor, 0, 255).astype(np.uint8)
+        normalized = cv2.LUT(image, lut, dst=dst)
         
         logger.info(f"Brightness normalized from {current_mean:.1f} to {target:.1f}")
         return normalized
     
-    def binarize_adaptive(self, image: np.ndarray, method: str = "auto") -> np.ndarray:
+    @staticmethod
+    def _brightness_lut(current_mean: float, target: float) -> Optional[np.ndarray]:
+        """Lookup table scaling the mean brightness to target, or None if it is close enough"""
+        if abs(current_mean - target) < 10:
+            return None
+        
+        # Apply adjustment through a lookup table (clipped and truncated, stays uint8)
+        factor = target / current_mean
+        return np.clip(np.arange(256) * factor, 0, 255).astype(np.uint8)
+    
+    def binarize_adaptive(self, image: np.ndarray, method: str = "auto",
+                          dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply adaptive binarization for better text/background separation
         
+        In "auto" mode the ink ratio of each method is predicted first (Otsu from
+        the histogram, adaptive from a sample of tiles) and only the chosen
+        binarization is computed over the full page.
+        
         Args:
             image: Grayscale image
             method: "otsu", "adaptive", or "auto"
+            dst: Optional preallocated output (may be image itself)
             
         Returns:
             Binary image
         """
         if method == "auto":
-            # Try both methods and pick best
-            otsu_binary = self._apply_otsu(image)
-            adaptive_binary = self._apply_adaptive(image)
-            
-            # Compare results (prefer higher text-to-background ratio)
-            otsu_ratio = np.sum(otsu_binary == 0) / otsu_binary.size
-            adaptive_ratio = np.sum(adaptive_binary == 0) / adaptive_binary.size
+            # Predict both methods' ink ratios and pick the best
+            otsu_threshold, otsu_ratio = self._otsu_from_histogram(image)
+            adaptive_ratio = self._adaptive_ink_ratio(image)
             
             # Pick method with ratio closer to 15-20% (typical for documents)
             otsu_score = abs(otsu_ratio - 0.175)
@@ -328,75 +377,207 @@ class SmartImagePreprocessor:
             
             if otsu_score < adaptive_score:
                 logger.info(f"Using Otsu binarization (ratio: {otsu_ratio:.2%})")
-                return otsu_binary
+                _, binary = cv2.threshold(image, otsu_threshold, 255, cv2.THRESH_BINARY, dst=dst)
+                return binary
             else:
                 logger.info(f"Using adaptive binarization (ratio: {adaptive_ratio:.2%})")
-                return adaptive_binary
+                return self._apply_adaptive(image, dst)
         
         elif method == "otsu":
-            return self._apply_otsu(image)
+            return self._apply_otsu(image, dst)
         else:
-            return self._apply_adaptive(image)
+            return self._apply_adaptive(image, dst)
+    
+    @staticmethod
+    def _otsu_from_histogram(image: np.ndarray) -> Tuple[float, float]:
+        """
+        Compute Otsu's threshold and the share of pixels it marks as ink
+        
+        Returns:
+            Tuple of (threshold, ink ratio)
+        """
+        hist = cv2.calcHist([image], [0], None, [256], [0, 256]).ravel().astype(np.float64)
+        total = hist.sum()
+        levels = np.arange(256, dtype=np.float64)
+        
+        # Between-class variance for every split "<= t" vs "> t"
+        weight_dark = np.cumsum(hist)
+        weight_light = total - weight_dark
+        sum_dark = np.cumsum(hist * levels)
+        mean_dark = sum_dark / np.maximum(weight_dark, 1)
+        mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+        between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+        
+        threshold = int(np.argmax(between))
+        return float(threshold), float(weight_dark[threshold] / total)
     
-    def _apply_otsu(self, image: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _adaptive_ink_ratio(image: np.ndarray) -> float:
+        """Estimate the adaptive threshold's ink ratio from full-resolution sample tiles"""
+        ink = count = 0
+        for tile in ImagePyramid(image).sample_tiles():
+            binary = SmartImagePreprocessor._apply_adaptive(tile)
+            ink += int(binary.size - cv2.countNonZero(binary))
+            count += binary.size
+        return ink / count if count else 0.0
+    
+    @staticmethod
+    def _apply_otsu(image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply Otsu's thresholding"""
-        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)
         return binary
     
-    def _apply_adaptive(self, image: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _apply_adaptive(image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply adaptive thresholding"""
         binary = cv2.adaptiveThreshold(
             image, 255,
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY,
             blockSize=11,
-            C=2
+            C=2,
+            dst=dst
         )
         return binary
     
-    def preprocess_for_table_detection(self, image: np.ndarray) -> Tuple[np.ndarray, ImageQualityMetrics]:
+    def _run_table_stages(self, pyramid: ImagePyramid, buffers: WorkBuffers,
+                          denoise_tier: Optional[str] = None) -> Tuple[np.ndarray, ImageQualityMetrics]:
         """
-        Complete preprocessing pipeline optimized for table detection
+        Run the table-detection stages, alternating between the work buffers
         
-        Args:
-            image: Input image (BGR or grayscale)
-            
-        Returns:
-            Tuple of (preprocessed_image, quality_metrics)
+        The base image is only read; every stage writes into the buffer the
+        previous stage did not use. The returned image may be a work buffer.
+        A given denoise_tier replaces the noise-based choice.
         """
-        logger.info("Starting smart preprocessing pipeline")
-        
-        # Convert to grayscale
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = pyramid.base
         
         # Analyze image quality
-        metrics = self.analyze_image_quality(gray)
+        metrics = self.analyze_image_quality(gray, pyramid)
         
-        # Step 1: Remove shadows
-        gray = self.remove_shadows(gray)
+        if should_tile(gray.shape):
+            # Steps 1-5 fused per tile on very large pages
+            gray = self._run_enhancement_tiled(pyramid, metrics, denoise_tier)
+        else:
+            buffers.prepare(gray.shape)
+            
+            # Step 1: Remove shadows
+            gray = self.remove_shadows(gray, pyramid=pyramid, dst=buffers.other(gray))
+            
+            # Step 2: Normalize brightness (elementwise, so in place)
+            gray = self.normalize_brightness(gray, target=180, dst=gray)
+            
+            # Step 3: Denoise based on noise level and time budget
+            denoised = denoise_tiered(gray, metrics.noise_level, dst=buffers.other(gray), tier=denoise_tier)
+            gray = denoised.image
+            metrics.denoise_tier = denoised.tier
+            metrics.denoise_ms = denoised.elapsed_ms
+            
+            # Step 4: Enhance contrast
+            gray = self.enhance_contrast_adaptive(gray, dst=buffers.other(gray))
+            
+            # Step 5: Sharpen if needed
+            gray = self.sharpen_if_needed(gray, metrics.sharpness, dst=buffers.other(gray))
         
-        # Step 2: Normalize brightness
-        gray = self.normalize_brightness(gray, target=180)
+        # Step 6: Rotate to correct skew (changes the page size, so allocates)
+        if abs(metrics.skew_angle) > 0.5:
+            gray = self.auto_rotate(gray, metrics.skew_angle)
+        
+        return gray, metrics
+    
+    def _run_enhancement_tiled(self, pyramid: ImagePyramid, metrics: ImageQualityMetrics,
+                               denoise_tier: Optional[str] = None) -> np.ndarray:
+        """
+        Run shadow removal, brightness, denoising, CLAHE and sharpening tile by tile
         
-        # Step 3: Denoise based on noise level
-        gray = self.denoise_smart(gray, metrics.noise_level)
+        Decisions that need the whole page are made once on pyramid levels:
+        the shadow background (downsampled mode), the brightness factor and
+        the denoise tier. Each tile then runs the whole chain on its padded
+        region, so only a few tile-sized intermediates exist at a time. CLAHE
+        sees tile-local histograms, so tiles are blended across the overlap.
         
-        # Step 4: Enhance contrast
-        gray = self.enhance_contrast_adaptive(gray)
+        Returns:
+            Enhanced page (a new array, not a work buffer)
+        """
+        from ocr_processing.ocr_core import get_ocr_setting
+        mode = get_ocr_setting('OCR_SHADOW_REMOVAL_MODE', 'downsampled')
+        gray = pyramid.base
+        height, width = gray.shape[:2]
+        
+        # Shadow background at 1/4 scale, and the brightness the corrected page will have
+        small = pyramid.level(SHADOW_PYRAMID_LEVEL)
+        factor = width / small.shape[1]
+        small_background = self._estimate_background(
+            small, max(3, int(round(15 / factor))), max(3, int(round(21 / factor)) | 1)
+        )
+        corrected_mean = 255 - cv2.mean(cv2.absdiff(small, small_background))[0]
+        lut = self._brightness_lut(corrected_mean, 180)
+        
+        budget_ms = get_denoise_budget_ms()
+        tier = denoise_tier or choose_tier(metrics.noise_level, gray.size / 1e6, budget_ms)
+        strength = strength_for_noise(metrics.noise_level)
+        sharpen = metrics.sharpness <= 300
+        cell_w, cell_h = width / CLAHE_GRID[0], height / CLAHE_GRID[1]
+        denoise_ms = []
+        
+        def enhance_tile(tile: np.ndarray, y0: int, x0: int) -> np.ndarray:
+            if mode == "full":
+                # Dilation and median reach 24px, well inside the tile overlap
+                background = self._estimate_background(tile, 15, 21)
+            else:
+                # Upsample the matching part of the background the way a
+                # full-page INTER_LINEAR resize would sample it
+                sx, sy = small.shape[1] / width, small.shape[0] / height
+                M = np.float32([[sx, 0, (x0 + 0.5) * sx - 0.5], [0, sy, (y0 + 0.5) * sy - 0.5]])
+                background = cv2.warpAffine(
+                    small_background, M, (tile.shape[1], tile.shape[0]),
+                    flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE
+                )
+            out = cv2.bitwise_not(cv2.absdiff(tile, background, dst=background), dst=background)
+            if lut is not None:
+                out = cv2.LUT(out, lut, dst=out)
+            
+            start = time.perf_counter()
+            out = apply_tier(out, tier, strength)
+            denoise_ms.append((time.perf_counter() - start) * 1000)
+            
+            grid = (max(1, int(round(tile.shape[1] / cell_w))), max(1, int(round(tile.shape[0] / cell_h))))
+            out = cv2.createCLAHE(clipLimit=3.0, tileGridSize=grid).apply(out)
+            if sharpen:
+                out = cv2.filter2D(out, -1, SHARPEN_KERNEL)
+            return out
+        
+        enhanced = process_tiled(gray, enhance_tile, blend=True, with_offsets=True)
+        metrics.denoise_tier = tier
+        metrics.denoise_ms = sum(denoise_ms)
+        
+        logger.info(f"Tiled enhancement applied (shadows: {mode}, denoise: {tier}, "
+                    f"sharpen: {sharpen})")
+        return enhanced
+    
+    def preprocess_for_table_detection(self, image: np.ndarray,
+                                       pyramid: Optional[ImagePyramid] = None,
+                                       denoise_tier: Optional[str] = None) -> Tuple[np.ndarray, ImageQualityMetrics]:
+        """
+        Complete preprocessing pipeline optimized for table detection
         
-        # Step 5: Sharpen if needed
-        gray = self.sharpen_if_needed(gray, metrics.sharpness)
+        Args:
+            image: Input image (BGR or grayscale)
+            pyramid: Pyramid of the same image, built if not given
+            denoise_tier: Force this denoise tier instead of choosing by noise level
+            
+        Returns:
+            Tuple of (preprocessed_image, quality_metrics)
+        """
+        logger.info("Starting smart preprocessing pipeline")
         
-        # Step 6: Rotate to correct skew
-        if abs(metrics.skew_angle) > 0.5:
-            gray = self.auto_rotate(gray, metrics.skew_angle)
+        if pyramid is None:
+            pyramid = ImagePyramid(image)
+        buffers = get_work_buffers()
+        gray, metrics = self._run_table_stages(pyramid, buffers, denoise_tier)
         
         logger.info("Smart preprocessing completed")
         
-        return gray, metrics
+        return buffers.detach(gray), metrics
     
     def preprocess_for_ocr(self, image: np.ndarray, enhance_handwriting: bool = True) -> np.ndarray:
         """
@@ -412,19 +593,26 @@ class SmartImagePreprocessor:
         logger.info("Starting OCR preprocessing")
         
         # Basic preprocessing
-        processed, metrics = self.preprocess_for_table_detection(image)
+        buffers = get_work_buffers()
+        processed, metrics = self._run_table_stages(ImagePyramid(image), buffers)
+        private = not buffers.owns(processed)
+        if private:
+            # Rotation produced a new, larger page; alternate between it and one scratch array
+            buffers = WorkBuffers.around(processed)
         
         if enhance_handwriting:
             # Additional steps for handwriting
             # Slight blur to connect broken characters
-            processed = cv2.GaussianBlur(processed, (3, 3), 0)
+            processed = cv2.GaussianBlur(processed, (3, 3), 0, dst=buffers.other(processed))
             
             # Morphological closing to connect broken strokes
             kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
-            processed = cv2.morphologyEx(processed, cv2.MORPH_CLOSE, kernel)
+            processed = cv2.morphologyEx(processed, cv2.MORPH_CLOSE, kernel, dst=buffers.other(processed))
         
-        # Final binarization
-        binary = self.binarize_adaptive(processed, method="auto")
+        # Final binarization into an array the caller may keep (private arrays
+        # belong to this call; the thread's buffers are reused by the next page)
+        output = buffers.other(processed) if private else np.empty_like(processed)
+        binary = self.binarize_adaptive(processed, method="auto", dst=output)
         
         logger.info("OCR preprocessing completed")
         
@@ -0,0 +1,214 @@
+"""
+Strategy Telemetry
+Persists per-strategy runtime, confidence and win/loss of table detection per
+image-quality bucket, and orders and prunes the strategy plan from those stats
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ocr_processing.denoise import tier_for_noise, TIER_SKIP
+
+logger = logging.getLogger(__name__)
+
+# Quality score boundaries between the "low", "medium" and "high" buckets
+QUALITY_BOUNDS = (40.0, 70.0)
+
+# Pages skewed by more than this many degrees are bucketed as "skewed"
+SKEW_BOUND = 0.5
+
+# Page size boundaries (megapixels) between "small", "medium" and "large"
+SIZE_BOUNDS = (2.0, 8.0)
+
+DEFAULT_PRUNE_MIN_RUNS = 20
+DEFAULT_EXPLORE_EVERY = 25
+
+
+def get_telemetry_settings() -> Tuple[bool, int, int]:
+    """
+    Strategy telemetry settings
+
+    Returns:
+        Tuple of (enabled, prune_min_runs, explore_every); prune_min_runs 0
+        disables pruning and explore_every 0 disables exploration runs
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    enabled = bool(get_ocr_setting('OCR_STRATEGY_TELEMETRY', True))
+    prune_min_runs = int(get_ocr_setting('OCR_STRATEGY_PRUNE_MIN_RUNS', DEFAULT_PRUNE_MIN_RUNS))
+    explore_every = int(get_ocr_setting('OCR_STRATEGY_EXPLORE_EVERY', DEFAULT_EXPLORE_EVERY))
+    return enabled, prune_min_runs, explore_every
+
+
+def _tier(value: float, bounds: Sequence[float], names: Sequence[str]) -> str:
+    """Name of the interval of bounds that value falls into"""
+    for bound, name in zip(bounds, names):
+        if value < bound:
+            return name
+    return names[-1]
+
+
+def quality_bucket(metrics: Any) -> str:
+    """
+    Coarse bucket of an ImageQualityMetrics
+
+    Pages in one bucket tend to favour the same strategies: quality score,
+    whether the page needs denoising, whether it is skewed, and its size.
+
+    Args:
+        metrics: ImageQualityMetrics of the page
+
+    Returns:
+        Bucket key such as "high/clean/straight/medium"
+    """
+    quality = _tier(metrics.quality_score, QUALITY_BOUNDS, ("low", "medium", "high"))
+    noise = "clean" if tier_for_noise(metrics.noise_level) == TIER_SKIP else "noisy"
+    skew = "skewed" if abs(metrics.skew_angle) > SKEW_BOUND else "straight"
+    width, height = metrics.resolution
+    size = _tier(width * height / 1e6, SIZE_BOUNDS, ("small", "medium", "large"))
+    return f"{quality}/{noise}/{skew}/{size}"
+
+
+@dataclass
+class MethodStats:
+    """Stats of one strategy in one bucket"""
+    runs: int = 0
+    found: int = 0
+    wins: int = 0
+    total_ms: float = 0.0
+
+    @property
+    def expected_win_rate(self) -> float:
+        """Win rate with a uniform prior, so unseen strategies rank between winners and losers"""
+        return (self.wins + 1) / (self.runs + 2)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.runs if self.runs else 0.0
+
+
+def load_stats(bucket: str) -> Dict[str, MethodStats]:
+    """
+    Stats of every strategy recorded for a bucket
+
+    Returns:
+        Mapping of method name to MethodStats (empty if the database is unavailable)
+    """
+    from ocr_processing.models import StrategyStat
+    try:
+        return {
+            row.method: MethodStats(row.runs, row.found, row.wins, row.total_ms)
+            for row in StrategyStat.objects.filter(bucket=bucket)
+        }
+    except Exception as e:
+        logger.warning(f"Could not load strategy stats: {e}")
+        return {}
+
+
+def load_detections(bucket: str) -> int:
+    """
+    Number of detections recorded for a bucket
+
+    Returns:
+        Detection count (0 if none were recorded or the database is unavailable)
+    """
+    from ocr_processing.models import StrategyBucket
+    try:
+        row = StrategyBucket.objects.filter(bucket=bucket).first()
+        return row.detections if row else 0
+    except Exception as e:
+        logger.warning(f"Could not load strategy bucket: {e}")
+        return 0
+
+
+def order_plan(plan: List[Tuple[str, str, Any]], stats: Dict[str, MethodStats],
+               first_pass: Sequence[str] = (), prune_min_runs: int = DEFAULT_PRUNE_MIN_RUNS,
+               explore: bool = False) -> List[Tuple[str, str, Any]]:
+    """
+    Reorder and prune a strategy plan from bucket stats
+
+    First-pass strategies keep their place in front. The others run in
+    order of expected win rate, cheaper first among equals. Strategies that
+    ran at least prune_min_runs times without ever winning are dropped,
+    unless this is an exploration run.
+
+    Args:
+        plan: (name, method, run) entries in default priority order
+        stats: Bucket stats from load_stats
+        first_pass: Methods that always run first
+        prune_min_runs: Runs without a win after which a strategy is skipped
+        explore: Keep every strategy (occasional full runs keep the stats fresh)
+
+    Returns:
+        The reordered plan
+    """
+    def never_wins(method: str) -> bool:
+        entry = stats.get(method)
+        return (not explore and prune_min_runs > 0 and entry is not None
+                and entry.runs >= prune_min_runs and entry.wins == 0)
+
+    head = [entry for entry in plan if entry[1] in first_pass]
+    rest = [(index, entry) for index, entry in enumerate(plan) if entry[1] not in first_pass]
+    rest.sort(key=lambda item: (
+        -stats.get(item[1][1], MethodStats()).expected_win_rate,
+        stats.get(item[1][1], MethodStats()).mean_ms,
+        item[0]
+    ))
+    ordered = head + [entry for _, entry in rest]
+
+    kept = [entry for entry in ordered if not never_wins(entry[1])]
+    pruned = [entry[0] for entry in ordered if never_wins(entry[1])]
+    if not kept:
+        return ordered
+    if pruned:
+        logger.info(f"Skipping strategies that never won on this kind of page: {', '.join(pruned)}")
+    return kept
+
+
+def is_exploration_run(detections: int, explore_every: int) -> bool:
+    """
+    Whether the next detection in a bucket should run every strategy
+
+    Args:
+        detections: Detections recorded for the bucket (see load_detections),
+            including those where no strategy found a table
+        explore_every: Every this many detections is an exploration run
+    """
+    if explore_every <= 0:
+        return False
+    return (detections + 1) % explore_every == 0
+
+
+def record_outcomes(bucket: str, runs: Dict[str, Tuple[float, Optional[float]]],
+                    winner: Optional[str]) -> None:
+    """
+    Add one detection's outcomes to the persisted stats
+
+    The bucket's detection count goes up even when no strategy won, so
+    exploration runs stay on schedule on pages nothing can read.
+
+    Args:
+        bucket: Bucket key from quality_bucket
+        runs: Method -> (elapsed_ms, confidence or None if no table was found)
+            for every strategy that finished
+        winner: Method whose result was selected, if any
+    """
+    from django.db import transaction
+    from django.db.models import F
+    from ocr_processing.models import StrategyBucket, StrategyStat
+
+    try:
+        with transaction.atomic():
+            StrategyBucket.objects.get_or_create(bucket=bucket)
+            StrategyBucket.objects.filter(bucket=bucket).update(detections=F('detections') + 1)
+            for method, (elapsed_ms, confidence) in runs.items():
+                StrategyStat.objects.get_or_create(bucket=bucket, method=method)
+                found = confidence is not None
+                StrategyStat.objects.filter(bucket=bucket, method=method).update(
+                    runs=F('runs') + 1,
+                    found=F('found') + int(found),
+                    wins=F('wins') + int(method == winner),
+                    total_ms=F('total_ms') + elapsed_ms,
+                    confidence_sum=F('confidence_sum') + (confidence or 0.0)
+                )
+    except Exception as e:
+        logger.warning(f"Could not record strategy stats: {e}")
@@ -4,14 +4,27 @@ Implements robust table detection using OpenCV line detection and grid analysis
 """
 import cv2
 import numpy as np
-import pytesseract
-from PIL import Image
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 import logging
+from functools import partial
+from ocr_processing.cell_executor import get_cell_executor
+from ocr_processing.cell_index import CellIndex
+from ocr_processing.result_cache import cached_call
+from ocr_processing.tesseract_backend import get_tesseract_backend, tesseract_cache_config
+from ocr_processing.resolution import load_normalized, cells_to_original, ResolutionInfo
+from ocr_processing.tiling import process_tiled, should_tile
+from ocr_processing.line_params import (
+    LineParams, line_params, reduce_binary, get_line_detection_settings
+)
+from ocr_processing.table_regions import TableRegion, localize_tables, map_regions, get_localization_settings
 
 logger = logging.getLogger(__name__)
 
+# Line positions closer than this share of the page size are one ruling
+LINE_MERGE_FRACTION = 0.004
+MIN_LINE_MERGE_GAP = 3
+
 
 @dataclass
 class CellInfo:
@@ -25,6 +38,8 @@ class CellInfo:
     text: str = ""
     confidence: float = 0.0
     is_header: bool = False
+    row_span: int = 1  # Grid rows covered by a merged cell
+    col_span: int = 1  # Grid columns covered by a merged cell
 
 
 @dataclass
@@ -35,26 +50,104 @@ class TableStructure:
     cells: List[CellInfo]
     headers: Dict[str, str]  # {col_index: header_text}
     grid_confidence: float
+    bbox: Optional[Tuple[int, int, int, int]] = None  # Localized table region (x, y, w, h)
+    
+
+def ocr_cell_image(cell_img: np.ndarray, backend: Optional[str] = None) -> Tuple[str, float]:
+    """
+    OCR a single cell image with the process-wide Tesseract backend
+    
+    Module-level so it can run in a process pool.
+    
+    Args:
+        cell_img: Cropped cell image
+        backend: Tesseract backend name (defaults to OCR_TESSERACT_BACKEND)
+        
+    Returns:
+        Tuple of (extracted_text, confidence)
+    """
+    if cell_img.size == 0:
+        return "", 0.0
     
+    try:
+        data = get_tesseract_backend(backend).image_to_data(cell_img)
+    except Exception as e:
+        logger.error(f"Error extracting text from cell: {e}")
+        return "", 0.0
+    
+    # Extract text and confidence
+    text = " ".join([
+        word for word, conf in zip(data['text'], data['conf'])
+        if conf > 0 and word.strip()
+    ])
+    
+    # Calculate average confidence
+    confidences = [c for c in data['conf'] if c > 0]
+    avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
+    
+    return text.strip(), avg_conf
+
+
+def line_merge_gap(extent: int) -> int:
+    """
+    Largest distance between line positions that still belong to one ruling
+    
+    Args:
+        extent: Page size across the lines (height for horizontal lines)
+        
+    Returns:
+        Gap in pixels, proportional to the page size
+    """
+    return max(MIN_LINE_MERGE_GAP, int(round(extent * LINE_MERGE_FRACTION)))
+
+
+def merge_close_lines(positions: List[int], max_gap: int) -> List[int]:
+    """
+    Merge near-duplicate line positions into one per ruling
+    
+    Thick or broken rulings show up as several positions a few pixels
+    apart; each run of sorted positions whose neighbours are at most
+    max_gap apart is replaced by its median.
+    
+    Args:
+        positions: Line coordinates (any order, duplicates allowed)
+        max_gap: Largest gap inside one cluster
+        
+    Returns:
+        Sorted, merged line coordinates
+    """
+    if len(positions) == 0:
+        return []
+    
+    values = np.sort(np.asarray(positions, dtype=np.int64))
+    # Cluster boundaries are where the gap to the previous value is too large
+    starts = np.flatnonzero(np.diff(values, prepend=values[0] - max_gap - 1) > max_gap)
+    bounds = np.append(starts, len(values))
+    return [int(np.round(np.median(values[a:b]))) for a, b in zip(bounds[:-1], bounds[1:])]
+
 
 class TableDetector:
     """Detects and extracts table structure from images"""
     
+    # Characters Tesseract produces when it reads ruling lines as text
+    LINE_ARTIFACT_CHARS = "|_[]!"
+    
     def __init__(self, ocr_engine=None):
         """
         Initialize table detector
         
         Args:
-            ocr_engine: Optional OCR engine instance (defaults to pytesseract)
+            ocr_engine: Optional OCR engine instance (defaults to the OCR_TESSERACT_BACKEND backend)
         """
         self.ocr_engine = ocr_engine
         
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
+    def preprocess_image(self, image: np.ndarray, params: Optional[LineParams] = None) -> np.ndarray:
         """
         Preprocess image for better table detection
         
         Args:
             image: Input image (BGR or grayscale)
+            params: Line parameters of the page (from the image size if None)
             
         Returns:
             Preprocessed image ready for line detection
@@ -66,27 +159,35 @@ class TableDetector:
             gray = image.copy()
         
         # Apply adaptive thresholding
+        params = params or line_params(gray.shape)
         binary = cv2.adaptiveThreshold(
             gray, 255, 
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
             cv2.THRESH_BINARY_INV, 
-            11, 2
+            params.block_size, 2
         )
         
         return binary
     
-    def detect_lines(self, binary_image: np.ndarray) -> Tuple[List, List]:
+    def line_masks(self, binary_image: np.ndarray,
+                   params: Optional[LineParams] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Detect horizontal and vertical lines in the image
+        Isolate horizontal and vertical ruling lines with morphological opening
         
         Args:
-            binary_image: Binary image with table
+            binary_image: Binary image with table, at detection scale
+                (reduced by params.factor, see reduce_binary)
+            params: Line parameters of the page (full-size detection on
+                this image if None)
             
         Returns:
-            Tuple of (horizontal_lines, vertical_lines)
+            Tuple of (horizontal_mask, vertical_mask)
         """
+        params = params or line_params(binary_image.shape, reduce=False)
+        kernel_length = params.reduced(params.kernel_length)
+        
         # Detect horizontal lines
-        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
+        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_length, 1))
         horizontal_lines = cv2.morphologyEx(
             binary_image, 
             cv2.MORPH_OPEN, 
@@ -95,7 +196,7 @@ class TableDetector:
         )
         
         # Detect vertical lines
-        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, kernel_length))
         vertical_lines = cv2.morphologyEx(
             binary_image, 
             cv2.MORPH_OPEN, 
@@ -103,6 +204,28 @@ class TableDetector:
             iterations=2
         )
         
+        return horizontal_lines, vertical_lines
+    
+    def lines_from_masks(
+        self,
+        horizontal_lines: np.ndarray,
+        vertical_lines: np.ndarray,
+        params: Optional[LineParams] = None
+    ) -> Tuple[List, List]:
+        """
+        Turn line masks into sorted line positions
+        
+        Args:
+            horizontal_lines: Mask of horizontal ruling lines, at detection scale
+            vertical_lines: Mask of vertical ruling lines, at detection scale
+            params: Line parameters of the page (full-size masks if None)
+            
+        Returns:
+            Tuple of (horizontal_lines, vertical_lines) in working-resolution pixels
+        """
+        params = params or line_params(horizontal_lines.shape, reduce=False)
+        min_length = params.reduced(params.min_line_length)
+        
         # Find contours to get line positions
         h_contours, _ = cv2.findContours(
             horizontal_lines, 
@@ -120,34 +243,85 @@ class TableDetector:
         h_lines = []
         for contour in h_contours:
             x, y, w, h = cv2.boundingRect(contour)
-            if w > 50:  # Filter out noise
+            if w > min_length:  # Filter out noise
                 h_lines.append(y)
         
         # Extract x-coordinates of vertical lines
         v_lines = []
         for contour in v_contours:
             x, y, w, h = cv2.boundingRect(contour)
-            if h > 50:  # Filter out noise
+            if h > min_length:  # Filter out noise
                 v_lines.append(x)
         
-        # Sort lines
-        h_lines = sorted(set(h_lines))
-        v_lines = sorted(set(v_lines))
+        # Back to working resolution, then merge positions of the same ruling and sort
+        h_lines = merge_close_lines(params.to_working(h_lines), params.merge_gap(0))
+        v_lines = merge_close_lines(params.to_working(v_lines), params.merge_gap(1))
         
         logger.info(f"Detected {len(h_lines)} horizontal lines and {len(v_lines)} vertical lines")
         
         return h_lines, v_lines
     
-    def detect_grid_with_hough(self, binary_image: np.ndarray) -> Tuple[List, List]:
+    def detect_lines(self, binary_image: np.ndarray,
+                     params: Optional[LineParams] = None) -> Tuple[List, List]:
+        """
+        Detect horizontal and vertical lines in the image
+        
+        The binary image is reduced by params.factor first, so the openings
+        cost roughly 1/factor^2 of a full-size run.
+        
+        Args:
+            binary_image: Binary image with table, at working resolution
+            params: Line parameters of the page (from the image size if None)
+            
+        Returns:
+            Tuple of (horizontal_lines, vertical_lines)
+        """
+        params = params or line_params(binary_image.shape)
+        reduced = reduce_binary(binary_image, params.factor)
+        return self.lines_from_masks(*self.line_masks(reduced, params), params)
+    
+    def detect_lines_tiled(self, image: np.ndarray, params: Optional[LineParams] = None,
+                           **tiling) -> Tuple[List, List]:
+        """
+        Binarize tile by tile on a very large page, then detect lines at reduced scale
+        
+        Thresholding only looks half a threshold block around each pixel, so
+        tiles overlap by that much (params.threshold_reach) and the stitched
+        binary image is identical to the full-page one. Besides it, only the
+        reduced image and its masks are allocated.
+        
+        Args:
+            image: Input image (BGR or grayscale) at working resolution
+            params: Line parameters of the page (from the image size if None)
+            **tiling: Optional tile_size/overlap/workers overrides for process_tiled
+            
+        Returns:
+            Tuple of (horizontal_lines, vertical_lines)
+        """
+        params = params or line_params(image.shape)
+        tiling.setdefault('overlap', params.threshold_reach)
+        binary = process_tiled(image, lambda tile: self.preprocess_image(tile, params), **tiling)
+        return self.detect_lines(binary, params)
+    
+    def detect_grid_with_hough(self, binary_image: np.ndarray, params: Optional[LineParams] = None,
+                               reduced: bool = False) -> Tuple[List, List]:
         """
         Alternative method: Use Hough Line Transform for line detection
         
         Args:
-            binary_image: Binary image with table
+            binary_image: Binary image with table, at working resolution
+            params: Line parameters of the page (from the image size if None)
+            reduced: binary_image is already reduced by params.factor
             
         Returns:
             Tuple of (horizontal_lines, vertical_lines)
         """
+        params = params or line_params(binary_image.shape)
+        if not reduced:
+            binary_image = reduce_binary(binary_image, params.factor)
+        min_length = params.reduced(params.hough_min_length)
+        tolerance = params.reduced(params.axis_tolerance)
+        
         # Apply edge detection
         edges = cv2.Canny(binary_image, 50, 150, apertureSize=3)
         
@@ -156,9 +330,9 @@ class TableDetector:
             edges,
             rho=1,
             theta=np.pi/180,
-            threshold=100,
-            minLineLength=100,
-            maxLineGap=10
+            threshold=min_length,
+            minLineLength=min_length,
+            maxLineGap=params.reduced(params.hough_max_gap)
         )
         
         if lines is None:
@@ -168,20 +342,20 @@ class TableDetector:
         h_lines = []
         v_lines = []
         
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
+        # (N, 1, 4) before OpenCV 5, (N, 4) since
+        for x1, y1, x2, y2 in lines.reshape(-1, 4):
             
             # Check if line is horizontal (small y difference)
-            if abs(y2 - y1) < 10:
+            if abs(y2 - y1) < tolerance:
                 h_lines.append((y1 + y2) // 2)
             
             # Check if line is vertical (small x difference)
-            elif abs(x2 - x1) < 10:
+            elif abs(x2 - x1) < tolerance:
                 v_lines.append((x1 + x2) // 2)
         
-        # Remove duplicates and sort
-        h_lines = sorted(set(h_lines))
-        v_lines = sorted(set(v_lines))
+        # Back to working resolution, then merge positions of the same ruling and sort
+        h_lines = merge_close_lines(params.to_working(h_lines), params.merge_gap(0))
+        v_lines = merge_close_lines(params.to_working(v_lines), params.merge_gap(1))
         
         logger.info(f"Hough detected {len(h_lines)} horizontal, {len(v_lines)} vertical lines")
         
@@ -225,26 +399,38 @@ class TableDetector:
         
         return cells
     
-    def extract_cell_text(self, image: np.ndarray, cell: CellInfo) -> Tuple[str, float]:
+    def crop_cell(self, image: np.ndarray, cell: CellInfo, padding: int = 5) -> np.ndarray:
         """
-        Extract text from a specific cell using OCR
+        Crop a cell region, shrunk by padding to keep ruling lines out
         
         Args:
             image: Original image
             cell: Cell information with coordinates
+            padding: Pixels trimmed from each side
             
         Returns:
-            Tuple of (extracted_text, confidence)
+            Cell image (may be empty for very small cells)
         """
-        # Add padding to avoid cutting text
-        padding = 5
         y1 = max(0, cell.y + padding)
         y2 = min(image.shape[0], cell.y + cell.height - padding)
         x1 = max(0, cell.x + padding)
         x2 = min(image.shape[1], cell.x + cell.width - padding)
         
-        # Extract cell region
-        cell_img = image[y1:y2, x1:x2]
+        return image[y1:y2, x1:x2]
+    
+    def extract_cell_text(self, image: np.ndarray, cell: CellInfo) -> Tuple[str, float]:
+        """
+        Extract text from a specific cell using OCR
+        
+        Args:
+            image: Original image
+            cell: Cell information with coordinates
+            
+        Returns:
+            Tuple of (extracted_text, confidence)
+        """
+        # Add padding to avoid cutting text
+        cell_img = self.crop_cell(image, cell)
         
         if cell_img.size == 0:
             return "", 0.0
@@ -253,36 +439,177 @@ class TableDetector:
             # Run OCR on cell
             if self.ocr_engine:
                 # Use provided OCR engine
-                from ocr_processing.ocr_core import OCRResult
                 result = self.ocr_engine.extract_text_tesseract(cell_img)
                 return result.text.strip(), result.confidence
             else:
-                # Use pytesseract directly
-                data = pytesseract.image_to_data(
-                    cell_img, 
-                    output_type=pytesseract.Output.DICT
-                )
-                
-                # Extract text and confidence
-                text = " ".join([
-                    word for word, conf in zip(data['text'], data['conf'])
-                    if conf > 0 and word.strip()
-                ])
-                
-                # Calculate average confidence
-                confidences = [c for c in data['conf'] if c > 0]
-                avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
-                
-                return text.strip(), avg_conf
+                # Use the process-wide Tesseract backend
+                return ocr_cell_image(cell_img)
                 
         except Exception as e:
             logger.error(f"Error extracting text from cell: {e}")
             return "", 0.0
     
+    def extract_cells_text(self, image: np.ndarray, cells: List[CellInfo]) -> None:
+        """
+        Run per-cell OCR on the shared cell executor, filling cells in place
+        
+        Args:
+            image: Original image
+            cells: Cells to read
+        """
+        executor = get_cell_executor()
+        
+        if executor.mode == "process":
+            # Ship only the cell crops to worker processes, not the whole page;
+            # the backend goes by name, as worker processes build their own
+            backend = self.ocr_engine.tesseract_backend if self.ocr_engine else get_tesseract_backend()
+            crops = [self.crop_cell(image, cell) for cell in cells]
+            results = executor.map(partial(ocr_cell_image, backend=backend.name), crops)
+        else:
+            results = executor.map(lambda cell: self.extract_cell_text(image, cell), cells)
+        
+        for cell, (text, confidence) in zip(cells, results):
+            cell.text = text
+            cell.confidence = confidence
+    
+    def extract_page_words(
+        self,
+        image: np.ndarray,
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run OCR once over the page (or a region of it) and collect word boxes
+        
+        Args:
+            image: Original image
+            region: Optional (x1, y1, x2, y2) crop to OCR instead of the full page
+            
+        Returns:
+            Dictionary with 'text' (list), 'conf' (N array) and
+            'boxes' (N x 4 array of x1, y1, x2, y2 in page coordinates)
+        """
+        offset_x, offset_y = 0, 0
+        if region is not None:
+            x1, y1, x2, y2 = region
+            offset_x, offset_y = max(0, x1), max(0, y1)
+            image = image[offset_y:max(offset_y, y2), offset_x:max(offset_x, x2)]
+        
+        backend = self.ocr_engine.tesseract_backend if self.ocr_engine else get_tesseract_backend()
+        data = backend.image_to_data(image)
+        
+        texts, confs, boxes = [], [], []
+        for i in range(len(data['text'])):
+            word = str(data['text'][i]).strip()
+            conf = float(data['conf'][i])
+            # Skip empty entries and ruling lines read as characters
+            if conf <= 0 or not word.strip(self.LINE_ARTIFACT_CHARS):
+                continue
+            left = data['left'][i] + offset_x
+            top = data['top'][i] + offset_y
+            texts.append(word)
+            confs.append(conf)
+            boxes.append((left, top, left + data['width'][i], top + data['height'][i]))
+        
+        return {
+            'text': texts,
+            'conf': np.array(confs, dtype=np.float64),
+            'boxes': np.array(boxes, dtype=np.int64).reshape(-1, 4)
+        }
+    
+    def assign_words_to_cells(
+        self,
+        boxes: np.ndarray,
+        cells: List[CellInfo],
+        tolerance: int = 3,
+        index: Optional[CellIndex] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign word boxes to grid cells through a spatial index
+        
+        A word belongs to the cell containing its center. It is ambiguous when
+        its box spills over the cell border by more than `tolerance` pixels,
+        which usually means Tesseract merged text across a ruling line.
+        
+        Args:
+            boxes: N x 4 array of word boxes (x1, y1, x2, y2)
+            cells: Grid cells
+            tolerance: Allowed overhang in pixels
+            index: Prebuilt CellIndex over the same cells (built if None)
+            
+        Returns:
+            Tuple of (cell index per word, -1 if outside the grid;
+            boolean ambiguity flag per word)
+        """
+        if len(boxes) == 0 or not cells:
+            return np.full(len(boxes), -1, dtype=np.int64), np.zeros(len(boxes), dtype=bool)
+        
+        if index is None:
+            index = CellIndex(cells)
+        cell_index = index.assign_boxes(boxes)
+        has_cell = cell_index >= 0
+        
+        own = index.boxes[np.maximum(cell_index, 0)]
+        ambiguous = has_cell & (
+            (boxes[:, 0] < own[:, 0] - tolerance) |
+            (boxes[:, 1] < own[:, 1] - tolerance) |
+            (boxes[:, 2] > own[:, 2] + tolerance) |
+            (boxes[:, 3] > own[:, 3] + tolerance)
+        )
+        
+        return cell_index, ambiguous
+    
+    def extract_cells_text_single_pass(self, image: np.ndarray, cells: List[CellInfo]) -> int:
+        """
+        Fill cell text by OCR-ing the table region once and assigning words to cells
+        
+        Cells that receive ambiguous words fall back to per-cell OCR.
+        
+        Args:
+            image: Original image
+            cells: Grid cells to fill in place
+            
+        Returns:
+            Number of cells that needed per-cell fallback OCR
+        """
+        if not cells:
+            return 0
+        
+        region = (
+            min(c.x for c in cells),
+            min(c.y for c in cells),
+            max(c.x + c.width for c in cells),
+            max(c.y + c.height for c in cells)
+        )
+        words = self.extract_page_words(image, region)
+        cell_index, ambiguous = self.assign_words_to_cells(words['boxes'], cells)
+        
+        fallback = set(cell_index[ambiguous].tolist())
+        cell_words: Dict[int, List[int]] = {}
+        for word_idx, idx in enumerate(cell_index.tolist()):
+            if idx >= 0:
+                cell_words.setdefault(idx, []).append(word_idx)
+        
+        for idx, cell in enumerate(cells):
+            if idx in fallback:
+                continue
+            word_ids = cell_words.get(idx, [])
+            cell.text = " ".join(words['text'][i] for i in word_ids)
+            cell.confidence = float(words['conf'][word_ids].mean()) if word_ids else 0.0
+        
+        self.extract_cells_text(image, [cells[idx] for idx in sorted(fallback)])
+        
+        logger.info(
+            f"Single-pass OCR: {int((cell_index >= 0).sum())} words assigned to {len(cells)} cells, "
+            f"{len(fallback)} cell(s) re-read individually"
+        )
+        
+        return len(fallback)
+    
     def detect_table_structure(
         self, 
         image_path: str, 
-        method: str = "morphology"
+        method: str = "morphology",
+        ocr_mode: str = "page"
     ) -> Optional[TableStructure]:
         """
         Main method: Detect complete table structure from image
@@ -290,73 +617,186 @@ class TableDetector:
         Args:
             image_path: Path to image file
             method: Detection method ("morphology" or "hough")
+            ocr_mode: "page" to OCR the table region once and assign words
+                to cells, or "cell" to OCR every cell separately
             
         Returns:
-            TableStructure object or None if detection fails
+            TableStructure object (the largest table when the page has
+            several, see detect_tables) or None if detection fails
         """
+        tables = self.detect_tables(image_path, method, ocr_mode)
+        if not tables:
+            return None
+        return max(tables, key=lambda table: len(table.cells))
+    
+    def detect_tables(
+        self,
+        image_path: str,
+        method: str = "morphology",
+        ocr_mode: str = "page"
+    ) -> List[TableStructure]:
+        """
+        Detect every table on a page
+        
+        Tables are first localized on a thumbnail; lines, grid and OCR then
+        run inside each table's crop, in parallel, with coordinates mapped
+        back to page space.
+        
+        Args:
+            image_path: Path to image file
+            method: Detection method ("morphology" or "hough")
+            ocr_mode: "page" or "cell", as in detect_table_structure
+            
+        Returns:
+            TableStructure per table, top to bottom (empty if none was found)
+        """
+        enabled, size, _ = get_localization_settings()
+        settings = {'method': method, 'ocr_mode': ocr_mode, 'localization': size if enabled else None,
+                    'line_detection': list(get_line_detection_settings())}
+        if self.ocr_engine:
+            config = self.ocr_engine.cache_config(**settings)
+        else:
+            config = tesseract_cache_config(**settings)
+        
+        return cached_call(
+            image_path, "table_structures", config,
+            lambda: self._detect_tables_uncached(image_path, method, ocr_mode),
+            # Failures come back as an empty list; only cache pages with tables
+            is_cacheable=lambda tables: bool(tables)
+        )
+    
+    def _detect_tables_uncached(
+        self,
+        image_path: str,
+        method: str,
+        ocr_mode: str
+    ) -> List[TableStructure]:
+        """Run table detection without consulting the result cache"""
         try:
-            # Load image
-            image = cv2.imread(image_path)
+            # Load image at working resolution
+            image, resolution = load_normalized(image_path)
             if image is None:
                 logger.error(f"Failed to load image: {image_path}")
-                return None
-            
-            # Preprocess
-            binary = self.preprocess_image(image)
-            
-            # Detect lines
-            if method == "hough":
-                h_lines, v_lines = self.detect_grid_with_hough(binary)
-            else:
-                h_lines, v_lines = self.detect_lines(binary)
-            
-            # Need at least 2 lines in each direction for a table
-            if len(h_lines) < 2 or len(v_lines) < 2:
-                logger.warning(f"Insufficient lines detected: {len(h_lines)}h, {len(v_lines)}v")
-                return None
-            
-            # Build grid
-            cells = self.build_grid(h_lines, v_lines)
-            
-            # Extract text from each cell
-            for cell in cells:
-                text, confidence = self.extract_cell_text(image, cell)
-                cell.text = text
-                cell.confidence = confidence
-            
-            # Extract headers (first row)
-            headers = {}
-            header_cells = [c for c in cells if c.row == 0]
-            for cell in header_cells:
-                if cell.text:
-                    headers[str(cell.col)] = cell.text
-            
-            # Calculate grid confidence
-            all_confidences = [c.confidence for c in cells if c.confidence > 0]
-            grid_confidence = (
-                sum(all_confidences) / len(all_confidences) 
-                if all_confidences else 0.0
-            )
+                return []
             
-            # Create structure
-            structure = TableStructure(
-                rows=len(h_lines) - 1,
-                cols=len(v_lines) - 1,
-                cells=cells,
-                headers=headers,
-                grid_confidence=grid_confidence
-            )
+            # Sizes follow the whole page, not the crops
+            params = line_params(image.shape)
             
-            logger.info(
-                f"Detected table: {structure.rows}x{structure.cols}, "
-                f"confidence: {grid_confidence:.1f}%"
-            )
+            def detect(region: TableRegion) -> Optional[TableStructure]:
+                try:
+                    return self._detect_region(image, region, params, resolution, method, ocr_mode)
+                except Exception as e:
+                    logger.error(f"Error detecting table in region {region.box}: {e}", exc_info=True)
+                    return None
             
-            return structure
+            tables = map_regions(detect, localize_tables(image))
+            return [table for table in tables if table is not None]
             
         except Exception as e:
             logger.error(f"Error detecting table structure: {e}", exc_info=True)
+            return []
+    
+    def _detect_region(
+        self,
+        image: np.ndarray,
+        region: TableRegion,
+        params: LineParams,
+        resolution: Optional[ResolutionInfo],
+        method: str,
+        ocr_mode: str
+    ) -> Optional[TableStructure]:
+        """Detect and read the table inside one region of the working-resolution page"""
+        crop = region.crop(image)
+        
+        # Preprocess and detect lines
+        if method == "hough":
+            h_lines, v_lines = self.detect_grid_with_hough(self.preprocess_image(crop, params), params)
+        elif should_tile(crop.shape):
+            h_lines, v_lines = self.detect_lines_tiled(crop, params)
+        else:
+            h_lines, v_lines = self.detect_lines(self.preprocess_image(crop, params), params)
+        
+        # Need at least 2 lines in each direction for a table
+        if len(h_lines) < 2 or len(v_lines) < 2:
+            logger.warning(f"Insufficient lines detected: {len(h_lines)}h, {len(v_lines)}v")
             return None
+        
+        # Build grid in page coordinates; OCR then only reads the table's cells
+        cells = self.build_grid(h_lines, v_lines)
+        region.to_page(cells)
+        structure = self.read_structure(
+            image, cells, len(h_lines) - 1, len(v_lines) - 1, resolution, ocr_mode
+        )
+        bbox = [TableRegion(*region.box)]
+        cells_to_original(bbox, resolution)
+        structure.bbox = bbox[0].box
+        return structure
+    
+    def read_structure(
+        self,
+        image: np.ndarray,
+        cells: List[CellInfo],
+        rows: int,
+        cols: int,
+        resolution: Optional[ResolutionInfo] = None,
+        ocr_mode: str = "page"
+    ) -> TableStructure:
+        """
+        OCR located cells and assemble the table structure
+        
+        Args:
+            image: Page at working resolution
+            cells: Cells in working pixel space (mapped to original space in place)
+            rows: Number of grid rows
+            cols: Number of grid columns
+            resolution: ResolutionInfo of the page, if it was resampled
+            ocr_mode: "page" or "cell", as in detect_table_structure
+            
+        Returns:
+            TableStructure with cell text, headers and confidence
+        """
+        # Extract text from cells
+        if ocr_mode == "page":
+            try:
+                self.extract_cells_text_single_pass(image, cells)
+            except Exception as e:
+                logger.warning(f"Single-pass OCR failed ({e}), reading cells individually")
+                ocr_mode = "cell"
+        
+        if ocr_mode != "page":
+            self.extract_cells_text(image, cells)
+        
+        # Store coordinates in original pixel space
+        cells_to_original(cells, resolution)
+        
+        # Extract headers (first row)
+        headers = {}
+        header_cells = [c for c in cells if c.row == 0]
+        for cell in header_cells:
+            if cell.text:
+                headers[str(cell.col)] = cell.text
+        
+        # Calculate grid confidence
+        all_confidences = [c.confidence for c in cells if c.confidence > 0]
+        grid_confidence = (
+            sum(all_confidences) / len(all_confidences) 
+            if all_confidences else 0.0
+        )
+        
+        # Create structure
+        structure = TableStructure(
+            rows=rows,
+            cols=cols,
+            cells=cells,
+            headers=headers,
+            grid_confidence=grid_confidence
+        )
+        
+        logger.info(
+            f"Detected table: {structure.rows}x{structure.cols}, "
+            f"confidence: {grid_confidence:.1f}%"
+        )
+        return structure
     
     def structure_to_dict(self, structure: TableStructure) -> Dict[str, Any]:
         """
@@ -373,6 +813,7 @@ class TableDetector:
             'cols': structure.cols,
             'headers': structure.headers,
             'grid_confidence': structure.grid_confidence,
+            'bbox': list(structure.bbox) if structure.bbox else None,
             'cells': [
                 {
                     'row': cell.row,
@@ -383,13 +824,32 @@ class TableDetector:
                     'height': cell.height,
                     'text': cell.text,
                     'confidence': cell.confidence,
-                    'is_header': cell.is_header
+                    'is_header': cell.is_header,
+                    'row_span': cell.row_span,
+                    'col_span': cell.col_span
                 }
                 for cell in structure.cells
             ],
             'field_names': list(structure.headers.values())
         }
     
+    def tables_to_dict(self, tables: List[TableStructure]) -> Dict[str, Any]:
+        """
+        Convert every table of a page to a dictionary for JSON serialization
+        
+        The largest table fills the top-level keys, as structure_to_dict,
+        so single-table consumers keep working; 'tables' holds all of them.
+        
+        Args:
+            tables: TableStructure per table, top to bottom (at least one)
+            
+        Returns:
+            Dictionary representation
+        """
+        data = self.structure_to_dict(max(tables, key=lambda table: len(table.cells)))
+        data['tables'] = [self.structure_to_dict(table) for table in tables]
+        return data
+    
     def export_to_excel_template(
         self, 
         structure: TableStructure, 
@@ -0,0 +1,188 @@
+"""
+Table Region Localization
+Finds the bounding boxes of ruled tables on a downsampled page, so line
+detection, grid building and OCR only run inside them
+"""
+import cv2
+import threading
+import numpy as np
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCALIZE_SIZE = 1000
+DEFAULT_REGION_WORKERS = 2
+
+# Ruling kernels span this share of the thumbnail side
+KERNEL_FRACTION = 1 / 40
+MIN_KERNEL = 10
+
+# Candidates smaller than these shares of the page are not tables
+MIN_WIDTH_FRACTION = 0.1
+MIN_HEIGHT_FRACTION = 0.03
+
+# Margin added around each region, as a share of the page's long side
+PAD_FRACTION = 0.01
+MIN_PAD = 8
+
+T = TypeVar('T')
+
+_region_pool: Optional[ThreadPoolExecutor] = None
+_region_pool_lock = threading.Lock()
+
+
+def get_localization_settings() -> Tuple[bool, int, int]:
+    """
+    Table localization settings
+
+    Returns:
+        Tuple of (enabled, thumbnail long side, region workers)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    enabled = bool(get_ocr_setting('OCR_TABLE_LOCALIZATION', True))
+    size = int(get_ocr_setting('OCR_TABLE_LOCALIZATION_SIZE', DEFAULT_LOCALIZE_SIZE))
+    workers = int(get_ocr_setting('OCR_TABLE_REGION_WORKERS', DEFAULT_REGION_WORKERS))
+    return enabled, size, max(1, workers)
+
+
+@dataclass
+class TableRegion:
+    """Bounding box of one table in page pixels"""
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def box(self) -> Tuple[int, int, int, int]:
+        return self.x, self.y, self.width, self.height
+
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        """View of the region in a page-sized image"""
+        return image[self.y:self.y + self.height, self.x:self.x + self.width]
+
+    def to_page(self, cells: Sequence) -> None:
+        """Shift objects with x and y attributes from region to page coordinates, in place"""
+        for cell in cells:
+            cell.x += self.x
+            cell.y += self.y
+
+
+def _count_runs(present: np.ndarray) -> int:
+    """Number of separate runs of True values"""
+    present = present.astype(np.int8)
+    return int(np.count_nonzero(np.diff(present, prepend=0) == 1))
+
+
+def _merge_overlapping(boxes: List[List[int]]) -> List[List[int]]:
+    """Union overlapping (x1, y1, x2, y2) boxes until none overlap"""
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+
+def find_table_regions(image: np.ndarray, size: Optional[int] = None) -> List[TableRegion]:
+    """
+    Locate ruled tables on a downsampled copy of the page
+
+    Ruling masks are opened from an adaptive binarization of a thumbnail.
+    Connected groups of rulings that span at least two horizontal and two
+    vertical lines are tables; lone rules (letterhead bars, signature lines,
+    underlines) are not. Overlapping boxes are merged.
+
+    Args:
+        image: Page (BGR or grayscale)
+        size: Long side of the thumbnail (defaults to OCR_TABLE_LOCALIZATION_SIZE)
+
+    Returns:
+        Regions in page pixels, top to bottom; empty if no ruled table was found
+    """
+    if size is None:
+        size = get_localization_settings()[1]
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape
+    scale = min(1.0, size / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    small_h, small_w = small.shape
+
+    binary = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+    h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(MIN_KERNEL, int(small_w * KERNEL_FRACTION)), 1))
+    v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(MIN_KERNEL, int(small_h * KERNEL_FRACTION))))
+    h_mask = cv2.morphologyEx(binary, cv2.MORPH_OPEN, h_kernel)
+    v_mask = cv2.morphologyEx(binary, cv2.MORPH_OPEN, v_kernel)
+
+    # Bridge the small gaps where rulings of one table do not quite touch
+    grid = cv2.dilate(cv2.bitwise_or(h_mask, v_mask), np.ones((5, 5), np.uint8))
+    count, _, stats, _ = cv2.connectedComponentsWithStats(grid, connectivity=8)
+
+    pad = max(MIN_PAD, int(max(height, width) * PAD_FRACTION))
+    boxes = []
+    for x, y, w, h, _ in stats[1:count]:
+        if w < small_w * MIN_WIDTH_FRACTION or h < small_h * MIN_HEIGHT_FRACTION:
+            continue
+        if (_count_runs(h_mask[y:y + h, x:x + w].any(axis=1)) < 2
+                or _count_runs(v_mask[y:y + h, x:x + w].any(axis=0)) < 2):
+            continue
+        boxes.append([
+            max(0, int(x / scale) - pad), max(0, int(y / scale) - pad),
+            min(width, int(np.ceil((x + w) / scale)) + pad), min(height, int(np.ceil((y + h) / scale)) + pad)
+        ])
+
+    regions = [TableRegion(x1, y1, x2 - x1, y2 - y1)
+               for x1, y1, x2, y2 in sorted(_merge_overlapping(boxes), key=lambda b: (b[1], b[0]))]
+    logger.info(f"Localized {len(regions)} table region(s) on a {small_w}x{small_h} thumbnail")
+    return regions
+
+
+def localize_tables(image: np.ndarray) -> List[TableRegion]:
+    """
+    Table regions to process, honouring OCR_TABLE_LOCALIZATION
+
+    Returns:
+        The localized regions, or one region covering the whole page when
+        localization is disabled or finds no ruled table
+    """
+    enabled, size, _ = get_localization_settings()
+    regions = find_table_regions(image, size) if enabled else []
+    return regions or [TableRegion(0, 0, image.shape[1], image.shape[0])]
+
+
+def _get_region_pool(workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool tables of one page are processed on"""
+    global _region_pool
+    if _region_pool is None:
+        with _region_pool_lock:
+            if _region_pool is None:
+                _region_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table-region")
+    return _region_pool
+
+
+def map_regions(fn: Callable[[TableRegion], T], regions: List[TableRegion]) -> List[T]:
+    """
+    Run fn for every region, in parallel when there are several
+
+    fn must not itself call map_regions: its tasks would wait on the pool
+    they are running on.
+
+    Returns:
+        Results in region order
+    """
+    workers = get_localization_settings()[2]
+    if len(regions) < 2 or workers <= 1:
+        return [fn(region) for region in regions]
+    pool = _get_region_pool(workers)
+    return [future.result() for future in [pool.submit(fn, region) for region in regions]]
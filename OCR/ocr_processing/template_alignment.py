@@ -0,0 +1,470 @@
+"""
+Template Alignment
+Registers a document against the image of its template and warps the stored
+template cells onto it, so filled copies of a known form skip table detection
+"""
+import cv2
+import hashlib
+import threading
+import numpy as np
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+from ocr_processing.table_detector import TableDetector, TableStructure, CellInfo
+from ocr_processing.projection import find_rulings
+from ocr_processing.result_cache import cached_call
+from ocr_processing.tesseract_backend import tesseract_cache_config
+from ocr_processing.resolution import load_normalized, cells_to_original
+
+logger = logging.getLogger(__name__)
+
+# ORB keypoints per thumbnail and Lowe ratio for accepting a match
+ORB_FEATURES = 2000
+MATCH_RATIO = 0.75
+
+# RANSAC inlier threshold (thumbnail pixels) and fewest inliers for a usable fit
+RANSAC_THRESHOLD = 3.0
+MIN_INLIERS = 12
+
+# Matches must span this share of the template in both directions before the
+# similarity fit is refined to a full perspective homography
+MIN_PERSPECTIVE_SPAN = 0.6
+
+# Guided matching: search radius around the predicted position per round
+# (thumbnail pixels, shrinking as the fit improves) and largest accepted
+# descriptor distance (bits of 256)
+GUIDED_RADII = (20.0, 8.0, 4.0)
+GUIDED_MAX_DISTANCE = 64
+
+# Ruling fits this close (thumbnail pixels) are accepted without trying ORB
+EXACT_RESIDUAL = 1.5
+
+# Share of the template's ink that must land on document ink after alignment
+MIN_INK_OVERLAP = 0.7
+
+# Share of template cells that must land inside the document
+MIN_CELLS_INSIDE = 0.9
+
+# Thumbnail features of recently used templates kept per process
+TEMPLATE_CACHE_SIZE = 16
+
+
+def get_alignment_settings() -> Tuple[bool, float, int]:
+    """
+    Template alignment settings
+
+    Returns:
+        Tuple of (enabled, max_residual, thumbnail_size)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    enabled = bool(get_ocr_setting('OCR_TEMPLATE_ALIGNMENT', True))
+    max_residual = float(get_ocr_setting('OCR_TEMPLATE_ALIGN_MAX_RESIDUAL', 4.0))
+    thumbnail_size = int(get_ocr_setting('OCR_TEMPLATE_ALIGN_THUMBNAIL', 1000))
+    return enabled, max_residual, thumbnail_size
+
+
+@dataclass
+class PageFeatures:
+    """Registration features of one page thumbnail"""
+    scale: float  # Thumbnail pixels per page pixel
+    size: np.ndarray  # Thumbnail (width, height)
+    ink: np.ndarray  # Otsu-binarized thumbnail, ink as 255
+    h_lines: List[int]  # Horizontal ruling y positions (thumbnail pixels)
+    v_lines: List[int]  # Vertical ruling x positions (thumbnail pixels)
+    points: np.ndarray  # ORB keypoint coordinates, N x 2
+    descriptors: Optional[np.ndarray]  # ORB descriptors, N x 32 (None without keypoints)
+
+
+@dataclass
+class Alignment:
+    """Homography from template pixels to document working pixels"""
+    homography: np.ndarray
+    residual: float  # Typical reprojection error in document working pixels
+    method: str  # "rulings" or "orb"
+    matches: int  # Correspondences the fit used
+    overlap: float  # Share of template ink found on the document
+
+
+_template_cache: "OrderedDict[str, PageFeatures]" = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def page_features(gray: np.ndarray, thumbnail_size: int) -> PageFeatures:
+    """
+    Compute registration features on a thumbnail of a page
+
+    Args:
+        gray: Grayscale page
+        thumbnail_size: Longest thumbnail side in pixels
+
+    Returns:
+        PageFeatures of the page
+    """
+    scale = min(1.0, thumbnail_size / max(gray.shape[:2]))
+    thumbnail = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    h_lines, v_lines = find_rulings(TableDetector().preprocess_image(thumbnail))
+    _, ink = cv2.threshold(thumbnail, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # Thumbnails share one size, so a single pyramid level suffices and keeps
+    # keypoint positions pixel-accurate
+    orb = cv2.ORB_create(nfeatures=ORB_FEATURES, nlevels=1)
+    keypoints, descriptors = orb.detectAndCompute(thumbnail, None)
+    points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2)
+    size = np.array(thumbnail.shape[1::-1], dtype=np.float32)
+    return PageFeatures(scale, size, ink, h_lines, v_lines, points, descriptors)
+
+
+def _template_features(template_image: bytes, digest: str, thumbnail_size: int) -> Optional[PageFeatures]:
+    """PageFeatures of a template image, decoded and computed once per process"""
+    key = f"{digest}:{thumbnail_size}"
+    with _template_cache_lock:
+        if key in _template_cache:
+            _template_cache.move_to_end(key)
+            return _template_cache[key]
+
+    gray = cv2.imdecode(np.frombuffer(template_image, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    features = page_features(gray, thumbnail_size)
+
+    with _template_cache_lock:
+        _template_cache[key] = features
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return features
+
+
+def _fit_rulings(template: PageFeatures, document: PageFeatures) -> Optional[Tuple[np.ndarray, float, int]]:
+    """Least-squares homography between the ruling intersections of two pages with the same grid"""
+    if (len(template.h_lines) < 2 or len(template.v_lines) < 2
+            or len(template.h_lines) != len(document.h_lines)
+            or len(template.v_lines) != len(document.v_lines)):
+        return None
+
+    src = np.array([(x, y) for y in template.h_lines for x in template.v_lines], dtype=np.float32)
+    dst = np.array([(x, y) for y in document.h_lines for x in document.v_lines], dtype=np.float32)
+    homography, _ = cv2.findHomography(src, dst, 0)
+    if homography is None:
+        return None
+    projected = cv2.perspectiveTransform(src.reshape(-1, 1, 2), homography).reshape(-1, 2)
+    residual = float(np.sqrt(np.mean(np.sum((projected - dst) ** 2, axis=1))))
+    return homography, residual, len(src)
+
+
+def _fit_orb(template: PageFeatures, document: PageFeatures) -> Optional[Tuple[np.ndarray, float, int]]:
+    """Homography from ratio-tested ORB matches (RANSAC similarity, refined when well spread)"""
+    if template.descriptors is None or document.descriptors is None:
+        return None
+    if len(template.descriptors) < MIN_INLIERS or len(document.descriptors) < MIN_INLIERS:
+        return None
+
+    matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    pairs = matcher.knnMatch(template.descriptors, document.descriptors, k=2)
+    good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < MATCH_RATIO * p[1].distance]
+    if len(good) < MIN_INLIERS:
+        return None
+
+    src = template.points[[m.queryIdx for m in good]]
+    dst = document.points[[m.trainIdx for m in good]]
+    # A similarity (scan offset, scale and skew) is robust even when the
+    # distinctive matches cluster in one part of the page
+    similarity, inliers = cv2.estimateAffinePartial2D(
+        src, dst, method=cv2.RANSAC, ransacReprojThreshold=RANSAC_THRESHOLD
+    )
+    if similarity is None or inliers is None or int(inliers.sum()) < MIN_INLIERS:
+        return None
+    homography = np.vstack([similarity, [0.0, 0.0, 1.0]])
+
+    # Guided matching: with the rough fit, repetitive features (ruling
+    # corners everywhere on the page) can be matched by position as well.
+    # Each round's fit predicts positions better for the next one.
+    for radius in GUIDED_RADII:
+        guided = _guided_matches(template, document, homography, radius)
+        if guided is None:
+            return None
+        homography, src, dst = guided
+
+    projected = cv2.perspectiveTransform(src.reshape(-1, 1, 2), homography).reshape(-1, 2)
+    residual = float(np.median(np.linalg.norm(projected - dst, axis=1)))
+    return homography, residual, len(src)
+
+
+def _guided_matches(template: PageFeatures, document: PageFeatures,
+                    homography: np.ndarray, radius: float) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Refit after matching every template keypoint to the best document
+    keypoint near its predicted position
+
+    Returns:
+        Tuple of (homography, inlier template points, inlier document points),
+        or None if too few matches agree
+    """
+    predicted = cv2.perspectiveTransform(template.points.reshape(-1, 1, 2), homography).reshape(-1, 2)
+    distance = np.linalg.norm(predicted[:, None, :] - document.points[None, :, :], axis=2)
+    mask = (distance <= radius).astype(np.uint8)
+
+    matches = cv2.BFMatcher(cv2.NORM_HAMMING).match(template.descriptors, document.descriptors, mask)
+    matches = [m for m in matches if m.distance <= GUIDED_MAX_DISTANCE]
+    if len(matches) < MIN_INLIERS:
+        return None
+    src = template.points[[m.queryIdx for m in matches]]
+    dst = document.points[[m.trainIdx for m in matches]]
+
+    similarity, inliers = cv2.estimateAffinePartial2D(
+        src, dst, method=cv2.RANSAC, ransacReprojThreshold=RANSAC_THRESHOLD
+    )
+    if similarity is None or inliers is None or int(inliers.sum()) < MIN_INLIERS:
+        return None
+    inliers = inliers.ravel().astype(bool)
+    src, dst = src[inliers], dst[inliers]
+    homography = np.vstack([similarity, [0.0, 0.0, 1.0]])
+
+    # Perspective is only well constrained when the matches cover the page
+    span = np.ptp(src, axis=0) / np.maximum(template.size, 1)
+    if span.min() >= MIN_PERSPECTIVE_SPAN:
+        refined, mask = cv2.findHomography(src, dst, cv2.RANSAC, RANSAC_THRESHOLD)
+        if refined is not None and int(mask.sum()) >= MIN_INLIERS:
+            mask = mask.ravel().astype(bool)
+            homography, src, dst = refined, src[mask], dst[mask]
+    return homography, src, dst
+
+
+def _ink_overlap(template: PageFeatures, document: PageFeatures, homography: np.ndarray) -> float:
+    """Share of the template's ink (rulings, printed labels) found on the document after warping"""
+    height, width = document.ink.shape
+    warped = cv2.warpPerspective(template.ink, homography, (width, height), flags=cv2.INTER_NEAREST)
+    total = cv2.countNonZero(warped)
+    if total == 0:
+        return 0.0
+    near_ink = cv2.dilate(document.ink, np.ones((5, 5), np.uint8))
+    return cv2.countNonZero(cv2.bitwise_and(warped, near_ink)) / total
+
+
+def estimate_alignment(template: PageFeatures, document: PageFeatures) -> Optional[Alignment]:
+    """
+    Estimate the homography from template pixels to document pixels
+
+    Ruling intersections are tried first: on ruled forms they are exact and
+    unaffected by what was filled in. ORB feature matching covers pages whose
+    ruling grids do not correspond one to one. A fit only counts when most
+    of the template's ink lands on document ink; the best such fit wins.
+
+    Args:
+        template: Features of the template page
+        document: Features of the document page
+
+    Returns:
+        Alignment in full-resolution page pixels, or None if neither method fits
+    """
+    fits = []
+    for method, fit in (("rulings", _fit_rulings), ("orb", _fit_orb)):
+        result = fit(template, document)
+        if result is None:
+            continue
+        homography, residual, matches = result
+        overlap = _ink_overlap(template, document, homography)
+        if overlap < MIN_INK_OVERLAP:
+            logger.debug(f"Template alignment by {method} rejected: {overlap:.0%} ink overlap")
+            continue
+        fits.append((residual, method, homography, matches, overlap))
+        # An exact grid fit needs no second opinion
+        if method == "rulings" and residual <= EXACT_RESIDUAL:
+            break
+    if not fits:
+        return None
+
+    residual, method, homography, matches, overlap = min(fits, key=lambda f: f[0])
+    # Thumbnail homography -> page pixels: scale in, map, scale out
+    to_template_thumb = np.diag([template.scale, template.scale, 1.0])
+    from_document_thumb = np.diag([1.0 / document.scale, 1.0 / document.scale, 1.0])
+    full = from_document_thumb @ homography @ to_template_thumb
+    return Alignment(
+        homography=full / full[2, 2],
+        residual=residual / document.scale,
+        method=method,
+        matches=matches,
+        overlap=overlap
+    )
+
+
+def warp_cells(cells: List[Dict[str, Any]], homography: np.ndarray,
+               shape: Tuple[int, ...]) -> List[CellInfo]:
+    """
+    Map stored template cells onto a document
+
+    Args:
+        cells: Cell dictionaries as stored by TableDetector.structure_to_dict
+        homography: Template pixels -> document pixels
+        shape: Document image shape
+
+    Returns:
+        CellInfo per cell that lands inside the document, as the bounding box
+        of its warped corners
+    """
+    if not cells:
+        return []
+    boxes = np.array([(c['x'], c['y'], c['width'], c['height']) for c in cells], dtype=np.float32)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    corners = np.stack([
+        np.stack([x1, y1], axis=1), np.stack([x2, y1], axis=1),
+        np.stack([x2, y2], axis=1), np.stack([x1, y2], axis=1),
+    ], axis=1)
+    warped = cv2.perspectiveTransform(corners.reshape(-1, 1, 2), homography).reshape(-1, 4, 2)
+
+    height, width = shape[:2]
+    lo = np.floor(warped.min(axis=1))
+    hi = np.ceil(warped.max(axis=1))
+    lo = np.clip(lo, 0, [width, height]).astype(int)
+    hi = np.clip(hi, 0, [width, height]).astype(int)
+
+    result = []
+    for cell, (left, top), (right, bottom) in zip(cells, lo.tolist(), hi.tolist()):
+        if right - left < 2 or bottom - top < 2:
+            continue
+        result.append(CellInfo(
+            row=cell.get('row', 0),
+            col=cell.get('col', 0),
+            x=left,
+            y=top,
+            width=right - left,
+            height=bottom - top,
+            is_header=cell.get('is_header', cell.get('row', 0) == 0),
+            row_span=cell.get('row_span', 1),
+            col_span=cell.get('col_span', 1)
+        ))
+    return result
+
+
+def template_tables(template_structure: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Stored tables of a Template.structure, top to bottom
+
+    Structures saved before multi-table detection hold a single table at
+    the top level.
+    """
+    structure = template_structure or {}
+    return structure.get('tables') or ([structure] if structure.get('cells') else [])
+
+
+def register_to_template(document_path: str, template_image: bytes,
+                         template_structure: Dict[str, Any], ocr_engine=None,
+                         ocr_mode: str = "page") -> Optional[List[TableStructure]]:
+    """
+    Read a document by aligning it to its template instead of detecting its tables
+
+    Args:
+        document_path: Path to the document image
+        template_image: Encoded template image (as stored on the Template)
+        template_structure: Template.structure with the template's tables
+        ocr_engine: Optional OCR engine instance
+        ocr_mode: "page" or "cell", as in TableDetector.detect_table_structure
+
+    Returns:
+        TableStructure per template table, top to bottom, with text read from
+        the warped template cells, or None when alignment is disabled, fails
+        or leaves residuals above the threshold (the caller should then detect
+        the tables itself)
+    """
+    enabled, max_residual, thumbnail_size = get_alignment_settings()
+    if not enabled or not template_image or not template_tables(template_structure):
+        return None
+
+    digest = hashlib.sha1(template_image).hexdigest()
+    extra = {'template': digest, 'max_residual': max_residual,
+             'thumbnail_size': thumbnail_size, 'ocr_mode': ocr_mode}
+    if ocr_engine:
+        config = ocr_engine.cache_config(**extra)
+    else:
+        config = tesseract_cache_config(**extra)
+
+    return cached_call(
+        document_path, "template_tables", config,
+        lambda: _register_uncached(document_path, template_image, digest, template_structure,
+                                   ocr_engine, ocr_mode, max_residual, thumbnail_size)
+    )
+
+
+def _register_uncached(document_path: str, template_image: bytes, digest: str,
+                       template_structure: Dict[str, Any], ocr_engine, ocr_mode: str,
+                       max_residual: float, thumbnail_size: int) -> Optional[List[TableStructure]]:
+    """Align and read a document without consulting the result cache"""
+    try:
+        template = _template_features(template_image, digest, thumbnail_size)
+        if template is None:
+            logger.info("Template image cannot be decoded for alignment")
+            return None
+
+        image, resolution = load_normalized(document_path)
+        if image is None:
+            return None
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+        alignment = estimate_alignment(template, page_features(gray, thumbnail_size))
+        if alignment is None:
+            logger.info("Template alignment found no usable fit, falling back to detection")
+            return None
+        if alignment.residual > max_residual:
+            logger.info(f"Template alignment residual {alignment.residual:.1f}px above "
+                        f"{max_residual:.1f}px, falling back to detection")
+            return None
+
+        # Warp every table before reading any, so a table off the page costs no OCR
+        warped = []
+        for table in template_tables(template_structure):
+            stored = table['cells']
+            cells = warp_cells(stored, alignment.homography, gray.shape)
+            if len(cells) < MIN_CELLS_INSIDE * len(stored):
+                logger.info(f"Only {len(cells)} of {len(stored)} template cells fall inside the document")
+                return None
+            bbox = warp_cells([dict(zip(('x', 'y', 'width', 'height'), table['bbox']))],
+                              alignment.homography, gray.shape) if table.get('bbox') else []
+            warped.append((table, cells, bbox))
+
+        logger.info(f"Aligned document to template by {alignment.method} "
+                    f"({alignment.matches} matches, residual {alignment.residual:.2f}px, "
+                    f"{len(warped)} table(s))")
+        detector = TableDetector(ocr_engine)
+        tables = []
+        for table, cells, bbox in warped:
+            rows = table.get('rows') or max(c.row + c.row_span for c in cells)
+            cols = table.get('cols') or max(c.col + c.col_span for c in cells)
+            structure = detector.read_structure(image, cells, rows, cols, resolution, ocr_mode)
+            if bbox:
+                cells_to_original(bbox, resolution)
+                structure.bbox = (bbox[0].x, bbox[0].y, bbox[0].width, bbox[0].height)
+            tables.append(structure)
+        return tables
+
+    except Exception as e:
+        logger.warning(f"Template alignment failed: {e}")
+        return None
+
+
+def detect_with_template(document_path: str, template, ocr_engine=None) -> Optional[List[TableStructure]]:
+    """
+    register_to_template for a templates.models.Template
+
+    Args:
+        document_path: Path to the document image
+        template: Template with file_data (or a legacy file) and structure
+        ocr_engine: Optional OCR engine instance
+
+    Returns:
+        TableStructure per template table, or None if the tables have to be
+        detected instead
+    """
+    if template.file_data:
+        template_image = bytes(template.file_data)
+    elif template.file:
+        try:
+            with template.file.open('rb') as f:
+                template_image = f.read()
+        except (OSError, ValueError) as e:
+            logger.info(f"Template file unavailable for alignment: {e}")
+            return None
+    else:
+        return None
+    return register_to_template(document_path, template_image, template.structure, ocr_engine)
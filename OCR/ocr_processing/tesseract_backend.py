@@ -0,0 +1,244 @@
+"""
+Tesseract Backends
+Interchangeable ways of running Tesseract: pytesseract (subprocess per call)
+or tesserocr (Tesseract API kept loaded in-process)
+"""
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# pytesseract image_to_data level of word rows
+WORD_LEVEL = 5
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+
+class PytesseractBackend:
+    """Runs the tesseract executable through pytesseract"""
+
+    name = "pytesseract"
+
+    def is_available(self) -> bool:
+        """Check if the tesseract executable can be found"""
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+    def version(self) -> str:
+        """Get the tesseract executable version"""
+        try:
+            return str(pytesseract.get_tesseract_version())
+        except Exception:
+            return "unavailable"
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List[Any]]:
+        """
+        Run OCR and return word-level data
+
+        Args:
+            image: Grayscale or BGR image
+
+        Returns:
+            pytesseract-style dict with text, conf, left, top, width, height lists
+        """
+        return pytesseract.image_to_data(
+            Image.fromarray(image),
+            output_type=pytesseract.Output.DICT
+        )
+
+
+class TesserocrBackend:
+    """
+    Keeps a Tesseract API handle loaded in-process, one per worker thread
+
+    Images are passed to Tesseract as raw pixel buffers, so there is no
+    temporary file and no process fork per call. This matters most for
+    per-cell OCR, where pytesseract forks once for every table cell.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng"):
+        self.lang = lang
+        self._local = threading.local()
+
+    def is_available(self) -> bool:
+        """Check if tesserocr is installed and can load language data"""
+        if not TESSEROCR_AVAILABLE:
+            return False
+        try:
+            self._get_api()
+            return True
+        except Exception as e:
+            logger.warning(f"tesserocr could not be initialized: {e}")
+            return False
+
+    def version(self) -> str:
+        """Get the linked Tesseract library version"""
+        try:
+            return str(tesserocr.tesseract_version()).splitlines()[0]
+        except Exception:
+            return "unavailable"
+
+    def _get_api(self):
+        """Get (or lazily create) the API handle owned by the current thread"""
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=self.lang)
+            self._local.api = api
+        return api
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List[Any]]:
+        """
+        Run OCR and return word-level data
+
+        Args:
+            image: Grayscale or BGR image
+
+        Returns:
+            pytesseract-style dict with level, page_num, block_num, par_num,
+            line_num, word_num, text, conf, left, top, width, height lists
+            (word rows only)
+        """
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        if bytes_per_pixel == 3:
+            # Tesseract expects RGB byte order
+            image = np.ascontiguousarray(image[:, :, ::-1])
+
+        api = self._get_api()
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        api.Recognize()
+
+        data = {key: [] for key in ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                                    'text', 'conf', 'left', 'top', 'width', 'height')}
+        level = tesserocr.RIL.WORD
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+
+        # Layout numbering as in Tesseract's TSV output: 1-based, each
+        # counter restarting inside its parent
+        block_num = par_num = line_num = word_num = 0
+        for word in tesserocr.iterate_level(iterator, level):
+            if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block_num, par_num = block_num + 1, 0
+            if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                par_num, line_num = par_num + 1, 0
+            if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line_num, word_num = line_num + 1, 0
+            word_num += 1
+
+            text = word.GetUTF8Text(level)
+            box = word.BoundingBox(level)
+            if text is None or box is None:
+                continue
+            x1, y1, x2, y2 = box
+            data['level'].append(WORD_LEVEL)
+            data['page_num'].append(1)
+            data['block_num'].append(block_num)
+            data['par_num'].append(par_num)
+            data['line_num'].append(line_num)
+            data['word_num'].append(word_num)
+            data['text'].append(text)
+            data['conf'].append(word.Confidence(level))
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+
+        return data
+
+
+TESSERACT_BACKENDS = {
+    'pytesseract': PytesseractBackend,
+    'tesserocr': TesserocrBackend,
+}
+
+
+def create_tesseract_backend(name: str = "pytesseract"):
+    """
+    Create a Tesseract backend by name, falling back to pytesseract
+
+    Args:
+        name: "pytesseract" or "tesserocr"
+
+    Returns:
+        Backend instance
+    """
+    backend_class = TESSERACT_BACKENDS.get(name)
+    if backend_class is None:
+        logger.warning(f"Unknown Tesseract backend '{name}', using pytesseract")
+        return PytesseractBackend()
+
+    backend = backend_class()
+    if name == "tesserocr" and not TESSEROCR_AVAILABLE:
+        logger.warning("tesserocr is not installed, using pytesseract backend")
+        return PytesseractBackend()
+
+    return backend
+
+
+_shared_backends: Dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def get_tesseract_backend(name: Optional[str] = None):
+    """
+    Get the process-wide backend for code that runs Tesseract without an OCREngine
+
+    Args:
+        name: Backend name (defaults to OCR_TESSERACT_BACKEND)
+
+    Returns:
+        Shared backend instance
+    """
+    if name is None:
+        from ocr_processing.ocr_core import get_ocr_setting
+        name = get_ocr_setting('OCR_TESSERACT_BACKEND', 'pytesseract')
+
+    backend = _shared_backends.get(name)
+    if backend is None:
+        with _shared_lock:
+            backend = _shared_backends.get(name)
+            if backend is None:
+                backend = create_tesseract_backend(name)
+                _shared_backends[name] = backend
+    return backend
+
+
+_backend_versions: Dict[str, str] = {}
+
+
+def tesseract_cache_config(**extra: Any) -> Dict[str, Any]:
+    """
+    Result-cache settings for output of the process-wide backend (no OCREngine)
+
+    Mirrors OCREngine.cache_config, so results change key when the backend or
+    its Tesseract version changes. The version is looked up once per backend.
+
+    Args:
+        **extra: Operation-specific settings
+
+    Returns:
+        Dictionary describing the backend configuration
+    """
+    backend = get_tesseract_backend()
+    version = _backend_versions.get(backend.name)
+    if version is None:
+        version = _backend_versions.setdefault(backend.name, f"{backend.name}-{backend.version()}")
+    return {'engine': backend.name, 'engine_version': version, **extra}
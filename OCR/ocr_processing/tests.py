@@ -1,3 +1,1483 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+import os
+import pickle
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from ocr_processing.smart_preprocessor import SmartImagePreprocessor
+from ocr_processing.pyramid import ImagePyramid
+from ocr_processing.table_detector import TableDetector, TableStructure
+from ocr_processing.tiling import process_tiled
+
+
+def make_shadowed_page(height: int = 2000, width: int = 1500) -> np.ndarray:
+    """Grayscale page with text lines and a soft shadow in one corner"""
+    yy, xx = np.mgrid[0:height, 0:width]
+    page = np.full((height, width), 220, dtype=np.float32)
+    page -= 90 * np.exp(-((xx - width * 0.2) ** 2 + (yy - height * 0.8) ** 2) / (2 * (width * 0.4) ** 2))
+    page = page.astype(np.uint8)
+    for y in range(120, height - 80, 60):
+        cv2.putText(page, "Invoice Total Quantity 2024", (60, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.3, 20, 3)
+    return page
+
+
+def make_ruled_page(height: int = 2000, width: int = 1500) -> np.ndarray:
+    """Shadowed page with a ruled table grid over the text"""
+    page = make_shadowed_page(height, width)
+    for y in range(100, height - 60, 97):
+        cv2.line(page, (60, y), (width - 60, y), 30, 3)
+    for x in range(60, width - 40, 233):
+        cv2.line(page, (x, 100), (x, height - 100), 30, 3)
+    return page
+
+
+def make_thick_ruled_page(rows: int = 8, cols: int = 5, thickness: int = 5, segments: int = 4,
+                          height: int = 1600, width: int = 1200) -> np.ndarray:
+    """Table whose thick rulings are broken into slightly offset segments, like a photocopied form"""
+    page = np.full((height, width), 235, dtype=np.uint8)
+    ys = np.linspace(100, height - 100, rows + 1).astype(int)
+    xs = np.linspace(80, width - 80, cols + 1).astype(int)
+    for i, y in enumerate(ys):
+        ends = np.linspace(xs[0], xs[-1], segments + 1).astype(int)
+        for j, (start, end) in enumerate(zip(ends[:-1], ends[1:])):
+            offset = (i + j) % 3
+            cv2.rectangle(page, (start, y + offset), (end - 2, y + offset + thickness - 1), 20, -1)
+    for i, x in enumerate(xs):
+        ends = np.linspace(ys[0], ys[-1], segments + 1).astype(int)
+        for j, (start, end) in enumerate(zip(ends[:-1], ends[1:])):
+            offset = (i + j) % 3
+            cv2.rectangle(page, (x + offset, start), (x + offset + thickness - 1, end - 2), 20, -1)
+    return page
+
+
+def make_merged_cell_page(height: int = 1000, width: int = 1200) -> np.ndarray:
+    """
+    4 x 4 form with a title spanning the two left header columns and a label
+    spanning the two bottom rows of the first column
+    """
+    page = np.full((height, width), 235, dtype=np.uint8)
+    ys = np.linspace(100, height - 100, 5).astype(int)
+    xs = np.linspace(100, width - 100, 5).astype(int)
+    for i, y in enumerate(ys):
+        # The line between the two bottom rows stops at the spanning label
+        start = xs[1] if i == 3 else xs[0]
+        cv2.line(page, (start, y), (xs[-1], y), 30, 3)
+    for i, x in enumerate(xs):
+        # The line between the two left header columns starts below the title
+        start = ys[1] if i == 1 else ys[0]
+        cv2.line(page, (x, start), (x, ys[-1]), 30, 3)
+    for y in ys[:-1]:
+        for x in xs[:-1]:
+            cv2.putText(page, "Text", (x + 20, y + 60), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 40, 2)
+    return page
+
+
+def make_form(filled: bool, rows: int = 12, cols: int = 4, height: int = 2200, width: int = 1700):
+    """
+    Ruled form with a printed title, blank or filled in
+
+    Returns:
+        Tuple of (page, row line positions, column line positions)
+    """
+    page = np.full((height, width), 240, dtype=np.uint8)
+    ys = np.linspace(height * 0.1, height * 0.9, rows + 1).astype(int)
+    xs = np.linspace(width * 0.06, width * 0.94, cols + 1).astype(int)
+    for y in ys:
+        cv2.line(page, (int(xs[0]), int(y)), (int(xs[-1]), int(y)), 30, 3)
+    for x in xs:
+        cv2.line(page, (int(x), int(ys[0])), (int(x), int(ys[-1])), 30, 3)
+    cv2.putText(page, "ACME FORM 12", (200, 150), cv2.FONT_HERSHEY_SIMPLEX, 2, 30, 4)
+    if filled:
+        for r in range(rows):
+            for c in range(cols):
+                cv2.putText(page, f"R{r}C{c}", (int(xs[c]) + 10, int(ys[r + 1]) - 12),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, 40, 2)
+    return page, [int(y) for y in ys], [int(x) for x in xs]
+
+
+def make_two_table_page(height: int = 2200, width: int = 1700):
+    """
+    Letterhead, two ruled tables and a signature line
+
+    Returns:
+        Tuple of (page, [(row line positions, column line positions)] per table)
+    """
+    page = np.full((height, width), 240, dtype=np.uint8)
+    cv2.putText(page, "ACME Corporation", (100, 110), cv2.FONT_HERSHEY_SIMPLEX, 2, 30, 4)
+    cv2.line(page, (80, 140), (width - 80, 140), 30, 4)
+    tables = []
+    for top, bottom, rows, cols, left, right in ((300, 900, 6, 4, 150, 1550), (1150, 1750, 5, 3, 300, 1300)):
+        ys = np.linspace(top, bottom, rows + 1).astype(int)
+        xs = np.linspace(left, right, cols + 1).astype(int)
+        for y in ys:
+            cv2.line(page, (int(xs[0]), int(y)), (int(xs[-1]), int(y)), 30, 3)
+        for x in xs:
+            cv2.line(page, (int(x), int(ys[0])), (int(x), int(ys[-1])), 30, 3)
+        for r in range(rows):
+            for c in range(cols):
+                cv2.putText(page, f"R{r}C{c}", (int(xs[c]) + 10, int(ys[r + 1]) - 12),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, 40, 2)
+        tables.append(([int(y) for y in ys], [int(x) for x in xs]))
+    cv2.line(page, (1100, 2000), (1550, 2000), 30, 2)
+    cv2.putText(page, "Signature", (1100, 2050), cv2.FONT_HERSHEY_SIMPLEX, 1, 30, 2)
+    return page, tables
+
+
+class ShadowRemovalTests(TestCase):
+    """Downsampled background estimation must match the full-resolution path"""
+
+    def setUp(self):
+        self.preprocessor = SmartImagePreprocessor()
+        self.page = make_shadowed_page()
+
+    def assert_equivalent(self, reference: np.ndarray, candidate: np.ndarray):
+        self.assertEqual(reference.shape, candidate.shape)
+        self.assertEqual(reference.dtype, candidate.dtype)
+
+        difference = np.abs(reference.astype(np.int16) - candidate.astype(np.int16))
+        self.assertLess(difference.mean(), 1.0)
+        self.assertLessEqual(np.percentile(difference, 99), 3)
+
+        # What matters downstream: the same pixels end up as ink after binarization
+        _, reference_binary = cv2.threshold(reference, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, candidate_binary = cv2.threshold(candidate, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        self.assertGreater((reference_binary == candidate_binary).mean(), 0.999)
+
+    def test_downsampled_matches_full(self):
+        full = self.preprocessor.remove_shadows(self.page, mode="full")
+        downsampled = self.preprocessor.remove_shadows(self.page, mode="downsampled")
+        self.assert_equivalent(full, downsampled)
+
+    def test_pyramid_level_matches_full(self):
+        full = self.preprocessor.remove_shadows(self.page, mode="full")
+        from_pyramid = self.preprocessor.remove_shadows(
+            self.page, mode="downsampled", pyramid=ImagePyramid(self.page)
+        )
+        self.assert_equivalent(full, from_pyramid)
+
+    def test_shadow_is_flattened(self):
+        corrected = self.preprocessor.remove_shadows(self.page, mode="downsampled")
+        # Background in the shadowed corner and in the clean corner end up alike
+        shadowed = corrected[-60:, :60]
+        clean = corrected[:60, -60:]
+        self.assertLess(abs(float(shadowed.mean()) - float(clean.mean())), 10)
+
+
+class PreprocessingMemoryTests(TestCase):
+    """Preprocessing stages write into reused work buffers instead of allocating per step"""
+
+    def setUp(self):
+        self.preprocessor = SmartImagePreprocessor()
+        self.page = make_shadowed_page(1800, 1300)
+        self.page_bytes = self.page.nbytes
+
+    def peak_pages(self, func, *args, **kwargs) -> float:
+        """Peak traced allocation of one call, in multiples of the page size"""
+        func(*args, **kwargs)  # Warm up: work buffers are allocated on first use
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak / self.page_bytes
+
+    def test_table_pipeline_peak_allocation(self):
+        # Output page plus pyramid levels and small per-step temporaries
+        peak = self.peak_pages(self.preprocessor.preprocess_for_table_detection, self.page)
+        self.assertLess(peak, 2.5)
+
+    def test_ocr_pipeline_peak_allocation(self):
+        peak = self.peak_pages(self.preprocessor.preprocess_for_ocr, self.page)
+        self.assertLess(peak, 4.0)
+
+    def test_binarization_computes_only_selected_method(self):
+        output = np.empty_like(self.page)
+        peak = self.peak_pages(self.preprocessor.binarize_adaptive, self.page, "auto", output)
+        self.assertLess(peak, 0.1)
+
+        binary = self.preprocessor.binarize_adaptive(self.page, "auto")
+        candidates = [self.preprocessor._apply_otsu(self.page), self.preprocessor._apply_adaptive(self.page)]
+        self.assertTrue(any(np.array_equal(binary, candidate) for candidate in candidates))
+
+    def test_results_do_not_alias_work_buffers(self):
+        first, _ = self.preprocessor.preprocess_for_table_detection(self.page)
+        snapshot = first.copy()
+        self.preprocessor.preprocess_for_table_detection(255 - self.page)
+        self.assertTrue(np.array_equal(first, snapshot))
+
+
+class TiledProcessingTests(TestCase):
+    """Tiled processing must reproduce the full-page result"""
+
+    def setUp(self):
+        self.page = make_ruled_page()
+        self.detector = TableDetector()
+
+    def test_tiled_binarization_matches_full_page(self):
+        from ocr_processing.line_params import line_params
+
+        # Tiles use the page's sizes; half a threshold block of overlap is enough
+        params = line_params(self.page.shape)
+        self.assertEqual(params.threshold_reach, params.block_size // 2)
+        expected = self.detector.preprocess_image(self.page, params)
+        tiled = process_tiled(
+            self.page, lambda tile: self.detector.preprocess_image(tile, params),
+            tile_size=512, overlap=params.threshold_reach, workers=2
+        )
+        self.assertTrue(np.array_equal(expected, tiled))
+
+        # detect_lines_tiled derives that overlap itself
+        self.assertEqual(
+            self.detector.detect_lines(self.detector.preprocess_image(self.page)),
+            self.detector.detect_lines_tiled(self.page, tile_size=512, workers=2)
+        )
+
+    def test_tiled_line_detection_memory_scales_with_tile(self):
+        detect = lambda: self.detector.detect_lines_tiled(self.page, tile_size=256, workers=1)
+        detect()
+        tracemalloc.start()
+        try:
+            detect()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Two stitched masks plus intermediates of a single tile
+        self.assertLess(peak / self.page.nbytes, 2.5)
+
+    def test_tiled_enhancement_matches_full_page(self):
+        preprocessor = SmartImagePreprocessor()
+        full, _ = preprocessor.preprocess_for_table_detection(self.page)
+        with override_settings(OCR_TILED_MIN_PIXELS=1, OCR_TILE_SIZE=512):
+            tiled, _ = preprocessor.preprocess_for_table_detection(self.page)
+
+        self.assertEqual(full.shape, tiled.shape)
+        difference = np.abs(full.astype(np.int16) - tiled.astype(np.int16))
+        self.assertLess(difference.mean(), 3.0)
+
+        _, full_binary = cv2.threshold(full, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, tiled_binary = cv2.threshold(tiled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        self.assertGreater((full_binary == tiled_binary).mean(), 0.995)
+
+
+class StrategyEarlyExitTests(TestCase):
+    """Detection strategies stop once one of them is confident enough"""
+
+    def setUp(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+        from ocr_processing.smart_preprocessor import ImageQualityMetrics
+        self.detector = EnhancedTableDetector()
+        self.metrics = ImageQualityMetrics(
+            brightness=128, contrast=50, sharpness=500, noise_level=2,
+            skew_angle=0, resolution=(100, 100), quality_score=90
+        )
+        self.calls = []
+
+    def plan(self, *strategies):
+        """Fake strategy plan; each entry is (name, grid_confidence, delay_s)"""
+        from ocr_processing.table_detector import CellInfo, TableStructure
+
+        def make_run(name, grid_confidence, delay):
+            def run():
+                self.calls.append(name)
+                time.sleep(delay)
+                cells = [CellInfo(row=i // 5, col=i % 5, x=40 * (i % 5), y=40 * (i // 5), width=40, height=40)
+                         for i in range(25)]
+                return TableStructure(rows=5, cols=5, cells=cells, headers={}, grid_confidence=grid_confidence)
+            return run
+
+        return lambda preprocessed, original, cancelled=None: [
+            (name, name.lower(), make_run(name, confidence, delay)) for name, confidence, delay in strategies
+        ]
+
+    def run_strategies(self, plan):
+        with patch.object(self.detector, '_strategy_plan', plan):
+            return self.detector._run_strategies(None, None, self.metrics)
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=1, OCR_TABLE_EARLY_EXIT_CONFIDENCE=85.0)
+    def test_sequential_run_skips_remaining_strategies(self):
+        results = self.run_strategies(self.plan(("Weak", 0.5, 0), ("Strong", 0.95, 0), ("Slow", 0.9, 0)))
+        self.assertEqual(self.calls, ["Weak", "Strong"])
+        self.assertEqual([strategy.name for _, strategy in results], ["Weak", "Strong"])
+        self.assertTrue(all(strategy.elapsed_ms >= 0 for _, strategy in results))
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=1, OCR_TABLE_EARLY_EXIT_CONFIDENCE=None)
+    def test_disabled_threshold_runs_every_strategy(self):
+        results = self.run_strategies(self.plan(("Strong", 0.95, 0), ("Other", 0.5, 0)))
+        self.assertEqual(len(results), 2)
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=3, OCR_TABLE_EARLY_EXIT_CONFIDENCE=85.0)
+    def test_concurrent_run_does_not_wait_for_slow_strategies(self):
+        start = time.perf_counter()
+        results = self.run_strategies(self.plan(("Strong", 0.95, 0.05), ("Slow", 0.9, 1.5)))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual([strategy.name for _, strategy in results], ["Strong"])
+        self.assertGreater(results[0][1].elapsed_ms, 40)
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=3, OCR_TABLE_EARLY_EXIT_CONFIDENCE=85.0,
+                       OCR_STRATEGY_TELEMETRY=False)
+    def test_early_exit_stops_running_strategies(self):
+        from ocr_processing.detection_context import DetectionContext
+
+        strong = self.plan(("Strong", 0.95, 0.05))(None, None)[0]
+        stages = []
+
+        def plan(preprocessed, original, cancelled=None):
+            context = DetectionContext(np.zeros((10, 10), dtype=np.uint8), cancelled=cancelled)
+
+            def slow():
+                # Many short stages, each asking the context for an intermediate
+                for stage in range(300):
+                    context.memo(('stage', stage), lambda: time.sleep(0.01))
+                    stages.append(stage)
+
+            return [strong, ("Slow", "slow", slow)]
+
+        results = self.run_strategies(plan)
+        self.assertEqual([strategy.name for _, strategy in results], ["Strong"])
+        time.sleep(0.1)
+        stopped_at = len(stages)
+        time.sleep(0.1)
+        self.assertEqual(len(stages), stopped_at)
+        self.assertLess(stopped_at, 30)
+
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=3, OCR_TABLE_EARLY_EXIT_CONFIDENCE=85.0,
+                       OCR_STRATEGY_TELEMETRY=False)
+    def test_grid_only_winner_has_its_cells_read(self):
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "page.png")
+        cv2.imwrite(path, make_ruled_page(1000, 800))
+
+        # "Strong" builds a grid without text and wins before "Slow" finishes
+        with patch.object(self.detector, '_strategy_plan', self.plan(("Strong", 0.95, 0), ("Slow", 0.9, 1.0))), \
+                patch('ocr_processing.enhanced_table_detector.cached_call',
+                      lambda path, namespace, config, compute, **kwargs: compute()), \
+                patch('ocr_processing.tesseract_backend.PytesseractBackend.image_to_data',
+                      side_effect=RuntimeError("no page OCR")), \
+                patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)):
+            result, strategy = self.detector.detect_with_multiple_strategies(path)
+
+        self.assertEqual(strategy.name, "Strong")
+        self.assertTrue(all(cell.text == "text" for cell in result.cells))
+        self.assertEqual(result.headers, {str(col): "text" for col in range(5)})
+
+class DetectionContextTests(TestCase):
+    """Intermediates shared by detection strategies are computed once per page"""
+
+    def test_strategies_share_binarization_and_page_ocr(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+        from ocr_processing.smart_preprocessor import ImageQualityMetrics
+
+        page = make_ruled_page(1000, 800)
+        metrics = ImageQualityMetrics(
+            brightness=128, contrast=50, sharpness=500, noise_level=2,
+            skew_angle=0, resolution=page.shape, quality_score=90
+        )
+        words = {'text': ['Total'], 'conf': ['90'], 'left': [70], 'top': [110], 'width': [60], 'height': [20]}
+        binarize = TableDetector.preprocess_image
+
+        with patch('ocr_processing.tesseract_backend.PytesseractBackend.image_to_data', return_value=words) as ocr, \
+                patch.object(TableDetector, 'preprocess_image', autospec=True, side_effect=binarize) as binary, \
+                override_settings(OCR_TABLE_STRATEGY_WORKERS=3, OCR_TABLE_EARLY_EXIT_CONFIDENCE=None):
+            results = EnhancedTableDetector()._run_strategies(page, page, metrics)
+
+        # Text Blocks and Hybrid both use the page OCR; Morphology and Hybrid the binarization
+        self.assertEqual(ocr.call_count, 1)
+        self.assertEqual(binary.call_count, 1)
+        self.assertIn("Hybrid", [strategy.name for _, strategy in results])
+
+    def test_failures_are_cached(self):
+        from ocr_processing.detection_context import DetectionContext
+
+        context = DetectionContext(np.zeros((10, 10), dtype=np.uint8))
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise RuntimeError("tesseract missing")
+
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                context.memo('word_data', fail)
+        self.assertEqual(len(calls), 1)
+
+
+class CellIndexTests(TestCase):
+    """Spatial index lookups agree with a linear scan over all cells"""
+
+    @staticmethod
+    def scan(boxes, xs, ys, inclusive):
+        """Reference: first cell (in list order) containing each point"""
+        if inclusive:
+            inside = ((xs[:, None] >= boxes[:, 0]) & (xs[:, None] <= boxes[:, 2]) &
+                      (ys[:, None] >= boxes[:, 1]) & (ys[:, None] <= boxes[:, 3]))
+        else:
+            inside = ((xs[:, None] >= boxes[:, 0]) & (xs[:, None] < boxes[:, 2]) &
+                      (ys[:, None] >= boxes[:, 1]) & (ys[:, None] < boxes[:, 3]))
+        return np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+    def test_lookup_matches_linear_scan(self):
+        from ocr_processing.cell_index import CellIndex, VECTORIZE_MIN_POINTS
+
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            count = int(rng.integers(1, 60))
+            corner = rng.integers(0, 1000, (count, 2))
+            boxes = np.hstack([corner, corner + rng.integers(0, 300, (count, 2))])
+            index = CellIndex(boxes)
+            # Small queries take the loop, large ones the vectorized path
+            for points in (VECTORIZE_MIN_POINTS // 2, VECTORIZE_MIN_POINTS * 4):
+                xs = rng.integers(-10, 1310, points).astype(np.float64)
+                ys = rng.integers(-10, 1310, points).astype(np.float64)
+                xs[::3] += 0.5
+                for inclusive in (False, True):
+                    np.testing.assert_array_equal(
+                        index.locate(xs, ys, inclusive), self.scan(boxes, xs, ys, inclusive)
+                    )
+
+    def test_word_assignment_on_grid(self):
+        detector = TableDetector()
+        cells = detector.build_grid([0, 40, 80, 120], [0, 100, 200])
+        boxes = np.array([
+            [10, 5, 60, 30],     # Inside the first cell
+            [110, 45, 190, 75],  # Inside row 1, column 1
+            [60, 85, 160, 110],  # Spans the column border
+            [500, 500, 520, 520],  # Outside the grid
+        ])
+        cell_index, ambiguous = detector.assign_words_to_cells(boxes, cells)
+
+        expected = self.scan(
+            np.array([(c.x, c.y, c.x + c.width, c.y + c.height) for c in cells]),
+            (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2, False
+        )
+        np.testing.assert_array_equal(cell_index, expected)
+        self.assertEqual(cell_index[3], -1)
+        self.assertEqual(ambiguous.tolist(), [False, False, True, False])
+
+
+class SinglePassOCRTests(TestCase):
+    """Table text comes from one OCR pass whose words are assigned to cells"""
+
+    def test_words_fill_their_cells_from_one_ocr_call(self):
+        detector = TableDetector()
+        # 3 rows x 2 columns; the OCR region starts at (20, 50)
+        cells = detector.build_grid([50, 90, 130, 170], [20, 120, 220])
+        words = {  # Region coordinates
+            'text': ['', 'Name', 'Total', 'due', '|', 'Overflowing'],
+            'conf': ['-1', '90', '80', '90', '95', '70'],
+            'left': [0, 10, 110, 155, 99, 60],
+            'top': [0, 5, 45, 45, 85, 85],
+            'width': [200, 40, 40, 30, 3, 100],
+            'height': [120, 20, 20, 20, 20, 20],
+        }
+        with patch('ocr_processing.tesseract_backend.PytesseractBackend.image_to_data',
+                   return_value=words) as page_ocr, \
+                patch('ocr_processing.table_detector.ocr_cell_image', return_value=("Overflow", 60.0)) as cell_ocr:
+            fallback = detector.extract_cells_text_single_pass(np.zeros((300, 300), dtype=np.uint8), cells)
+
+        self.assertEqual(page_ocr.call_count, 1)
+        self.assertEqual(page_ocr.call_args[0][0].shape, (120, 200))
+        by_position = {(cell.row, cell.col): cell for cell in cells}
+        self.assertEqual({position: cell.text for position, cell in by_position.items()}, {
+            (0, 0): "Name", (0, 1): "", (1, 0): "", (1, 1): "Total due", (2, 0): "", (2, 1): "Overflow",
+        })
+        self.assertEqual(by_position[(1, 1)].confidence, 85.0)
+        self.assertEqual(by_position[(0, 1)].confidence, 0.0)
+        # Only the cell whose word crosses a ruling is read again on its own
+        self.assertEqual((fallback, cell_ocr.call_count), (1, 1))
+
+
+class LineClusteringTests(TestCase):
+    """Thick or broken rulings produce one grid line each"""
+
+    def test_merge_close_lines(self):
+        from ocr_processing.table_detector import merge_close_lines
+        self.assertEqual(merge_close_lines([102, 100, 101, 250, 251, 400], 3), [101, 250, 400])
+        self.assertEqual(merge_close_lines([], 3), [])
+
+    def test_thick_lines_do_not_multiply_cells_or_ocr_calls(self):
+        import os
+        import tempfile
+
+        rows, cols = 8, 5
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "thick_lines.png")
+            cv2.imwrite(path, make_thick_ruled_page(rows, cols))
+            with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)) as ocr:
+                tables = TableDetector()._detect_tables_uncached(path, "morphology", "cell")
+
+        self.assertEqual(len(tables), 1)
+        structure = tables[0]
+        self.assertEqual((structure.rows, structure.cols), (rows, cols))
+        self.assertEqual(len(structure.cells), rows * cols)
+        self.assertEqual(ocr.call_count, rows * cols)
+
+    def test_morphology_strategy_merges_thick_lines(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        # The strategy only keeps lines spanning 30% of the page, so use longer segments
+        structure = EnhancedTableDetector()._detect_morphology(make_thick_ruled_page(8, 5, segments=2))
+        self.assertEqual((structure.rows, structure.cols), (8, 5))
+
+
+class ProjectionProfileTests(TestCase):
+    """The projection-profile strategy finds the same grid as morphology on clean forms"""
+
+    def test_matches_morphology_grid(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        detector = EnhancedTableDetector()
+        for page in (make_ruled_page(), make_thick_ruled_page(8, 5, segments=2)):
+            projection = detector._detect_projection(page)
+            morphology = detector._detect_morphology(page)
+            self.assertEqual((projection.rows, projection.cols), (morphology.rows, morphology.cols))
+            for ours, theirs in zip(projection.cells, morphology.cells):
+                self.assertLessEqual(abs(ours.x - theirs.x), 2)
+                self.assertLessEqual(abs(ours.y - theirs.y), 2)
+
+    def test_blank_page_has_no_table(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        self.assertIsNone(EnhancedTableDetector()._detect_projection(make_shadowed_page(800, 600)))
+
+    @override_settings(OCR_TABLE_STRATEGY_WORKERS=3, OCR_TABLE_EARLY_EXIT_CONFIDENCE=80.0,
+                       OCR_STRATEGY_TELEMETRY=False)
+    def test_first_pass_early_exit_returns_read_cells(self):
+        import tempfile
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "form.png")
+        page, ys, xs = make_form(filled=True)
+        cv2.imwrite(path, page)
+
+        detector = EnhancedTableDetector()
+        with patch('ocr_processing.enhanced_table_detector.cached_call',
+                   lambda path, namespace, config, compute, **kwargs: compute()), \
+                patch('ocr_processing.tesseract_backend.PytesseractBackend.image_to_data',
+                      side_effect=RuntimeError("no page OCR")), \
+                patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)):
+            result, strategy = detector.detect_with_multiple_strategies(path)
+
+        # Projection ran alone and won, yet its grid comes back with text
+        self.assertEqual([info.method for info in detector.strategies], ["projection"])
+        self.assertEqual(strategy.method, "projection")
+        self.assertEqual(len(result.cells), (len(ys) - 1) * (len(xs) - 1))
+        self.assertTrue(all(cell.text == "text" for cell in result.cells))
+        self.assertEqual(len(result.headers), len(xs) - 1)
+
+
+class ConnectedComponentsTests(TestCase):
+    """The connected-components strategy recovers merged cells with their spans"""
+
+    def test_merged_cells(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        structure = EnhancedTableDetector()._detect_components(make_merged_cell_page())
+        self.assertEqual((structure.rows, structure.cols), (4, 4))
+        # 16 grid cells, two pairs of them merged
+        self.assertEqual(len(structure.cells), 14)
+        spans = {(c.row, c.col): (c.row_span, c.col_span) for c in structure.cells}
+        self.assertEqual(spans[(0, 0)], (1, 2))
+        self.assertEqual(spans[(2, 0)], (2, 1))
+        self.assertNotIn((0, 1), spans)
+        self.assertNotIn((3, 0), spans)
+        self.assertTrue(all(span == (1, 1) for key, span in spans.items() if key not in ((0, 0), (2, 0))))
+
+    def test_plain_grid_matches_morphology(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        detector = EnhancedTableDetector()
+        page = make_thick_ruled_page(8, 5, segments=2)
+        components = detector._detect_components(page)
+        morphology = detector._detect_morphology(page)
+        self.assertEqual((components.rows, components.cols), (morphology.rows, morphology.cols))
+        self.assertEqual([(c.row, c.col) for c in components.cells], [(c.row, c.col) for c in morphology.cells])
+        for ours, theirs in zip(components.cells, morphology.cells):
+            self.assertLessEqual(abs(ours.x - theirs.x), 5)
+            self.assertLessEqual(abs(ours.y - theirs.y), 5)
+
+    def test_blank_page_has_no_table(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        self.assertIsNone(EnhancedTableDetector()._detect_components(make_shadowed_page(800, 600)))
+
+
+@patch('ocr_processing.template_alignment.cached_call', lambda path, namespace, config, compute: compute())
+class TemplateAlignmentTests(TestCase):
+    """Filled copies of a template are read through the template's stored cells"""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        template, ys, xs = make_form(filled=False)
+        self.template_image = cv2.imencode('.png', template)[1].tobytes()
+        self.structure = TableDetector().structure_to_dict(
+            TableStructure(rows=len(ys) - 1, cols=len(xs) - 1, headers={}, grid_confidence=80.0,
+                           cells=TableDetector().build_grid(ys, xs))
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "document.png")
+
+    def register(self, document):
+        from ocr_processing.template_alignment import register_to_template
+
+        cv2.imwrite(self.path, document)
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)) as ocr:
+            tables = register_to_template(self.path, self.template_image, self.structure, ocr_mode="cell")
+        return tables, ocr
+
+    def test_skewed_copy_is_read_from_warped_cells(self):
+        filled, _, _ = make_form(filled=True)
+        for transform in (np.float32([[1, 0, 25], [0, 1, -40]]),  # Offset scan: ruling fit
+                          cv2.getRotationMatrix2D((850, 1100), 2.0, 0.95)):  # Skewed scan: ORB fit
+            document = cv2.warpAffine(filled, transform, filled.shape[::-1], borderValue=240)
+            tables, ocr = self.register(document)
+
+            self.assertEqual(len(tables), 1)
+            structure = tables[0]
+            self.assertEqual((structure.rows, structure.cols), (12, 4))
+            self.assertEqual(len(structure.cells), 48)
+            self.assertEqual(ocr.call_count, 48)
+            for stored, cell in zip(self.structure['cells'], structure.cells):
+                corners = np.float32([[stored['x'], stored['y']],
+                                      [stored['x'] + stored['width'], stored['y'] + stored['height']]])
+                expected = cv2.transform(corners.reshape(-1, 1, 2), transform).reshape(-1, 2)
+                # Bounding boxes of rotated cells grow by the rotation, so compare centers
+                center = np.array([cell.x + cell.width / 2, cell.y + cell.height / 2])
+                self.assertLess(np.abs(center - expected.mean(axis=0)).max(), 4)
+
+    def test_every_template_table_is_read(self):
+        page, grids = make_two_table_page()
+        self.template_image = cv2.imencode('.png', page)[1].tobytes()
+        detector = TableDetector()
+        stored = []
+        for ys, xs in grids:
+            stored.append(TableStructure(rows=len(ys) - 1, cols=len(xs) - 1, headers={}, grid_confidence=80.0,
+                                         cells=detector.build_grid(ys, xs),
+                                         bbox=(xs[0] - 20, ys[0] - 20, xs[-1] - xs[0] + 40, ys[-1] - ys[0] + 40)))
+        self.structure = detector.tables_to_dict(stored)
+
+        document = cv2.warpAffine(page, np.float32([[1, 0, 30], [0, 1, 20]]), page.shape[::-1], borderValue=240)
+        tables, ocr = self.register(document)
+
+        self.assertEqual([(table.rows, table.cols) for table in tables], [(6, 4), (5, 3)])
+        self.assertEqual(ocr.call_count, 6 * 4 + 5 * 3)
+        for table, template_table in zip(tables, stored):
+            x, y, w, h = template_table.bbox
+            self.assertLessEqual(np.abs(np.subtract(table.bbox, (x + 30, y + 20, w, h))).max(), 3)
+            self.assertLessEqual(abs(table.cells[0].x - template_table.cells[0].x - 30), 3)
+
+    def test_other_form_falls_back_to_detection(self):
+        other, _, _ = make_form(filled=True, rows=7, cols=3)
+        tables, ocr = self.register(other)
+        self.assertIsNone(tables)
+        self.assertEqual(ocr.call_count, 0)
+
+    @override_settings(OCR_TEMPLATE_ALIGNMENT=False)
+    def test_disabled(self):
+        filled, _, _ = make_form(filled=True)
+        self.assertIsNone(self.register(filled)[0])
+
+
+@override_settings(OCR_TABLE_STRATEGY_WORKERS=1, OCR_TABLE_EARLY_EXIT_CONFIDENCE=None,
+                   OCR_STRATEGY_PRUNE_MIN_RUNS=20, OCR_STRATEGY_EXPLORE_EVERY=25)
+class StrategyTelemetryTests(TestCase):
+    """Strategy outcomes are persisted per quality bucket and steer later runs"""
+
+    def setUp(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+        from ocr_processing.smart_preprocessor import ImageQualityMetrics
+        from ocr_processing.strategy_stats import quality_bucket
+
+        self.detector = EnhancedTableDetector()
+        self.metrics = ImageQualityMetrics(
+            brightness=128, contrast=50, sharpness=500, noise_level=2,
+            skew_angle=0, resolution=(1000, 1400), quality_score=90
+        )
+        self.bucket = quality_bucket(self.metrics)
+        self.calls = []
+
+    def run_plan(self, *strategies):
+        """Run a fake plan of (name, grid_confidence) entries; method names are the lowercased names"""
+        from ocr_processing.table_detector import CellInfo, TableStructure
+
+        def make_run(name, grid_confidence):
+            def run():
+                self.calls.append(name)
+                if grid_confidence is None:
+                    return None
+                cells = [CellInfo(row=i // 5, col=i % 5, x=0, y=0, width=1, height=1) for i in range(25)]
+                return TableStructure(rows=5, cols=5, cells=cells, headers={}, grid_confidence=grid_confidence)
+            return run
+
+        plan = lambda preprocessed, original, cancelled=None: [
+            (name, name.lower(), make_run(name, confidence)) for name, confidence in strategies
+        ]
+        with patch.object(self.detector, '_strategy_plan', plan):
+            return self.detector._run_strategies(None, None, self.metrics)
+
+    def stat(self, method):
+        from ocr_processing.models import StrategyStat
+        return StrategyStat.objects.get(bucket=self.bucket, method=method)
+
+    def test_outcomes_are_recorded(self):
+        self.assertEqual(self.bucket, "high/clean/straight/small")
+        self.run_plan(("Weak", 0.5), ("Strong", 0.95), ("Empty", None))
+        self.run_plan(("Weak", 0.5), ("Strong", 0.95), ("Empty", None))
+
+        self.assertEqual((self.stat("strong").runs, self.stat("strong").wins), (2, 2))
+        self.assertEqual((self.stat("weak").runs, self.stat("weak").wins), (2, 0))
+        self.assertEqual((self.stat("empty").found, self.stat("empty").mean_confidence), (0, 0.0))
+        self.assertGreater(self.stat("weak").mean_confidence, 0)
+
+    def test_order_follows_win_rate_and_never_winners_are_pruned(self):
+        from ocr_processing.models import StrategyStat
+
+        StrategyStat.objects.create(bucket=self.bucket, method="hough", runs=20, wins=0, total_ms=4000)
+        StrategyStat.objects.create(bucket=self.bucket, method="contours", runs=10, wins=8, total_ms=500)
+        StrategyStat.objects.create(bucket=self.bucket, method="morphology", runs=10, wins=2, total_ms=300)
+
+        self.run_plan(("Projection", None), ("Morphology", 0.8), ("Contours", 0.8), ("Hough", 0.9))
+        # First pass stays first, then by win rate; Hough never won here and is skipped
+        self.assertEqual(self.calls, ["Projection", "Contours", "Morphology"])
+        self.assertEqual(self.stat("hough").runs, 20)
+
+    def test_exploration_run_keeps_pruned_strategies(self):
+        from ocr_processing.models import StrategyStat
+
+        from ocr_processing.models import StrategyBucket
+
+        StrategyStat.objects.create(bucket=self.bucket, method="hough", runs=20, wins=0)
+        StrategyStat.objects.create(bucket=self.bucket, method="morphology", runs=24, wins=24)
+        StrategyBucket.objects.create(bucket=self.bucket, detections=24)
+
+        self.run_plan(("Morphology", 0.8), ("Hough", 0.7))
+        self.assertEqual(self.calls, ["Morphology", "Hough"])
+        self.assertEqual(self.stat("hough").runs, 21)
+
+    @override_settings(OCR_STRATEGY_EXPLORE_EVERY=3)
+    def test_detections_without_a_winner_advance_exploration(self):
+        from ocr_processing.models import StrategyBucket, StrategyStat
+
+        StrategyStat.objects.create(bucket=self.bucket, method="hough", runs=20, wins=0)
+
+        for _ in range(3):
+            self.run_plan(("Morphology", None), ("Hough", None))
+        # Nothing ever won, yet the third detection is an exploration run
+        self.assertEqual(self.calls, ["Morphology", "Morphology", "Morphology", "Hough"])
+        self.assertEqual(StrategyBucket.objects.get(bucket=self.bucket).detections, 3)
+
+    @override_settings(OCR_STRATEGY_TELEMETRY=False)
+    def test_disabled_telemetry_records_nothing(self):
+        from ocr_processing.models import StrategyStat
+
+        self.run_plan(("Strong", 0.95),)
+        self.assertFalse(StrategyStat.objects.exists())
+
+    def test_stats_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from ocr_processing.models import StrategyBucket, StrategyStat
+
+        StrategyStat.objects.create(bucket=self.bucket, method="hough", runs=20, wins=0, total_ms=4000)
+        StrategyBucket.objects.create(bucket=self.bucket, detections=20)
+        StrategyStat.objects.create(bucket=self.bucket, method="morphology", runs=10, wins=9, total_ms=500,
+                                    found=10, confidence_sum=850)
+        out = StringIO()
+        call_command('strategy_stats', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn(self.bucket, lines)
+        morphology = next(line for line in lines if line.startswith("morphology"))
+        self.assertEqual(morphology.split()[1:], ["10", "9", "90.0", "100.0", "50.0", "85.0"])
+        self.assertTrue(next(line for line in lines if line.startswith("hough")).endswith("(pruned)"))
+
+        call_command('strategy_stats', '--reset', stdout=StringIO())
+        self.assertFalse(StrategyStat.objects.exists())
+        self.assertFalse(StrategyBucket.objects.exists())
+
+
+@override_settings(OCR_TABLE_STRATEGY_WORKERS=1, OCR_STRATEGY_TELEMETRY=False,
+                   OCR_TEMPLATE_PROFILE_MIN_CONFIDENCE=60.0, OCR_TEMPLATE_PROFILE_WINDOW=10,
+                   OCR_TEMPLATE_PROFILE_REFRESH_AFTER=3)
+class ProcessingProfileTests(TestCase):
+    """Templates remember the detection settings that worked and apply them to documents"""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "document.png")
+        # Bypass the result cache so every call runs detection
+        patcher = patch('ocr_processing.enhanced_table_detector.cached_call',
+                        lambda path, namespace, config, compute, **kwargs: compute())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def detect(self, page, profile):
+        from ocr_processing.processing_profile import detect_with_profile
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        cv2.imwrite(self.path, page)
+        search = EnhancedTableDetector._run_strategies
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)), \
+                patch.object(EnhancedTableDetector, '_run_strategies', autospec=True,
+                             side_effect=search) as full_search:
+            tables, strategy, used_profile = detect_with_profile(self.path, profile)
+        return tables, strategy, used_profile, full_search.call_count
+
+    def test_profile_strategy_runs_alone(self):
+        from ocr_processing.processing_profile import ProcessingProfile
+
+        tables, strategy, used_profile, searches = self.detect(
+            make_ruled_page(1000, 800), ProcessingProfile(strategy="morphology", denoise_tier="skip")
+        )
+        self.assertTrue(used_profile)
+        self.assertEqual(searches, 0)
+        self.assertEqual(strategy.method, "morphology")
+        self.assertEqual(strategy.denoise_tier, "skip")
+        self.assertEqual(len(tables), 1)
+        self.assertGreater(len(tables[0].cells), 0)
+
+    def test_failing_profile_falls_back_to_full_search(self):
+        from ocr_processing.processing_profile import ProcessingProfile
+
+        blank = np.full((1000, 800), 245, dtype=np.uint8)
+        tables, strategy, used_profile, searches = self.detect(blank, ProcessingProfile(strategy="morphology"))
+        self.assertFalse(used_profile)
+        self.assertEqual(searches, 1)
+
+    def test_profile_switches_after_repeated_full_searches(self):
+        from ocr_processing.enhanced_table_detector import DetectionStrategy
+        from ocr_processing.processing_profile import ProcessingProfile, update_profile
+
+        profile = ProcessingProfile(strategy="morphology", denoise_tier="skip")
+        hit = DetectionStrategy("Morphology", 80, 20, "morphology", denoise_tier="skip")
+        searched = DetectionStrategy("Connected Components", 75, 20, "components", denoise_tier="median",
+                                     line_kernel=35, binarization="otsu")
+
+        self.assertFalse(update_profile(profile, hit, True))
+        self.assertFalse(update_profile(profile, searched, False))
+        self.assertFalse(update_profile(profile, searched, False))
+        self.assertTrue(update_profile(profile, searched, False))
+        # The settings the winning searches actually ran with are adopted
+        self.assertEqual((profile.strategy, profile.line_kernel, profile.binarization, profile.denoise_tier),
+                         ("components", 35, "otsu", "median"))
+        self.assertEqual(profile.recent, [])
+
+    def test_profile_records_the_settings_the_winner_used(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+        from ocr_processing.line_params import line_params
+        from ocr_processing.processing_profile import ProcessingProfile
+        from ocr_processing.smart_preprocessor import ImageQualityMetrics
+
+        page = make_ruled_page(1000, 800)
+        metrics = ImageQualityMetrics(
+            brightness=128, contrast=50, sharpness=500, noise_level=2,
+            skew_angle=0, resolution=page.shape, quality_score=90
+        )
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)), \
+                override_settings(OCR_TABLE_EARLY_EXIT_CONFIDENCE=None):
+            detector = EnhancedTableDetector(binarization="otsu")
+            results = {strategy.method: strategy for _, strategy in detector._run_strategies(page, page, metrics)}
+
+        # The page-scaled kernel, not the detector's unset one, and Otsu as requested
+        profile = ProcessingProfile.from_strategy(results["morphology"])
+        self.assertEqual(profile.line_kernel, line_params(page.shape).kernel_length)
+        self.assertEqual(profile.binarization, "otsu")
+        # Contours builds on Otsu and uses no ruling kernel whatever the detector's settings
+        contours = EnhancedTableDetector()
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)), \
+                override_settings(OCR_TABLE_EARLY_EXIT_CONFIDENCE=None):
+            results = {strategy.method: strategy for _, strategy in contours._run_strategies(page, page, metrics)}
+        self.assertEqual((results["contours"].line_kernel, results["contours"].binarization), (None, "otsu"))
+        self.assertEqual(results["morphology"].binarization, "adaptive")
+
+    def test_outcomes_are_stored_on_the_template(self):
+        from templates.models import Template
+        from ocr_processing.enhanced_table_detector import DetectionStrategy
+        from ocr_processing.processing_profile import (
+            profile_for_template, record_document_outcome, PROFILE_KEY
+        )
+
+        # Templates analysed before profiles existed get one from their detection method
+        template = Template.objects.create(name="Invoice", structure={
+            'cells': [], 'detection_method': 'enhanced_components', 'detection_confidence': 82.5
+        })
+        profile = profile_for_template(template.structure)
+        self.assertEqual((profile.strategy, profile.confidence), ("components", 82.5))
+        self.assertIsNone(profile_for_template({'detection_method': 'standard_table_detection'}))
+
+        record_document_outcome(template, DetectionStrategy("Connected Components", 88, 30, "components"), True)
+        stored = Template.objects.get(pk=template.pk).structure
+        self.assertEqual(stored['cells'], [])
+        self.assertEqual(stored[PROFILE_KEY]['strategy'], "components")
+        self.assertEqual(stored[PROFILE_KEY]['recent'][0]['confidence'], 88.0)
+
+
+@override_settings(OCR_TABLE_LOCALIZATION=True, OCR_TABLE_LOCALIZATION_SIZE=1000, OCR_TABLE_REGION_WORKERS=2,
+                   OCR_TABLE_STRATEGY_WORKERS=1, OCR_STRATEGY_TELEMETRY=False)
+class TableLocalizationTests(TestCase):
+    """Tables are localized on a thumbnail and detected inside their own crops"""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        self.page, self.tables = make_two_table_page()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "two_tables.png")
+        cv2.imwrite(self.path, self.page)
+
+    def test_regions_skip_letterhead_and_signature(self):
+        from ocr_processing.table_regions import find_table_regions
+
+        regions = find_table_regions(self.page)
+        self.assertEqual(len(regions), 2)
+        for region, (ys, xs) in zip(regions, self.tables):
+            self.assertTrue(region.x <= xs[0] and xs[-1] < region.x + region.width)
+            self.assertTrue(region.y <= ys[0] and ys[-1] < region.y + region.height)
+            # Only a small margin around the table
+            self.assertLess(region.height, ys[-1] - ys[0] + 100)
+
+    def test_blank_page_is_processed_whole(self):
+        from ocr_processing.table_regions import localize_tables
+
+        regions = localize_tables(np.full((800, 600), 240, dtype=np.uint8))
+        self.assertEqual([region.box for region in regions], [(0, 0, 600, 800)])
+
+    def test_each_table_is_read_in_page_coordinates(self):
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)) as ocr:
+            tables = TableDetector()._detect_tables_uncached(self.path, "morphology", "cell")
+
+        self.assertEqual([(table.rows, table.cols) for table in tables], [(6, 4), (5, 3)])
+        self.assertEqual(ocr.call_count, 6 * 4 + 5 * 3)
+        for table, (ys, xs) in zip(tables, self.tables):
+            first = table.cells[0]
+            self.assertLessEqual(abs(first.x - xs[0]) + abs(first.y - ys[0]), 4)
+            self.assertIsNotNone(table.bbox)
+
+    def test_enhanced_detector_keeps_every_table(self):
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+
+        detector = EnhancedTableDetector()
+        with patch('ocr_processing.enhanced_table_detector.cached_call',
+                   lambda path, namespace, config, compute, **kwargs: compute()):
+            result, strategy = detector.detect_with_multiple_strategies(self.path)
+
+        self.assertEqual(len(detector.tables), 2)
+        self.assertEqual((result.rows, result.cols), (6, 4))
+        (ys, xs), _ = self.tables
+        self.assertLessEqual(abs(result.cells[0].x - xs[0]) + abs(result.cells[0].y - ys[0]), 6)
+
+    def test_failed_detection_is_not_cached(self):
+        from ocr_processing.result_cache import OCRResultCache
+
+        table = TableStructure(rows=1, cols=1, cells=[], headers={}, grid_confidence=0.0)
+        with patch('ocr_processing.result_cache.get_result_cache', return_value=OCRResultCache()), \
+                patch.object(TableDetector, '_detect_tables_uncached', side_effect=[[], [table]]) as detect:
+            detector = TableDetector()
+            self.assertEqual(detector.detect_tables(self.path), [])
+            self.assertEqual(len(detector.detect_tables(self.path)), 1)
+            self.assertEqual(len(detector.detect_tables(self.path)), 1)
+
+        # The failure was retried, the success served from the cache
+        self.assertEqual(detect.call_count, 2)
+
+    @override_settings(OCR_TEMPLATE_PROFILE_MIN_CONFIDENCE=0.0)
+    def test_profile_detection_keeps_every_table(self):
+        from ocr_processing.processing_profile import ProcessingProfile, detect_with_profile
+
+        with patch('ocr_processing.enhanced_table_detector.cached_call',
+                   lambda path, namespace, config, compute, **kwargs: compute()), \
+                patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)):
+            tables, strategy, used_profile = detect_with_profile(self.path, ProcessingProfile(strategy="morphology"))
+
+        self.assertTrue(used_profile)
+        self.assertEqual([(table.rows, table.cols) for table in tables], [(6, 4), (5, 3)])
+
+    def test_stored_data_has_every_table(self):
+        detector = TableDetector()
+        with patch('ocr_processing.table_detector.ocr_cell_image', return_value=("text", 90.0)):
+            tables = detector._detect_tables_uncached(self.path, "morphology", "cell")
+        data = detector.tables_to_dict(list(reversed(tables)))
+
+        # The largest table stays at the top level for single-table consumers
+        self.assertEqual((data['rows'], data['cols'], len(data['cells'])), (6, 4, 24))
+        self.assertEqual([(table['rows'], table['cols']) for table in data['tables']], [(5, 3), (6, 4)])
+        self.assertEqual([table['bbox'] for table in data['tables']],
+                         [list(table.bbox) for table in reversed(tables)])
+
+
+@override_settings(OCR_LINE_DETECTION_SIZE=800, OCR_LINE_DETECTION_MAX_FACTOR=4)
+class LineScaleTests(TestCase):
+    """Line detection sizes follow the page, and rulings are found on a reduced binary image"""
+
+    def test_factor_and_sizes_follow_the_page(self):
+        from ocr_processing.line_params import line_params
+
+        small, reference, large = (line_params(shape) for shape in ((1100, 850), (2000, 1500), (8000, 6000)))
+        self.assertEqual([p.factor for p in (small, reference, large)], [1, 2, 4])
+        self.assertEqual((reference.kernel_length, reference.block_size, reference.min_line_length), (40, 11, 50))
+        self.assertEqual(large.kernel_length, 4 * reference.kernel_length)
+        with override_settings(OCR_LINE_DETECTION_MAX_FACTOR=1):
+            self.assertEqual(line_params((8000, 6000)).factor, 1)
+
+    def test_reduction_keeps_thin_rulings(self):
+        from ocr_processing.line_params import reduce_binary
+
+        binary = np.zeros((400, 400), dtype=np.uint8)
+        binary[201, 20:380] = 255  # 1px ruling off the block grid
+        binary[50, 50] = 255  # Speck
+        reduced = reduce_binary(binary, 4)
+        self.assertEqual(reduced.shape, (100, 100))
+        self.assertTrue(reduced[50, 5:95].all())
+        self.assertFalse(reduced[12, 12])
+
+    def test_same_grid_at_every_resolution(self):
+        page, ys, xs = make_form(filled=True)
+        detector = TableDetector()
+        for scale in (0.5, 1.0, 2.0):
+            image = cv2.resize(page, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            h_lines, v_lines = detector.detect_lines(detector.preprocess_image(image))
+            self.assertEqual((len(h_lines), len(v_lines)), (len(ys), len(xs)))
+            # Within a few pixels of the rulings, reduced detection included
+            self.assertLessEqual(np.abs(np.array(h_lines) - np.array(ys) * scale).max(), 2 * scale + 2)
+            self.assertLessEqual(np.abs(np.array(v_lines) - np.array(xs) * scale).max(), 2 * scale + 2)
+
+    def test_hough_runs_on_the_shared_reduced_binary(self):
+        from ocr_processing.detection_context import DetectionContext
+
+        page, ys, xs = make_form(filled=False, height=4400, width=3400)
+        context = DetectionContext(page)
+        self.assertGreater(context.params.factor, 1)
+        h_lines, v_lines = context.hough_lines()
+        self.assertIn('reduced_binary', context._values)
+        self.assertEqual(len(v_lines), len(xs))
+        # Every ruling is found near its position (the title's baseline may add one)
+        for ruling in ys:
+            self.assertLessEqual(min(abs(line - ruling) for line in h_lines), 2 * context.params.factor)
+
+
+class TesseractBackendTests(TestCase):
+    """Every Tesseract call goes through a backend, and backends return the same layout"""
+
+    @override_settings(OCR_TESSERACT_BACKEND='pytesseract')
+    def test_cache_keys_without_an_engine_carry_the_backend_version(self):
+        from ocr_processing import tesseract_backend
+        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+        from ocr_processing.template_alignment import register_to_template
+
+        configs = []
+
+        def record(path, namespace, config, compute, **kwargs):
+            configs.append(config)
+
+        with patch.dict(tesseract_backend._backend_versions, clear=True), \
+                patch('ocr_processing.tesseract_backend.PytesseractBackend.version',
+                      return_value="5.3.0") as version, \
+                patch('ocr_processing.table_detector.cached_call', record), \
+                patch('ocr_processing.template_alignment.cached_call', record):
+            configs.append(EnhancedTableDetector()._cache_config())
+            TableDetector().detect_tables("page.png")
+            register_to_template("page.png", b"template", {'cells': [{'x': 0, 'y': 0, 'width': 1, 'height': 1}]})
+
+        self.assertEqual(len(configs), 3)
+        for config in configs:
+            self.assertEqual((config['engine'], config['engine_version']), ("pytesseract", "pytesseract-5.3.0"))
+        # Looked up once, not on every cache lookup
+        self.assertEqual(version.call_count, 1)
+
+    def test_tesserocr_rows_carry_layout_numbers(self):
+        from types import SimpleNamespace
+        from ocr_processing import tesseract_backend
+
+        # Two blocks: "Name Total" on one line, then "42" in a block of its own
+        words = [("Name", (0, 0, 40, 10), {'BLOCK', 'PARA', 'TEXTLINE'}),
+                 ("Total", (50, 0, 90, 10), set()),
+                 ("42", (0, 30, 20, 40), {'BLOCK', 'PARA', 'TEXTLINE'})]
+
+        class Word:
+            def __init__(self, text, box, starts):
+                self.text, self.box, self.starts = text, box, starts
+
+            def IsAtBeginningOf(self, level):
+                return level in self.starts
+
+            def GetUTF8Text(self, level):
+                return self.text
+
+            def BoundingBox(self, level):
+                return self.box
+
+            def Confidence(self, level):
+                return 91.0
+
+        api = SimpleNamespace(SetImageBytes=lambda *args: None, Recognize=lambda: None,
+                              GetIterator=lambda: object())
+        fake = SimpleNamespace(
+            RIL=SimpleNamespace(BLOCK='BLOCK', PARA='PARA', TEXTLINE='TEXTLINE', WORD='WORD'),
+            iterate_level=lambda iterator, level: (Word(*word) for word in words),
+            PyTessBaseAPI=lambda lang: api
+        )
+
+        with patch.object(tesseract_backend, 'tesserocr', fake):
+            data = tesseract_backend.TesserocrBackend().image_to_data(np.zeros((50, 100), dtype=np.uint8))
+
+        self.assertEqual(data['text'], ["Name", "Total", "42"])
+        self.assertEqual(data['level'], [5, 5, 5])
+        self.assertEqual(data['block_num'], [1, 1, 2])
+        self.assertEqual(data['line_num'], [1, 1, 1])
+        self.assertEqual(data['word_num'], [1, 2, 1])
+        self.assertEqual(data['width'], [40, 40, 20])
+
+    def test_cells_and_context_use_the_configured_backend(self):
+        from ocr_processing import tesseract_backend
+        from ocr_processing.detection_context import DetectionContext
+        from ocr_processing.table_detector import ocr_cell_image
+
+        words = {'text': ['42'], 'conf': [88], 'left': [1], 'top': [1], 'width': [5], 'height': [5]}
+
+        class Backend:
+            name = "fake"
+            calls = 0
+
+            def image_to_data(self, image):
+                Backend.calls += 1
+                return words
+
+        with patch.dict(tesseract_backend._shared_backends, {'fake': Backend()}), \
+                override_settings(OCR_TESSERACT_BACKEND='fake'):
+            self.assertEqual(ocr_cell_image(np.zeros((10, 10), dtype=np.uint8)), ("42", 88.0))
+            self.assertIs(DetectionContext(np.zeros((10, 10), dtype=np.uint8)).word_data(), words)
+        self.assertEqual(Backend.calls, 2)
+
+    def test_process_mode_cells_keep_the_engine_backend(self):
+        from ocr_processing.cell_executor import CellOCRExecutor
+        from ocr_processing.table_detector import CellInfo
+
+        executor = CellOCRExecutor(max_workers=2, mode="process")
+        engine = type('Engine', (), {'tesseract_backend': type('Backend', (), {'name': 'tesserocr'})()})()
+        cells = [CellInfo(row=0, col=col, x=col * 10, y=0, width=10, height=10) for col in range(4)]
+        shipped = []
+
+        def run_inline(fn, items):
+            shipped.append(fn)
+            return [("", 0.0) for _ in items]
+
+        with patch('ocr_processing.table_detector.get_cell_executor', return_value=executor), \
+                patch.object(executor, 'map', side_effect=run_inline):
+            TableDetector(engine).extract_cells_text(np.zeros((10, 40), dtype=np.uint8), cells)
+
+        self.assertEqual(shipped[0].keywords, {'backend': 'tesserocr'})
+
+
+class PDFPageTests(TestCase):
+    """Multi-page PDFs are read page by page and combined in page order"""
+
+    def test_pages_are_combined_in_page_order(self):
+        from ocr_processing.ocr_core import OCREngine, OCRResult
+
+        class TextLayer:
+            """Pages 2 and 4 are born-digital"""
+
+            def __init__(self, path):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+            def page_result(self, number):
+                if number % 2:
+                    return None
+                return OCRResult(text=f"page {number}", confidence=100.0, engine="text_layer",
+                                 page_number=number, source="text_layer")
+
+        def ocr_in_completion_order(pdf_path, page_numbers, workers, preprocess):
+            return [OCRResult(text=f"page {n}", confidence=80.0, engine="tesseract", page_number=n)
+                    for n in reversed(page_numbers)]
+
+        engine = OCREngine("tesseract")
+        with patch('ocr_processing.ocr_core.get_pdf_page_count', return_value=5), \
+                patch('ocr_processing.ocr_core.PDFTextLayer', TextLayer), \
+                patch.object(engine, '_process_pdf_parallel', side_effect=ocr_in_completion_order) as ocr, \
+                override_settings(OCR_PDF_PAGE_WORKERS=2, OCR_PDF_USE_TEXT_LAYER=True):
+            result = engine._process_pdf("scan.pdf")
+
+        self.assertEqual(ocr.call_args[0][1], [1, 3, 5])
+        self.assertEqual([page.page_number for page in result.pages], [1, 2, 3, 4, 5])
+        self.assertEqual(result.text, "\n\n".join(f"page {n}" for n in range(1, 6)))
+        self.assertEqual(result.engine, "pdf_tesseract")
+
+    def test_page_pool_is_spawned_once_and_reused(self):
+        from ocr_processing import ocr_core
+
+        with patch.object(ocr_core, '_pdf_pool', None), override_settings(OCR_PDF_PAGE_WORKERS=1):
+            pool = ocr_core._get_pdf_pool()
+            try:
+                self.assertIs(ocr_core._get_pdf_pool(), pool)
+                self.assertEqual(pool._mp_context.get_start_method(), 'spawn')
+                self.assertEqual(pool.submit(abs, -3).result(timeout=60), 3)
+            finally:
+                ocr_core._discard_pdf_pool(pool)
+            self.assertIsNone(ocr_core._pdf_pool)
+
+
+    def test_worker_keeps_one_engine_per_configuration(self):
+        from unittest.mock import MagicMock
+        from ocr_processing import ocr_core
+
+        with patch.dict(ocr_core._worker_engines, clear=True), \
+                patch.object(ocr_core, 'OCREngine', side_effect=lambda *args, **kwargs: MagicMock()) as engine_class:
+            for preferred_engine, backend in (("tesseract", "pytesseract"), ("easyocr", "pytesseract"),
+                                              ("tesseract", "tesserocr"), ("tesseract", "pytesseract")):
+                ocr_core._ocr_pdf_page_worker(("scan.pdf", 1, 200, True, preferred_engine, backend))
+            engines = dict(ocr_core._worker_engines)
+
+        self.assertEqual([call.args[0] for call in engine_class.call_args_list], ["tesseract", "easyocr", "tesseract"])
+        self.assertEqual(set(engines), {("tesseract", "pytesseract"), ("easyocr", "pytesseract"),
+                                        ("tesseract", "tesserocr")})
+        self.assertEqual(engines[("tesseract", "pytesseract")].ocr_pdf_page.call_count, 2)
+
+class PDFTextLayerTests(TestCase):
+    """Only real embedded text lets a PDF page skip OCR"""
+
+    def setUp(self):
+        from ocr_processing.pdf_text_layer import PDFTextLayer
+
+        self.layer = PDFTextLayer("unused.pdf", min_chars=25)
+
+    def test_plain_text_is_usable(self):
+        self.assertTrue(self.layer.is_usable("Invoice 2024-117\nTotal due: €1,250.00 – paid “in full”"))
+
+    def test_broken_font_encoding_is_not_usable(self):
+        text = "Invoice number and totals for the period " + "(cid:12)(cid:57)"
+        self.assertFalse(self.layer.is_usable(text))
+
+    def test_too_little_text_is_not_usable(self):
+        # Whitespace does not count towards min_chars
+        self.assertFalse(self.layer.is_usable("Page 1 of 3" + " " * 40 + "\n" * 10))
+        self.assertTrue(self.layer.is_usable("x" * 25))
+        self.assertFalse(self.layer.is_usable("x" * 24))
+
+    def test_mostly_unprintable_glyphs_are_not_usable(self):
+        private_use = "\ue001\ue002\ue003"
+        # 26 / 29 printable is just below MIN_PRINTABLE_RATIO (0.9), 27 / 30 meets it
+        self.assertFalse(self.layer.is_usable("a" * 26 + private_use))
+        self.assertTrue(self.layer.is_usable("a" * 27 + private_use))
+
+
+class ResultCacheTests(TestCase):
+    """Results are keyed by file content and configuration, and invalidated across workers"""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+
+    def write_file(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_key_follows_content_and_config(self):
+        from ocr_processing.result_cache import OCRResultCache
+
+        cache = OCRResultCache(self.cache_dir)
+        upload = self.write_file('a.png', b'page')
+        duplicate = self.write_file('b.png', b'page')
+        other = self.write_file('c.png', b'other page')
+        key = cache.make_key(upload, 'extract_text', {'engine': 'tesseract', 'dpi': 200})
+
+        self.assertEqual(cache.make_key(duplicate, 'extract_text', {'dpi': 200, 'engine': 'tesseract'}), key)
+        self.assertNotEqual(cache.make_key(other, 'extract_text', {'engine': 'tesseract', 'dpi': 200}), key)
+        self.assertNotEqual(cache.make_key(upload, 'extract_text', {'engine': 'tesseract', 'dpi': 300}), key)
+        self.assertNotEqual(cache.make_key(upload, 'table_structures', {'engine': 'tesseract', 'dpi': 200}), key)
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        from ocr_processing.result_cache import OCRResultCache
+
+        entry_bytes = len(pickle.dumps('x' * 1000, protocol=pickle.HIGHEST_PROTOCOL))
+        cache = OCRResultCache(max_memory_bytes=2 * entry_bytes)
+        for key in ('a', 'b'):
+            cache.set(key, key * 1000)
+        cache.get('a')  # 'b' is now the least recently used
+        cache.set('c', 'c' * 1000)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'a' * 1000)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_disk_tier_is_shared_and_returns_copies(self):
+        from ocr_processing.result_cache import OCRResultCache
+
+        writer, reader = OCRResultCache(self.cache_dir), OCRResultCache(self.cache_dir)
+        key = writer.make_key(self.write_file('a.png', b'page'), 'extract_text', {})
+        writer.set(key, {'cells': [1, 2]})
+
+        value = reader.get(key)
+        self.assertEqual(value, {'cells': [1, 2]})
+        self.assertEqual(reader.stats()['disk_hits'], 1)
+        value['cells'].append(3)
+        self.assertEqual(reader.get(key), {'cells': [1, 2]})
+
+    def test_clear_invalidates_other_workers(self):
+        from ocr_processing.result_cache import OCRResultCache
+
+        path = self.write_file('a.png', b'page')
+        worker, other_worker = OCRResultCache(self.cache_dir), OCRResultCache(self.cache_dir)
+        for cache in (worker, other_worker):
+            cache.set(cache.make_key(path, 'extract_text', {}), 'old result')
+        self.assertEqual(other_worker.get(other_worker.make_key(path, 'extract_text', {})), 'old result')
+
+        worker.clear()
+
+        # The other worker's memory tier still holds the entry, under a key no longer used
+        self.assertEqual(other_worker.stats()['memory_entries'], 1)
+        self.assertIsNone(other_worker.get(other_worker.make_key(path, 'extract_text', {})))
+        self.assertEqual(OCRResultCache(self.cache_dir).generation(), 1)
+
+
+class ResolutionTests(TestCase):
+    """Pages are resampled to a working scale and coordinates mapped back"""
+
+    def test_compute_scale(self):
+        from ocr_processing.resolution import compute_scale
+
+        self.assertEqual(compute_scale(2480, 3508), 1.0)
+        self.assertEqual(compute_scale(2480, 3508, dpi=300), 1.0)
+        self.assertAlmostEqual(compute_scale(4960, 7016, dpi=600), 0.5)
+        self.assertAlmostEqual(compute_scale(3000, 8000), 0.5)
+        # The stronger of the two limits wins, and small pages are never upscaled
+        self.assertAlmostEqual(compute_scale(3000, 8000, dpi=400), 0.5)
+        self.assertAlmostEqual(compute_scale(3000, 4000, dpi=1200), 0.25)
+        self.assertEqual(compute_scale(600, 800, dpi=150), 1.0)
+
+    def test_cells_to_original(self):
+        from ocr_processing.resolution import ResolutionInfo, cells_to_original
+        from ocr_processing.table_detector import CellInfo
+
+        cells = [CellInfo(row=0, col=0, x=10, y=20, width=100, height=33)]
+        cells_to_original(cells, ResolutionInfo((4000, 3000), (1000, 750), 0.25))
+        self.assertEqual((cells[0].x, cells[0].y, cells[0].width, cells[0].height), (40, 80, 400, 132))
+
+        cells_to_original(cells, ResolutionInfo((1000, 750), (1000, 750), 1.0))
+        self.assertEqual((cells[0].x, cells[0].width), (40, 400))
+
+    def test_x_height_is_measured_on_a_bounded_copy(self):
+        from ocr_processing.resolution import estimate_x_height
+
+        page = np.full((4000, 3000), 245, dtype=np.uint8)
+        for y in range(150, 3900, 120):
+            cv2.putText(page, "the quick brown fox jumps over 0123", (40, y), cv2.FONT_HERSHEY_SIMPLEX, 3, 20, 6)
+        full = estimate_x_height(page, max_side=max(page.shape))
+
+        with patch('ocr_processing.resolution.cv2.connectedComponentsWithStats',
+                   side_effect=cv2.connectedComponentsWithStats) as components:
+            sampled = estimate_x_height(page)
+        self.assertLessEqual(max(components.call_args[0][0].shape), 1500)
+        self.assertAlmostEqual(sampled, full, delta=0.1 * full)
+
+
+class DenoiseTierTests(TestCase):
+    """The denoising tier follows the noise level and steps down to fit the page budget"""
+
+    A4_300DPI_MP = 2480 * 3508 / 1e6
+
+    def test_tier_follows_noise_level(self):
+        from ocr_processing.denoise import choose_tier, get_denoise_budget_ms
+
+        budget = get_denoise_budget_ms()
+        self.assertEqual([choose_tier(noise, 1.0, budget) for noise in (2, 6, 9, 12, 20)],
+                         ["skip", "median", "bilateral", "nlm_downscaled", "nlm_full"])
+
+    def test_a4_page_can_afford_downscaled_nl_means(self):
+        from ocr_processing.denoise import choose_tier, get_denoise_budget_ms
+
+        budget = get_denoise_budget_ms()
+        self.assertEqual(choose_tier(12, self.A4_300DPI_MP, budget), "nlm_downscaled")
+        # Full NL-means on an A4 page steps down one tier rather than to bilateral
+        self.assertEqual(choose_tier(20, self.A4_300DPI_MP, budget), "nlm_downscaled")
+
+    def test_tight_budget_steps_down(self):
+        from ocr_processing.denoise import choose_tier
+
+        self.assertEqual(choose_tier(20, self.A4_300DPI_MP, 100), "bilateral")
+        self.assertEqual(choose_tier(20, self.A4_300DPI_MP, 5), "median")
+        self.assertEqual(choose_tier(20, self.A4_300DPI_MP, 0), "skip")
+
+    def test_forced_tier_ignores_budget(self):
+        from ocr_processing.denoise import denoise_tiered
+
+        page = np.random.default_rng(0).normal(200, 20, (200, 200)).clip(0, 255).astype(np.uint8)
+        result = denoise_tiered(page, budget_ms=0, tier="median")
+        self.assertEqual(result.tier, "median")
+        self.assertEqual(result.requested_tier, "median")
+
+
+class EnginePoolTests(TestCase):
+    """Requests share a fixed set of warm engines, handed out round-robin"""
+
+    def setUp(self):
+        from unittest.mock import MagicMock
+
+        patcher = patch('ocr_processing.engine_pool.OCREngine',
+                        side_effect=lambda *args, **kwargs: MagicMock(name="engine"))
+        self.engine_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_engines_are_created_once_and_handed_out_round_robin(self):
+        from ocr_processing.engine_pool import OCREnginePool
+
+        pool = OCREnginePool("tesseract", size=2)
+        engines = [pool.get_engine() for _ in range(5)]
+
+        self.assertEqual(self.engine_class.call_count, 2)
+        self.assertIsNot(engines[0], engines[1])
+        self.assertEqual(engines, [engines[0], engines[1]] * 2 + [engines[0]])
+        self.assertEqual((pool.status()['checkouts'], pool.status()['warm']), (5, True))
+
+    def test_concurrent_first_requests_warm_the_pool_once(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from ocr_processing.engine_pool import OCREnginePool
+
+        pool = OCREnginePool("tesseract", size=3)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            engines = list(executor.map(lambda _: pool.get_engine(), range(12)))
+
+        self.assertEqual(self.engine_class.call_count, 3)
+        self.assertEqual(len({id(engine) for engine in engines}), 3)
+
+    @override_settings(OCR_ENGINE_POOL_SIZE=3, OCR_DEFAULT_ENGINE="tesseract")
+    def test_one_pool_per_backend_per_process(self):
+        from ocr_processing import engine_pool
+
+        with patch.dict(engine_pool._pools, clear=True):
+            pool = engine_pool.get_engine_pool()
+            self.assertIs(engine_pool.get_engine_pool("tesseract"), pool)
+            self.assertIsNot(engine_pool.get_engine_pool("easyocr"), pool)
+            self.assertEqual(pool.size, 3)
+            engine_pool.get_ocr_engine()
+            self.assertEqual(set(engine_pool.engine_pool_status()), {"tesseract", "easyocr"})
@@ -0,0 +1,254 @@
+"""
+Tiled Image Processing
+Runs local filters over very large pages tile by tile, with overlap, so that
+intermediate arrays scale with the tile size instead of the page size
+"""
+import threading
+import numpy as np
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_SIZE = 1024
+DEFAULT_OVERLAP = 96
+DEFAULT_WORKERS = 4
+
+# Pages with more pixels than this are processed in tiles
+DEFAULT_MIN_PIXELS = 12_000_000
+
+
+@dataclass
+class Tile:
+    """One tile: the region it owns and the larger region it reads"""
+    y0: int
+    y1: int
+    x0: int
+    x1: int
+    pad_y0: int
+    pad_y1: int
+    pad_x0: int
+    pad_x1: int
+
+    @property
+    def padded_slice(self) -> Tuple[slice, slice]:
+        return slice(self.pad_y0, self.pad_y1), slice(self.pad_x0, self.pad_x1)
+
+
+def get_tiling_settings() -> Tuple[int, int, int, int]:
+    """
+    Read tiling settings
+
+    Returns:
+        Tuple of (min_pixels, tile_size, overlap, workers)
+    """
+    from ocr_processing.ocr_core import get_ocr_setting
+    return (
+        int(get_ocr_setting('OCR_TILED_MIN_PIXELS', DEFAULT_MIN_PIXELS)),
+        int(get_ocr_setting('OCR_TILE_SIZE', DEFAULT_TILE_SIZE)),
+        int(get_ocr_setting('OCR_TILE_OVERLAP', DEFAULT_OVERLAP)),
+        int(get_ocr_setting('OCR_TILE_WORKERS', DEFAULT_WORKERS)),
+    )
+
+
+def should_tile(shape: Sequence[int]) -> bool:
+    """Check whether a page is large enough to be processed in tiles"""
+    min_pixels = get_tiling_settings()[0]
+    return min_pixels > 0 and shape[0] * shape[1] > min_pixels
+
+
+def tile_grid(shape: Sequence[int], tile_size: int, overlap: int) -> List[Tile]:
+    """
+    Split a page into tiles in raster order
+
+    Owned regions partition the page; each padded region extends its owned
+    region by `overlap` pixels on every side (clamped to the page), which is
+    the context local filters need near the tile border.
+
+    Args:
+        shape: Page shape (height, width, ...)
+        tile_size: Owned tile width and height
+        overlap: Context margin in pixels
+
+    Returns:
+        List of tiles, row by row
+    """
+    height, width = shape[:2]
+    tiles = []
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        for x0 in range(0, width, tile_size):
+            x1 = min(x0 + tile_size, width)
+            tiles.append(Tile(
+                y0=y0, y1=y1, x0=x0, x1=x1,
+                pad_y0=max(0, y0 - overlap), pad_y1=min(height, y1 + overlap),
+                pad_x0=max(0, x0 - overlap), pad_x1=min(width, x1 + overlap),
+            ))
+    return tiles
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    """Shared tile worker pool (OpenCV releases the GIL, so threads scale)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-tile")
+    return _pool
+
+
+def _ordered_results(fn: Callable, tiles: List[Tile], workers: int):
+    """Yield (tile, fn(tile)) in raster order with at most workers + 1 tiles in flight"""
+    if workers <= 1:
+        for tile in tiles:
+            yield tile, fn(tile)
+        return
+
+    pool = _get_pool(workers)
+    pending = deque()
+    remaining = iter(tiles)
+    for tile in remaining:
+        pending.append((tile, pool.submit(fn, tile)))
+        if len(pending) > workers:
+            break
+    while pending:
+        tile, future = pending.popleft()
+        yield tile, future.result()
+        next_tile = next(remaining, None)
+        if next_tile is not None:
+            pending.append((next_tile, pool.submit(fn, next_tile)))
+
+
+def _blend_into(target: np.ndarray, piece: np.ndarray, ramp: np.ndarray,
+                fade_top: bool, fade_left: bool) -> None:
+    """
+    Write piece over target, fading it in over the first len(ramp) rows/columns
+
+    Only the bands are blended (in float32); the rest of the piece is copied.
+    """
+    band = len(ramp)
+    top = band if fade_top else 0
+    left = band if fade_left else 0
+    target[top:, left:] = piece[top:, left:]
+
+    def mix(rows: slice, cols: slice, weight: np.ndarray) -> None:
+        if piece.ndim == 3:
+            weight = weight[..., None]
+        new = piece[rows, cols].astype(np.float32)
+        old = target[rows, cols].astype(np.float32)
+        blended = old + (new - old) * weight
+        target[rows, cols] = np.clip(np.rint(blended), 0, 255).astype(target.dtype)
+
+    height, width = piece.shape[:2]
+    wy = ramp[:min(top, height), None]
+    wx = ramp[None, :min(left, width)]
+    if top:
+        # Top band across the full width; its left corner fades in both directions
+        weight = np.repeat(wy, width, axis=1)
+        if left:
+            weight[:, :wx.shape[1]] *= wx
+        mix(slice(0, top), slice(None), weight)
+    if left:
+        mix(slice(top, None), slice(0, left), np.repeat(wx, height - min(top, height), axis=0))
+
+
+def process_tiled(
+    image: np.ndarray,
+    fn: Callable[[np.ndarray], Union[np.ndarray, Tuple[np.ndarray, ...]]],
+    outputs: int = 1,
+    tile_size: Optional[int] = None,
+    overlap: Optional[int] = None,
+    workers: Optional[int] = None,
+    blend: bool = False,
+    with_offsets: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, ...]]:
+    """
+    Apply a local filter chain to a page tile by tile and stitch the results
+
+    fn receives each padded tile and returns one array (or a tuple of
+    `outputs` arrays) of the same height and width. Without blending, each
+    tile contributes only the region it owns; for filters whose reach is
+    smaller than `overlap` this reproduces the full-page result exactly.
+    With blending, tiles also write half the overlap into their right and
+    bottom neighbours, which then fade in over that band; use it for
+    operations that depend on tile-level context (e.g. CLAHE) so seams do
+    not show as steps.
+
+    Args:
+        image: Page to process
+        fn: Filter applied to each padded tile
+        outputs: Number of arrays fn returns
+        tile_size: Owned tile size (OCR_TILE_SIZE if None)
+        overlap: Context margin (OCR_TILE_OVERLAP if None)
+        workers: Threads processing tiles concurrently (OCR_TILE_WORKERS if None)
+        blend: Fade neighbouring tiles into each other across the overlap
+        with_offsets: Also pass the padded tile's top-left page coordinates
+            to fn, as fn(tile, y0, x0)
+
+    Returns:
+        Stitched page-sized array, or a tuple of them when outputs > 1
+    """
+    _, default_size, default_overlap, default_workers = get_tiling_settings()
+    tile_size = tile_size or default_size
+    overlap = default_overlap if overlap is None else overlap
+    workers = workers or default_workers
+    band = overlap // 2 if blend else 0
+    ramp = (np.arange(band, dtype=np.float32) + 0.5) / max(band, 1)
+
+    height, width = image.shape[:2]
+    tiles = tile_grid(image.shape, tile_size, overlap)
+    results: List[np.ndarray] = []
+
+    def run(tile: Tile):
+        if with_offsets:
+            produced = fn(image[tile.padded_slice], tile.pad_y0, tile.pad_x0)
+        else:
+            produced = fn(image[tile.padded_slice])
+        return produced if isinstance(produced, tuple) else (produced,)
+
+    def write(tile: Tile, produced: Tuple[np.ndarray, ...]) -> None:
+        # Region written by this tile: what it owns, plus half the overlap to
+        # the right and below when blending
+        wy1 = min(height, tile.y1 + band)
+        wx1 = min(width, tile.x1 + band)
+        src = (slice(tile.y0 - tile.pad_y0, wy1 - tile.pad_y0),
+               slice(tile.x0 - tile.pad_x0, wx1 - tile.pad_x0))
+        dst = (slice(tile.y0, wy1), slice(tile.x0, wx1))
+
+        for target, part in zip(results, produced):
+            piece = part[src]
+            if band and (tile.x0 > 0 or tile.y0 > 0):
+                _blend_into(target[dst], piece, ramp, tile.y0 > 0, tile.x0 > 0)
+            else:
+                target[dst] = piece
+
+    # The first tile fixes output dtypes and channel counts
+    first = run(tiles[0])
+    for part in first[:outputs]:
+        results.append(np.empty((height, width) + part.shape[2:], dtype=part.dtype))
+    write(tiles[0], first)
+    del first
+
+    if band:
+        # Blended tiles read what their left and upper neighbours wrote, so
+        # they are stitched in raster order
+        for tile, produced in _ordered_results(run, tiles[1:], workers):
+            write(tile, produced)
+    else:
+        # Owned regions are disjoint: workers stitch their own tiles, so a
+        # tile's intermediates are freed as soon as it is done
+        def run_and_write(tile: Tile) -> None:
+            write(tile, run(tile))
+
+        for _ in _ordered_results(run_and_write, tiles[1:], workers):
+            pass
+
+    logger.info(f"Processed {width}x{height} page in {len(tiles)} tile(s) of {tile_size}px")
+    return tuple(results) if outputs > 1 else results[0]
@@ -59,6 +59,17 @@ def processing_status_api(request, task_id):
         })
 
 
+def engine_status_api(request):
+    """API endpoint for checking OCR engine pool health"""
+    from .engine_pool import engine_pool_status
+    from .result_cache import get_result_cache
+    return JsonResponse({
+        'success': True,
+        'pools': engine_pool_status(),
+        'cache': get_result_cache().stats()
+    })
+
+
 def ocr_configuration(request):
     """OCR configuration page"""
     try:
@@ -85,6 +96,10 @@ def save_ocr_configuration(request):
             config.confidence_threshold = float(request.POST.get('confidence_threshold', 50))
             config.save()
             
+            # Cached results were produced under the old configuration
+            from .result_cache import get_result_cache
+            get_result_cache().clear()
+            
             messages.success(request, 'OCR configuration saved successfully')
         except Exception as e:
             messages.error(request, f'Error saving configuration: {str(e)}')
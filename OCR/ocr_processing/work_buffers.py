@@ -0,0 +1,97 @@
+"""
+Preprocessing Work Buffers
+Page-sized uint8 buffers that preprocessing stages write into instead of
+allocating a new array per step
+"""
+import threading
+import numpy as np
+from typing import List, Tuple
+
+
+class WorkBuffers:
+    """
+    Two page-sized uint8 buffers that pipeline stages alternate between
+
+    Each stage reads the current image and writes its output (via OpenCV's
+    dst= argument) into the other buffer. Buffers are kept between pages and
+    only reallocated when the page size changes, so a steady stream of pages
+    costs no per-step allocations. Results that leave the pipeline must be
+    copied out (see detach), since the next page overwrites the buffers.
+    """
+
+    def __init__(self):
+        self._shape: Tuple[int, ...] = ()
+        self._buffers: List[np.ndarray] = []
+
+    @classmethod
+    def around(cls, image: np.ndarray) -> 'WorkBuffers':
+        """
+        Create buffers that reuse an array the caller already owns as the first buffer
+
+        Args:
+            image: Writable uint8 array
+
+        Returns:
+            WorkBuffers alternating between image and one new array of its shape
+        """
+        buffers = cls()
+        buffers._buffers = [image, np.empty_like(image)]
+        buffers._shape = image.shape
+        return buffers
+
+    def prepare(self, shape: Tuple[int, ...]) -> None:
+        """
+        Make sure both buffers match the page shape
+
+        Args:
+            shape: Shape of the grayscale page
+        """
+        if tuple(shape) != self._shape:
+            self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(2)]
+            self._shape = tuple(shape)
+
+    def other(self, current: np.ndarray) -> np.ndarray:
+        """
+        Get a buffer to write the next stage's output into
+
+        Args:
+            current: Image the next stage reads (a buffer or an outside array)
+
+        Returns:
+            A buffer that does not share memory with current
+        """
+        first, second = self._buffers
+        return second if current is first else first
+
+    def owns(self, image: np.ndarray) -> bool:
+        """Check whether an array is one of the work buffers"""
+        return any(image is buffer for buffer in self._buffers)
+
+    def detach(self, image: np.ndarray) -> np.ndarray:
+        """
+        Return an array the caller may keep
+
+        Args:
+            image: Pipeline output
+
+        Returns:
+            A copy if image is a work buffer, otherwise image itself
+        """
+        return image.copy() if self.owns(image) else image
+
+
+_local = threading.local()
+
+
+def get_work_buffers() -> WorkBuffers:
+    """
+    Get the work buffers owned by the current thread
+
+    Returns:
+        WorkBuffers instance (one per thread, so concurrent pages never share)
+    """
+    buffers = getattr(_local, 'buffers', None)
+    if buffers is None:
+        buffers = WorkBuffers()
+        _local.buffers = buffers
+    return buffers
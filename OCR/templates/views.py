@@ -58,7 +58,7 @@ def template_upload(request):
             
             # Process the template using advanced table detection
             try:
-                from ocr_processing.ocr_core import OCREngine
+                from ocr_processing.engine_pool import get_ocr_engine
                 from ocr_processing.table_detector import TableDetector
                 import os
                 
@@ -66,7 +66,7 @@ def template_upload(request):
                 file_path = get_temp_file_path(template.file_data, template.file_name)
                 
                 # Initialize OCR engine
-                ocr_engine = OCREngine()
+                ocr_engine = get_ocr_engine()
                 
                 # Check if OCR engines are available
                 if not ocr_engine.tesseract_available and ocr_engine.easyocr_reader is None:
@@ -95,7 +95,9 @@ def template_upload(request):
                             # Successfully detected with enhanced detector
                             from ocr_processing.table_detector import TableDetector
                             table_detector = TableDetector(ocr_engine)
-                            structure_data = table_detector.structure_to_dict(table_structure)
+                            structure_data = table_detector.tables_to_dict(
+                                [table for table, _ in enhanced_detector.tables]
+                            )
                             structure_data['detection_method'] = f'enhanced_{best_strategy.method}'
                             structure_data['detection_strategy'] = best_strategy.name
                             structure_data['detection_confidence'] = best_strategy.confidence
@@ -111,11 +113,18 @@ def template_upload(request):
                                 {
                                     'name': s.name,
                                     'confidence': s.confidence,
-                                    'cells_found': s.cells_found
+                                    'cells_found': s.cells_found,
+                                    'elapsed_ms': round(s.elapsed_ms, 1)
                                 }
                                 for s in enhanced_detector.strategies
                             ]
                             
+                            # Settings documents of this template are detected with first
+                            from ocr_processing.processing_profile import ProcessingProfile, PROFILE_KEY
+                            structure_data[PROFILE_KEY] = ProcessingProfile.from_strategy(
+                                best_strategy, ocr_engine.preferred_engine
+                            ).to_dict()
+                            
                             # Export as Excel template to temp file, then save to DB
                             import tempfile
                             excel_temp = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
@@ -151,13 +160,11 @@ def template_upload(request):
                         logger.warning(f"Enhanced detection failed: {enhanced_error}. Trying standard detection...")
                         
                         table_detector = TableDetector(ocr_engine)
-                        table_structure = table_detector.detect_table_structure(
-                            file_path, 
-                            method="morphology"
-                        )
+                        tables = table_detector.detect_tables(file_path, method="morphology")
+                        table_structure = max(tables, key=lambda table: len(table.cells)) if tables else None
                         
                         if table_structure and len(table_structure.headers) > 0:
-                            structure_data = table_detector.structure_to_dict(table_structure)
+                            structure_data = table_detector.tables_to_dict(tables)
                             structure_data['detection_method'] = 'standard_table_detection'
                             structure_data['note'] = f'Standard detection: {table_structure.rows}x{table_structure.cols} table'
                         else:
@@ -296,7 +303,8 @@ def reprocess_template(request, template_id):
         template = get_object_or_404(Template, id=template_id)
         try:
             # Reprocess the template using OCR core
-            from ocr_processing.ocr_core import OCREngine, TemplateProcessor
+            from ocr_processing.ocr_core import TemplateProcessor
+            from ocr_processing.engine_pool import get_ocr_engine
             import os
             from django.conf import settings
             
@@ -304,7 +312,7 @@ def reprocess_template(request, template_id):
             file_path = os.path.join(settings.MEDIA_ROOT, template.file.name)
             
             # Initialize OCR engine and template processor
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             template_processor = TemplateProcessor(ocr_engine)
             
             # Extract template structure
@@ -462,7 +470,8 @@ def process_template(request, template_id):
                 })
             
             # Process document using template structure
-            from ocr_processing.ocr_core import OCREngine, TemplateProcessor
+            from ocr_processing.ocr_core import TemplateProcessor
+            from ocr_processing.engine_pool import get_ocr_engine
             from ocr_processing.table_detector import TableDetector
             from documents.models import Document
             import os
@@ -492,7 +501,7 @@ def process_template(request, template_id):
                 )
             
             # Initialize OCR and process document
-            ocr_engine = OCREngine()
+            ocr_engine = get_ocr_engine()
             
             # Check if template has table structure (new detection method)
             has_table_structure = (
@@ -503,54 +512,85 @@ def process_template(request, template_id):
             extracted_data = {}
             
             if has_table_structure:
-                # 🚀 Use ENHANCED multi-strategy detection for complex documents
-                try:
-                    from ocr_processing.enhanced_table_detector import EnhancedTableDetector
-                    
-                    enhanced_detector = EnhancedTableDetector(ocr_engine)
-                    table_structure, best_strategy = enhanced_detector.detect_with_multiple_strategies(full_path)
-                    
-                    if table_structure and hasattr(table_structure, 'cells') and len(table_structure.cells) > 0:
-                        # Successfully detected with enhanced detector
-                        table_detector = TableDetector(ocr_engine)
-                        extracted_data = table_detector.structure_to_dict(table_structure)
-                        cell_count = len(extracted_data.get('cells', []))
-                        success_message = (
-                            f'[SMART] Detection: Extracted {cell_count} cells from table. '
-                            f'Used {best_strategy.name} strategy (confidence: {best_strategy.confidence:.1f}%).'
+                # Known form: warp the template's cells onto the document instead of detecting them
+                from ocr_processing.template_alignment import detect_with_template
+                tables = detect_with_template(full_path, template, ocr_engine)
+                
+                if tables is not None:
+                    extracted_data = TableDetector(ocr_engine).tables_to_dict(tables)
+                    cell_count = sum(len(table['cells']) for table in extracted_data['tables'])
+                    success_message = (
+                        f'[TEMPLATE] Alignment: Extracted {cell_count} cells from {len(tables)} table(s) '
+                        f'using the template layout.'
+                    )
+                else:
+                    # 🚀 Use ENHANCED multi-strategy detection for complex documents
+                    try:
+                        from ocr_processing.enhanced_table_detector import EnhancedTableDetector
+                        from ocr_processing.processing_profile import (
+                            profile_for_template, detect_with_profile, record_document_outcome,
+                            get_profile_settings
                         )
-                    else:
-                        raise ValueError("Enhanced detection found no cells")
                         
-                except Exception as enhanced_error:
-                    # Fallback to standard detection
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.warning(f"Enhanced detection failed: {enhanced_error}. Trying standard detection...")
-                    
-                    table_detector = TableDetector(ocr_engine)
-                    table_structure = table_detector.detect_table_structure(full_path, method="morphology")
-                    
-                    if table_structure:
-                        extracted_data = table_detector.structure_to_dict(table_structure)
-                        cell_count = len(extracted_data.get('cells', []))
-                        success_message = f'Document processed successfully. Extracted {cell_count} cells from table.'
-                    else:
-                        # Final fallback to template processor
-                        template_processor = TemplateProcessor(ocr_engine)
-                        extracted_fields = template_processor.process_document_with_template(
-                            full_path, template.structure or {}
-                        )
-                        extracted_data = {
-                            'fields': [
-                                {
-                                    'name': field.name,
-                                    'value': field.value,
-                                    'confidence': field.confidence
-                                } for field in extracted_fields
-                            ]
-                        }
-                        success_message = f'Document processed successfully. Extracted {len(extracted_fields)} fields (fallback method).'
+                        profile = profile_for_template(template.structure) if get_profile_settings()[0] else None
+                        if profile is not None:
+                            # Settings that worked on this template first, full search only if they fail
+                            if profile.engine and profile.engine != ocr_engine.preferred_engine:
+                                ocr_engine = get_ocr_engine(profile.engine)
+                            tables, best_strategy, used_profile = detect_with_profile(
+                                full_path, profile, ocr_engine
+                            )
+                            record_document_outcome(template, best_strategy, used_profile)
+                            detection_label = '[PROFILE]' if used_profile else '[SMART]'
+                        else:
+                            enhanced_detector = EnhancedTableDetector(ocr_engine)
+                            _, best_strategy = enhanced_detector.detect_with_multiple_strategies(full_path)
+                            tables = [table for table, _ in enhanced_detector.tables]
+                            detection_label = '[SMART]'
+                        
+                        if any(table.cells for table in tables):
+                            # Successfully detected with enhanced detector
+                            table_detector = TableDetector(ocr_engine)
+                            extracted_data = table_detector.tables_to_dict(tables)
+                            cell_count = sum(len(table['cells']) for table in extracted_data['tables'])
+                            success_message = (
+                                f'{detection_label} Detection: Extracted {cell_count} cells from {len(tables)} table(s). '
+                                f'Used {best_strategy.name} strategy (confidence: {best_strategy.confidence:.1f}%).'
+                            )
+                        else:
+                            raise ValueError("Enhanced detection found no cells")
+                            
+                    except Exception as enhanced_error:
+                        # Fallback to standard detection
+                        import logging
+                        logger = logging.getLogger(__name__)
+                        logger.warning(f"Enhanced detection failed: {enhanced_error}. Trying standard detection...")
+                        
+                        table_detector = TableDetector(ocr_engine)
+                        tables = table_detector.detect_tables(full_path, method="morphology")
+                        
+                        if tables:
+                            extracted_data = table_detector.tables_to_dict(tables)
+                            cell_count = sum(len(table['cells']) for table in extracted_data['tables'])
+                            success_message = (
+                                f'Document processed successfully. Extracted {cell_count} cells from {len(tables)} table(s).'
+                            )
+                        else:
+                            # Final fallback to template processor
+                            template_processor = TemplateProcessor(ocr_engine)
+                            extracted_fields = template_processor.process_document_with_template(
+                                full_path, template.structure or {}
+                            )
+                            extracted_data = {
+                                'fields': [
+                                    {
+                                        'name': field.name,
+                                        'value': field.value,
+                                        'confidence': field.confidence
+                                    } for field in extracted_fields
+                                ]
+                            }
+                            success_message = f'Document processed successfully. Extracted {len(extracted_fields)} fields (fallback method).'
             else:
                 # Old template format - use template processor
                 template_processor = TemplateProcessor(ocr_engine)